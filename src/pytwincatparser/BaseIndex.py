@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, List, Set
+
+from .TwincatDataclasses import Objects, iter_objects, source_path
+
+
+class BaseIndex(ABC):
+    """
+    Base of the indexes a Loader keeps up to date.
+
+    Every object belongs to the file it was loaded from. Loading a file again
+    replaces everything the index knows about that file.
+    """
+
+    def update(self, objects: Iterable[Objects]) -> None:
+        """Replace the entries of every file the objects were loaded from."""
+        objects: List[Objects] = list(iter_objects(objects))
+        paths: Set[str] = set()
+        for obj in objects:
+            path = source_path(obj)
+            if path is not None:
+                paths.add(str(path))
+        self.remove_paths(paths)
+        self.add_objects(objects)
+
+    @abstractmethod
+    def add_objects(self, objects: List[Objects]) -> None:
+        """Add objects, nested objects are already part of the list."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def remove_paths(self, paths: Iterable[str | Path]) -> None:
+        """Remove every entry of the given files."""
+        raise NotImplementedError()
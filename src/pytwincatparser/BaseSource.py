@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .PathIndex import PathIndex, normalize_include
+
+
+class BaseSource(ABC):
+    """
+    Files of a project which are not read from the file system.
+
+    A source knows the relative posix names of its files and returns their
+    content as bytes. The loaded objects get paths below `root`, which does
+    not have to exist.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        # parsed files by content key, see key()
+        self.cache: Optional[Dict[tuple, bytes]] = None
+        self._path_index: Optional[PathIndex] = None
+
+    @abstractmethod
+    def names(self) -> Iterable[str]:
+        """Relative posix names of all files of the source."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def read(self, name: str) -> bytes:
+        """Return the content of a file, name as returned by names()."""
+        raise NotImplementedError()
+
+    def key(self, name: str) -> Optional[str]:
+        """
+        Return a key of the content of a file, e.g. its blob hash.
+
+        Files with the same key are parsed once as long as the source has a
+        cache. None, the default, disables caching for the file.
+        """
+        return None
+
+    @property
+    def path_index(self) -> PathIndex:
+        """Case-insensitive index of all names of the source."""
+        if self._path_index is None:
+            self._path_index = PathIndex(self.root, self.names())
+        return self._path_index
+
+    def index_below(self, directory: str) -> PathIndex:
+        """Index of the files below a directory, e.g. the one of a .plcproj."""
+        directory = normalize_include(directory)
+        if directory in ("", "."):
+            return self.path_index
+        prefix = directory.casefold() + "/"
+        names = [
+            name[len(prefix) :]
+            for name in self.path_index
+            if name.casefold().startswith(prefix)
+        ]
+        return PathIndex(self.root / directory, names)
+
+    def name_of(self, path: Path) -> Optional[str]:
+        """Return the name of a path below root, or None if it is outside."""
+        try:
+            return Path(path).relative_to(self.root).as_posix()
+        except ValueError:
+            return None
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List
+from typing import Iterable, List
+from .BaseSource import BaseSource
 from .TwincatDataclasses import Objects
 
 
@@ -16,3 +17,31 @@ class BaseStrategy(ABC): # extract to seperate file
     @abstractmethod
     def load_objects(self, path:Path) -> List[Objects]:
         raise NotImplementedError()
+
+    def load_data(self, path: Path, data, root: Path | None = None) -> List[Objects]:
+        raise NotImplementedError()
+
+    def load_tree(
+        self,
+        root: Path,
+        include: List[str] | None = None,
+        exclude: List[str] | None = None,
+        name_space: str | None = None,
+        max_workers: int | None = None,
+    ) -> List[Objects]:
+        raise NotImplementedError()
+
+    def load_source(
+        self, source: BaseSource, path: str, max_workers: int | None = None
+    ) -> List[Objects]:
+        raise NotImplementedError()
+
+    def load_many(
+        self, paths: Iterable[Path], max_workers: int | None = None
+    ) -> List[Objects]:
+        """Load every path, objects with an identifier already loaded are dropped."""
+        index: dict[str, Objects] = {}
+        for path in paths:
+            for obj in self.load_objects(path=Path(path)):
+                index.setdefault(obj.get_identifier(), obj)
+        return list(index.values())
@@ -0,0 +1,360 @@
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import TwincatDataclasses as tcd
+from .BaseIndex import BaseIndex
+from .parse_implementation import Call, Deref, Index, Member, Name, Node, walk
+from .TypeTable import Step, TypeTable, base_type_name, declared_names
+
+CALL = 0
+# a call of an interface or base class method may run an implementation or override
+DISPATCH = 1
+
+
+def call_steps(target: Node) -> Optional[List[Step]]:
+    """Describe the target expression of a call as steps, None if it is not resolvable."""
+    steps: List[Step] = []
+    node = target
+    while True:
+        if isinstance(node, Member):
+            steps.append(("member", node.name))
+            node = node.target
+        elif isinstance(node, Index):
+            steps.append(("index",))
+            node = node.target
+        elif isinstance(node, Call):
+            steps.append(("call",))
+            node = node.target
+        elif isinstance(node, Deref):
+            if isinstance(node.target, Name) and node.target.name.upper() in (
+                "THIS",
+                "SUPER",
+            ):
+                steps.append((node.target.name.lower(),))
+                break
+            steps.append(("deref",))
+            node = node.target
+        elif isinstance(node, Name):
+            steps.append(("name", node.name))
+            break
+        else:
+            return None
+    steps.reverse()
+    return steps
+
+
+@dataclass
+class _CallSite:
+    caller: str
+    owner: Optional[tcd.Objects]  # pou or itf the body belongs to
+    local: Dict[str, tcd.Variable]
+    steps: List[Step]
+    # casefolded names of the path, a file declaring one of them may change it
+    names: frozenset = frozenset()
+    # casefolded names the last resolution looked up, variable and return
+    # types, bases and names which were not found
+    consulted: frozenset = frozenset()
+    # (target, external) of the last resolution
+    target: Optional[Tuple[str, bool]] = None
+    # files the last resolution looked at, None if it was not resolved yet
+    depends: Optional[Set[str]] = None
+
+
+def _identifier(obj: tcd.Objects) -> str:
+    return obj.get_identifier()
+
+
+class CallGraph(BaseIndex):
+    """
+    Project wide call graph of pous, methods and properties.
+
+    Calls are taken from the syntax trees of the implementations and resolved
+    through the variable types: method calls on instances (fbAxis.MoveAbs()),
+    fb instance and function calls, THIS^ and SUPER^, calls through arrays,
+    pointers and return values. A call of an interface or base class method
+    gets DISPATCH edges to every implementation and override, so reachability
+    covers dynamic dispatch. Targets which are not loaded, e.g. library
+    blocks, are nodes named like written ("TON", "FB_Log.Info").
+
+    Edges are kept in compressed adjacency arrays. Reloading a file drops its
+    call sites. On the next query only the call sites of new files, and those
+    whose resolution looked at a changed file or looked up a name a changed
+    file declares, are resolved again. The arrays are rebuilt from the kept edges.
+    """
+
+    def __init__(self):
+        self._objects_by_path: Dict[str, List[tcd.Objects]] = {}
+        self._sites_by_path: Dict[str, List[_CallSite]] = {}
+        self._changed_paths: Set[str] = set()
+        self._changed_names: Set[str] = set()
+        self._dirty = True
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._external: Set[int] = set()
+        self._forward: Tuple[array, array, array] = (
+            array("I", [0]),
+            array("I"),
+            array("B"),
+        )
+        self._reverse: Tuple[array, array, array] = (
+            array("I", [0]),
+            array("I"),
+            array("B"),
+        )
+
+    # -- index --------------------------------------------------------------
+
+    def add_objects(self, objects: List[tcd.Objects]) -> None:
+        for obj in objects:
+            if not isinstance(
+                obj, (tcd.Pou, tcd.Itf, tcd.Dut, tcd.Gvl, tcd.Method, tcd.Property)
+            ):
+                continue
+            path = tcd.source_path(obj)
+            key = "" if path is None else str(path)
+            self._objects_by_path.setdefault(key, []).append(obj)
+            self._sites_by_path.setdefault(key, []).extend(self._call_sites(obj))
+            self._changed_paths.add(key)
+            self._changed_names |= declared_names(obj)
+        self._dirty = True
+
+    def remove_paths(self, paths: Iterable[str | Path]) -> None:
+        for path in paths:
+            for obj in self._objects_by_path.pop(str(path), []):
+                self._changed_names |= declared_names(obj)
+            self._sites_by_path.pop(str(path), None)
+            self._changed_paths.add(str(path))
+        self._dirty = True
+
+    def _call_sites(self, obj: tcd.Objects) -> List[_CallSite]:
+        owner = (
+            tcd.unwrap(obj.parent)
+            if isinstance(obj, (tcd.Method, tcd.Property))
+            else obj
+        )
+        if isinstance(obj, tcd.Property):
+            bodies = [
+                accessor for accessor in (obj.get, obj.set) if accessor is not None
+            ]
+        elif isinstance(obj, (tcd.Pou, tcd.Method)):
+            bodies = [obj]
+        else:
+            return []
+        local = {
+            variable.name.casefold(): variable
+            for variable in (obj.variables if isinstance(obj, tcd.Method) else [])
+        }
+        caller = _identifier(obj)
+        sites = []
+        for body in bodies:
+            if not body.implementation:
+                continue
+            for node in walk(body.ast):
+                if isinstance(node, Call):
+                    steps = call_steps(node.target)
+                    if steps:
+                        names = frozenset(
+                            step[1].casefold() for step in steps if len(step) > 1
+                        )
+                        sites.append(_CallSite(caller, owner, local, steps, names))
+        return sites
+
+    # -- graph --------------------------------------------------------------
+
+    def _node(self, name: str, external: bool = False) -> int:
+        key = name.casefold()
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self._names)
+            self._names.append(name)
+            if external:
+                self._external.add(node)
+        return node
+
+    def _rebuild(self):
+        if not self._dirty:
+            return
+        objects = [obj for objs in self._objects_by_path.values() for obj in objs]
+        table = TypeTable(objects)
+        changed_paths, changed_names = self._changed_paths, self._changed_names
+        for sites in self._sites_by_path.values():
+            for site in sites:
+                if (
+                    site.depends is None
+                    or not site.depends.isdisjoint(changed_paths)
+                    or not site.names.isdisjoint(changed_names)
+                    or not site.consulted.isdisjoint(changed_names)
+                ):
+                    self._resolve_site(site, table)
+        self._changed_paths = set()
+        self._changed_names = set()
+
+        self._names = []
+        self._ids = {}
+        self._external = set()
+        edges: Set[Tuple[int, int, int]] = set()
+        for obj in objects:
+            if isinstance(obj, (tcd.Pou, tcd.Method, tcd.Property)):
+                self._node(_identifier(obj))
+
+        for sites in self._sites_by_path.values():
+            for site in sites:
+                if site.target is not None:
+                    edges.add((self._node(site.caller), self._node(*site.target), CALL))
+
+        for obj in objects:
+            if isinstance(obj, tcd.Pou):
+                self._dispatch_edges(obj, table, edges)
+
+        self._forward = self._csr(edges, reverse=False)
+        self._reverse = self._csr(edges, reverse=True)
+        self._dirty = False
+
+    def _dispatch_edges(self, pou: tcd.Pou, table: TypeTable, edges: set):
+        own = table.members(pou)
+        bases = table.chain(pou)[1:] + table.interfaces(pou)
+        for base in bases:
+            for method in getattr(base, "methods", None) or []:
+                implementation = own.get(method.name.casefold())
+                if (
+                    isinstance(implementation, tcd.Method)
+                    and implementation is not method
+                ):
+                    edges.add(
+                        (
+                            self._node(_identifier(method)),
+                            self._node(_identifier(implementation)),
+                            DISPATCH,
+                        )
+                    )
+
+    def _csr(
+        self, edges: Set[Tuple[int, int, int]], reverse: bool
+    ) -> Tuple[array, array, array]:
+        count = len(self._names)
+        ordered = sorted((b, a, k) if reverse else (a, b, k) for a, b, k in edges)
+        offsets = array("I", [0]) * (count + 1)
+        targets = array("I")
+        kinds = array("B")
+        for source, target, kind in ordered:
+            offsets[source + 1] += 1
+            targets.append(target)
+            kinds.append(kind)
+        for node in range(count):
+            offsets[node + 1] += offsets[node]
+        return offsets, targets, kinds
+
+    def _resolve_site(self, site: _CallSite, table: TypeTable) -> None:
+        """Resolve a call site and record the files and names it depends on."""
+        table.consulted = set()
+        symbols, site.target = self._resolve(site, table)
+        site.depends = table.files(site.owner, symbols)
+        site.consulted = frozenset(table.consulted)
+        table.consulted = None
+
+    def _resolve(
+        self, site: _CallSite, table: TypeTable
+    ) -> Tuple[List[Optional[tcd.Objects]], Optional[Tuple[str, bool]]]:
+        """
+        Return the symbols of the path and the (target, external) of a call site.
+
+        Targets which are not loaded are external.
+        """
+        steps = site.steps
+        symbols, state = table.resolve(steps, site.owner, site.local)
+        if state is None:
+            if len(steps) == 1 and steps[0][0] == "name":
+                # a function or block of a library
+                return symbols, (steps[0][1], True)
+            return symbols, None
+        if state[0] == "callable":
+            if isinstance(state[1], (tcd.Pou, tcd.Method)):
+                return symbols, (_identifier(state[1]), False)
+            return symbols, None
+        if state[0] == "external":
+            return symbols, (state[1], True)
+        if state[0] == "type":
+            # an fb instance (or SUPER^) is called, its body runs
+            type_obj = table.type_of(state[1])
+            if isinstance(type_obj, tcd.Pou):
+                return symbols, (_identifier(type_obj), False)
+            base = base_type_name(state[1])
+            if base and type_obj is None:
+                return symbols, (base, True)
+        return symbols, None
+
+    # -- queries ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        self._rebuild()
+        return len(self._forward[1])
+
+    @property
+    def nodes(self) -> List[str]:
+        """Identifiers of all nodes, loaded ones and external."""
+        self._rebuild()
+        return list(self._names)
+
+    def is_external(self, identifier: str) -> bool:
+        """Check if a node is a target which is not loaded, e.g. a library block."""
+        self._rebuild()
+        node = self._ids.get(identifier.casefold())
+        return node is not None and node in self._external
+
+    def _graph(self, reverse: bool) -> Tuple[array, array, array]:
+        self._rebuild()
+        return self._reverse if reverse else self._forward
+
+    def _neighbours(self, identifier: str, reverse: bool, dispatch: bool) -> List[str]:
+        offsets, targets, kinds = self._graph(reverse)
+        node = self._ids.get(identifier.casefold())
+        if node is None:
+            return []
+        return [
+            self._names[targets[edge]]
+            for edge in range(offsets[node], offsets[node + 1])
+            if dispatch or kinds[edge] == CALL
+        ]
+
+    def callees(self, identifier: str, dispatch: bool = True) -> List[str]:
+        """Direct call targets of a pou, method or property."""
+        return self._neighbours(identifier, False, dispatch)
+
+    def callers(self, identifier: str, dispatch: bool = True) -> List[str]:
+        """Direct callers of a pou, method or property."""
+        return self._neighbours(identifier, True, dispatch)
+
+    def _closure(self, identifiers: Iterable[str] | str, reverse: bool) -> Set[str]:
+        offsets, targets, _ = self._graph(reverse)
+        if isinstance(identifiers, str):
+            identifiers = [identifiers]
+        start = [
+            self._ids[identifier.casefold()]
+            for identifier in identifiers
+            if identifier.casefold() in self._ids
+        ]
+        seen = bytearray(len(self._names))
+        queue = deque(start)
+        for node in start:
+            seen[node] = 1
+        while queue:
+            node = queue.popleft()
+            for edge in range(offsets[node], offsets[node + 1]):
+                target = targets[edge]
+                if not seen[target]:
+                    seen[target] = 1
+                    queue.append(target)
+        return {self._names[node] for node in range(len(seen)) if seen[node]} - {
+            self._names[node] for node in start
+        }
+
+    def reachable(self, identifiers: Iterable[str] | str) -> Set[str]:
+        """Everything the given nodes may call, directly or indirectly."""
+        return self._closure(identifiers, False)
+
+    def reaching(self, identifiers: Iterable[str] | str) -> Set[str]:
+        """Everything which may call the given nodes, directly or indirectly."""
+        return self._closure(identifiers, True)
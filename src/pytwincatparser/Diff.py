@@ -0,0 +1,229 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import TwincatDataclasses as tcd
+from .Fingerprint import content_hash
+from .NdjsonExporter import record_id
+
+# kinds of objects which are matched between the versions
+_DIFF_KINDS = (
+    tcd.PlcProject,
+    tcd.Pou,
+    tcd.Itf,
+    tcd.Dut,
+    tcd.Gvl,
+    tcd.Method,
+    tcd.Property,
+    tcd.Variable,
+)
+
+# fields compared per kind, the declaration is only reported if none of them changed
+_FIELDS = {
+    "plcproject": ("version", "default_namespace"),
+    "pou": ("extends", "implements", "access_specifier", "implementation"),
+    "itf": ("extends",),
+    "dut": (),
+    "gvl": (),
+    "method": ("accessModifier", "returnType", "implementation"),
+    "property": ("returnType",),
+    "variable": (
+        "type",
+        "initial_value",
+        "section_type",
+        "section_modifier",
+        "attributes",
+    ),
+}
+
+Key = Tuple[str, str]
+
+
+@dataclass
+class FieldChange:
+    field: str
+    old: Any
+    new: Any
+
+
+@dataclass
+class ObjectDiff:
+    status: str  # "added", "removed" or "changed"
+    kind: str
+    identifier: str
+    changes: List[FieldChange] = field(default_factory=list)
+    old: Optional[tcd.Objects] = field(default=None, repr=False)
+    new: Optional[tcd.Objects] = field(default=None, repr=False)
+
+    def change(self, name: str) -> Optional[FieldChange]:
+        """Return the change of a field, e.g. "type", or None."""
+        for change in self.changes:
+            if change.field == name:
+                return change
+        return None
+
+
+@dataclass
+class ProjectDiff:
+    added: List[ObjectDiff] = field(default_factory=list)
+    removed: List[ObjectDiff] = field(default_factory=list)
+    changed: List[ObjectDiff] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __iter__(self) -> Iterator[ObjectDiff]:
+        yield from self.removed
+        yield from self.added
+        yield from self.changed
+
+    def get(self, identifier: str, kind: Optional[str] = None) -> Optional[ObjectDiff]:
+        """Return the entry of an object, or None if it did not change."""
+        for entry in self:
+            if entry.identifier == identifier and kind in (None, entry.kind):
+                return entry
+        return None
+
+
+def _collect(objects: Iterable[tcd.Objects]) -> Dict[Key, tcd.Objects]:
+    collected: Dict[Key, tcd.Objects] = {}
+    for obj in tcd.iter_objects(objects):
+        if isinstance(obj, _DIFF_KINDS) and obj.name:
+            collected.setdefault((obj.kind, record_id(obj)), obj)
+    return collected
+
+
+def _parent_key(obj: tcd.Objects) -> Optional[Key]:
+    parent = tcd.unwrap(obj.parent)
+    if isinstance(parent, _DIFF_KINDS) and not isinstance(parent, tcd.PlcProject):
+        return (parent.kind, record_id(parent))
+    return None
+
+
+def _value(obj: tcd.Objects, name: str) -> Any:
+    value = getattr(obj, name, None)
+    # empty and missing are the same for the lists and strings of the model
+    return value or None
+
+
+def _accessors(obj: tcd.Property) -> Dict[str, Tuple[str, str]]:
+    return {
+        accessor.kind: (accessor.declaration, accessor.implementation)
+        for accessor in (obj.get, obj.set)
+        if accessor is not None
+    }
+
+
+def _dependencies(obj: tcd.PlcProject) -> Dict[str, str]:
+    return {
+        dependency.name: dependency.version for dependency in obj.dependencies or []
+    }
+
+
+def _field_changes(old: tcd.Objects, new: tcd.Objects) -> List[FieldChange]:
+    changes = []
+    for name in _FIELDS[new.kind]:
+        old_value, new_value = _value(old, name), _value(new, name)
+        if old_value != new_value:
+            changes.append(FieldChange(name, old_value, new_value))
+    if isinstance(new, tcd.Property):
+        old_accessors, new_accessors = _accessors(old), _accessors(new)
+        for kind in ("get", "set"):
+            if old_accessors.get(kind) != new_accessors.get(kind):
+                changes.append(
+                    FieldChange(kind, old_accessors.get(kind), new_accessors.get(kind))
+                )
+    if isinstance(new, tcd.PlcProject):
+        old_dependencies, new_dependencies = _dependencies(old), _dependencies(new)
+        if old_dependencies != new_dependencies:
+            changes.append(
+                FieldChange("dependencies", old_dependencies, new_dependencies)
+            )
+    return changes
+
+
+def diff_objects(
+    old_objects: Iterable[tcd.Objects], new_objects: Iterable[tcd.Objects]
+) -> ProjectDiff:
+    """
+    Compare two loaded versions of a project.
+
+    Projects, pous, interfaces, duts, gvls, methods, properties and variables
+    are matched by identifier in two hash maps, so the comparison is linear in
+    the number of objects. Objects with the same content hash are skipped
+    together with their variables. An added or removed object is reported
+    once, its methods, properties and variables are not listed separately.
+
+    Args:
+        old_objects: The objects of the old version, as returned by the Loader.
+        new_objects: The objects of the new version.
+
+    Returns:
+        The added, removed and changed objects, each list sorted by identifier.
+    """
+    old = _collect(old_objects)
+    new = _collect(new_objects)
+    diff = ProjectDiff()
+
+    # owners whose changed declaration is explained by the entries of their children
+    explained = set()
+    removed = old.keys() - new.keys()
+    added = new.keys() - old.keys()
+    for key in removed:
+        parent = _parent_key(old[key])
+        if parent not in removed:
+            diff.removed.append(ObjectDiff("removed", key[0], key[1], old=old[key]))
+            explained.add(parent)
+    for key in added:
+        parent = _parent_key(new[key])
+        if parent not in added:
+            diff.added.append(ObjectDiff("added", key[0], key[1], new=new[key]))
+            explained.add(parent)
+
+    # owners whose declaration is unchanged, their variables are equal as well
+    unchanged = set()
+    for key, new_obj in new.items():
+        old_obj = old.get(key)
+        if old_obj is None or isinstance(new_obj, tcd.Variable):
+            continue
+        if content_hash(old_obj) == content_hash(new_obj):
+            unchanged.add(key)
+            continue
+        changes = _field_changes(old_obj, new_obj)
+        diff.changed.append(
+            ObjectDiff("changed", key[0], key[1], changes, old=old_obj, new=new_obj)
+        )
+
+    for key, new_obj in new.items():
+        old_obj = old.get(key)
+        if old_obj is None or not isinstance(new_obj, tcd.Variable):
+            continue
+        owner = _parent_key(new_obj)
+        if owner in unchanged:
+            continue
+        changes = _field_changes(old_obj, new_obj)
+        if changes:
+            diff.changed.append(
+                ObjectDiff("changed", key[0], key[1], changes, old=old_obj, new=new_obj)
+            )
+            explained.add(owner)
+
+    entries = []
+    for entry in diff.changed:
+        if not entry.changes and (entry.kind, entry.identifier) in explained:
+            # the changed variables are listed on their own
+            continue
+        if not entry.changes:
+            # a changed declaration without a visible reason, e.g. a comment
+            entry.changes.append(
+                FieldChange(
+                    "declaration",
+                    _value(entry.old, "declaration"),
+                    _value(entry.new, "declaration"),
+                )
+            )
+        entries.append(entry)
+    diff.changed = entries
+
+    for entries in (diff.added, diff.removed, diff.changed):
+        entries.sort(key=lambda entry: (entry.identifier, entry.kind))
+    return diff
@@ -0,0 +1,221 @@
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import TwincatDataclasses as tcd
+from .BaseIndex import BaseIndex
+
+DIGEST_SIZE = 16
+
+# fields holding source text or signature information of an object
+_CONTENT_FIELDS = (
+    "declaration",
+    "implementation",
+    "returnType",
+    "accessModifier",
+    "access_specifier",
+    "default_namespace",
+    "version",
+)
+# child lists which are nodes of the merkle tree, variables are part of the declaration
+_TREE_CHILDREN = ("pous", "duts", "itfs", "gvls", "methods", "properties")
+
+
+def _update(hasher, text: Optional[str]) -> None:
+    # git checkouts on windows have CRLF, the hash should not depend on it
+    data = (text or "").replace("\r\n", "\n").encode("utf-8")
+    hasher.update(len(data).to_bytes(8, "little"))
+    hasher.update(data)
+
+
+def content_hash(obj: tcd.Objects) -> bytes:
+    """
+    Hash the content of a single object, its methods and properties excluded.
+
+    Declaration, implementation, extends/implements, the get/set of a property
+    and the dependencies of a project are part of the hash. Line endings are
+    normalized, so a CRLF checkout hashes like a LF one.
+
+    Args:
+        obj: Any loaded object.
+
+    Returns:
+        A blake2b digest of DIGEST_SIZE bytes.
+    """
+    obj = tcd.unwrap(obj)
+    hasher = blake2b(digest_size=DIGEST_SIZE)
+    _update(hasher, obj.kind)
+    _update(hasher, obj.name)
+    for name in _CONTENT_FIELDS:
+        value = getattr(obj, name, None)
+        if value is not None:
+            _update(hasher, name)
+            _update(hasher, value)
+    for relation in ("extends", "implements"):
+        _update(hasher, ",".join(getattr(obj, relation, None) or []))
+    if isinstance(obj, tcd.Property):
+        for accessor in (obj.get, obj.set):
+            _update(hasher, None if accessor is None else accessor.declaration)
+            _update(hasher, None if accessor is None else accessor.implementation)
+    if isinstance(obj, tcd.PlcProject):
+        for dependency in obj.dependencies or []:
+            _update(hasher, f"{dependency.name} {dependency.version}")
+    return hasher.digest()
+
+
+def _identifier(obj: tcd.Objects) -> str:
+    try:
+        return obj.get_identifier() or ""
+    except AttributeError:
+        return obj.name or ""
+
+
+@dataclass
+class MerkleNode:
+    identifier: str
+    kind: str
+    content: bytes
+    digest: bytes
+    children: Dict[str, "MerkleNode"] = field(default_factory=dict)
+
+    def walk(self) -> Iterator["MerkleNode"]:
+        """Yield the node and all nodes below it."""
+        yield self
+        for child in self.children.values():
+            yield from child.walk()
+
+
+@dataclass
+class TreeChange:
+    status: str  # "added", "removed" or "changed"
+    identifier: str
+    kind: str
+
+
+def merkle_tree(
+    obj: tcd.Objects, hashes: Optional[Dict[Tuple[str, str], bytes]] = None
+) -> MerkleNode:
+    """
+    Build the merkle tree of an object, usually a PlcProject.
+
+    Pous, duts, itfs and gvls are the children of a project, methods and
+    properties the children of a pou or itf. The digest of a node covers its
+    content and the digests of its children, sorted by identifier so the order
+    of the files does not matter.
+
+    Args:
+        obj: The root object.
+        hashes: Content hashes by (kind, identifier) computed before, e.g. by a
+            FingerprintIndex while loading. Missing ones are computed.
+
+    Returns:
+        The root node.
+    """
+    obj = tcd.unwrap(obj)
+    identifier = _identifier(obj)
+    content = None if hashes is None else hashes.get((obj.kind, identifier))
+    if content is None:
+        content = content_hash(obj)
+
+    children: Dict[str, MerkleNode] = {}
+    for name in _TREE_CHILDREN:
+        for child in getattr(obj, name, None) or []:
+            node = merkle_tree(child, hashes)
+            children[f"{node.kind}:{node.identifier}"] = node
+
+    hasher = blake2b(content, digest_size=DIGEST_SIZE)
+    for key in sorted(children):
+        _update(hasher, key)
+        hasher.update(children[key].digest)
+    return MerkleNode(
+        identifier=identifier,
+        kind=obj.kind,
+        content=content,
+        digest=hasher.digest(),
+        children={key: children[key] for key in sorted(children)},
+    )
+
+
+def compare_trees(old: MerkleNode, new: MerkleNode) -> List[TreeChange]:
+    """
+    List the objects which differ between two merkle trees.
+
+    Subtrees with the same digest are skipped without looking into them. A
+    node is "changed" if its own content differs, a pou whose methods changed
+    only shows up with the changed methods.
+
+    Args:
+        old: Tree of the old build.
+        new: Tree of the new build.
+
+    Returns:
+        The added, removed and changed objects in tree order.
+    """
+    changes: List[TreeChange] = []
+    _compare(old, new, changes)
+    return changes
+
+
+def _compare(old: MerkleNode, new: MerkleNode, changes: List[TreeChange]) -> None:
+    if old.digest == new.digest:
+        return
+    if old.content != new.content:
+        changes.append(TreeChange("changed", new.identifier, new.kind))
+    for key, old_child in old.children.items():
+        new_child = new.children.get(key)
+        if new_child is None:
+            changes.extend(
+                TreeChange("removed", node.identifier, node.kind)
+                for node in old_child.walk()
+            )
+        else:
+            _compare(old_child, new_child, changes)
+    for key, new_child in new.children.items():
+        if key not in old.children:
+            changes.extend(
+                TreeChange("added", node.identifier, node.kind)
+                for node in new_child.walk()
+            )
+
+
+class FingerprintIndex(BaseIndex):
+    """
+    Content hashes of all loaded objects, computed while loading.
+
+    Add it to a Loader with add_index; reloaded files replace their hashes.
+    tree() builds the merkle tree of a project from the stored hashes.
+    """
+
+    def __init__(self):
+        self.hashes: Dict[Tuple[str, str], bytes] = {}
+        self._by_path: Dict[str, List[Tuple[str, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def add_objects(self, objects: List[tcd.Objects]) -> None:
+        for obj in objects:
+            if isinstance(
+                obj, (tcd.Documentation, tcd.Dependency, tcd.Variable, tcd.Get, tcd.Set)
+            ):
+                # part of the hash of their owner
+                continue
+            key = (obj.kind, _identifier(obj))
+            self.hashes[key] = content_hash(obj)
+            path = tcd.source_path(obj)
+            if path is not None:
+                self._by_path.setdefault(str(path), []).append(key)
+
+    def remove_paths(self, paths: Iterable[str | Path]) -> None:
+        for path in paths:
+            for key in self._by_path.pop(str(path), []):
+                self.hashes.pop(key, None)
+
+    def fingerprint(self, kind: str, identifier: str) -> Optional[bytes]:
+        """Return the content hash of an object, e.g. ("pou", "Lib.FB_Axis")."""
+        return self.hashes.get((kind, identifier))
+
+    def tree(self, project: tcd.PlcProject) -> MerkleNode:
+        """Build the merkle tree of a loaded project."""
+        return merkle_tree(project, self.hashes)
@@ -0,0 +1,131 @@
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .BaseSource import BaseSource
+
+
+class GitError(Exception):
+    pass
+
+
+class GitRepository:
+    """
+    Read access to the object store of a local git repository.
+
+    Blobs are read through one `git cat-file --batch` process which is kept
+    running, so reading a file costs a pipe round trip instead of a process
+    start. Parsed files are cached by blob hash for all revisions.
+
+        with GitRepository("path/to/repo") as repository:
+            head = loader.load_source(repository.source("HEAD"), "Lib/Lib.plcproj")
+            base = loader.load_source(repository.source("main"), "Lib/Lib.plcproj")
+    """
+
+    def __init__(self, path: Path, git: str = "git"):
+        self.path = Path(path).absolute()
+        self.git = git
+        self.cache: Dict[tuple, bytes] = {}
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "GitRepository":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _run(self, *args: str) -> bytes:
+        result = subprocess.run(
+            [self.git, "-C", str(self.path), *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        if result.returncode != 0:
+            raise GitError(result.stderr.decode("utf-8", "replace").strip())
+        return result.stdout
+
+    def rev_parse(self, revision: str) -> str:
+        """Return the commit hash of a revision, e.g. "HEAD" or a tag."""
+        return (
+            self._run("rev-parse", "--verify", f"{revision}^{{commit}}")
+            .decode()
+            .strip()
+        )
+
+    def ls_tree(self, revision: str) -> Dict[str, str]:
+        """Return the blob hash of every file of a revision by its relative name."""
+        blobs: Dict[str, str] = {}
+        output = self._run("ls-tree", "-r", "-z", "--full-tree", revision)
+        for entry in output.split(b"\0"):
+            if not entry:
+                continue
+            info, name = entry.split(b"\t", 1)
+            _, kind, sha = info.split(b" ")
+            if kind == b"blob":
+                blobs[name.decode("utf-8")] = sha.decode("ascii")
+        return blobs
+
+    def read_blob(self, sha: str) -> bytes:
+        """Read a blob through the cat-file process, started on first use."""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._process = subprocess.Popen(
+                    [self.git, "-C", str(self.path), "cat-file", "--batch"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                )
+            process = self._process
+            process.stdin.write(sha.encode("ascii") + b"\n")
+            process.stdin.flush()
+            header = process.stdout.readline().split()
+            if len(header) != 3:
+                raise GitError(f"object not found: {sha}")
+            size = int(header[2])
+            data = process.stdout.read(size)
+            process.stdout.read(1)  # the newline after the content
+            return data
+
+    def source(self, revision: str) -> "GitSource":
+        """Return the files of a revision as source for Loader.load_source."""
+        return GitSource(self, revision)
+
+    def close(self) -> None:
+        """Stop the cat-file process."""
+        with self._lock:
+            if self._process is not None:
+                self._process.stdin.close()
+                self._process.wait()
+                self._process.stdout.close()
+                self._process = None
+
+
+class GitSource(BaseSource):
+    """
+    The files of one revision of a GitRepository.
+
+    The loaded objects get paths below the virtual root "<commit>:", like
+    "3f2a...:/Lib/Lib.plcproj", so objects of two revisions never share a
+    path and nothing is mistaken for a file of the working tree.
+    """
+
+    def __init__(self, repository: GitRepository | Path, revision: str = "HEAD"):
+        if not isinstance(repository, GitRepository):
+            repository = GitRepository(repository)
+        commit = repository.rev_parse(revision)
+        super().__init__(root=Path(f"{commit}:"))
+        self.repository = repository
+        self.revision = revision
+        self.commit = commit
+        self.blobs = repository.ls_tree(self.commit)
+        self.cache = repository.cache
+
+    def names(self) -> Iterable[str]:
+        return self.blobs.keys()
+
+    def read(self, name: str) -> bytes:
+        return self.repository.read_blob(self.blobs[name])
+
+    def key(self, name: str) -> Optional[str]:
+        return self.blobs.get(name)
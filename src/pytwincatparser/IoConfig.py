@@ -0,0 +1,488 @@
+import io
+import logging
+import re
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from lxml import etree
+
+from . import TwincatDataclasses as tcd
+
+logger = logging.getLogger(__name__)
+
+# the sections of a .tsproj which are only read on first use
+LAZY_SECTIONS = ("Io", "Mappings")
+# VarGrpType of a <Vars> group
+_GROUP_DIRECTIONS = {"1": "input", "2": "output"}
+_DIRECTIONS = (None, "input", "output")
+# elements which are kept until their end, their children are read together
+_GROUPS = ("Pdo", "Vars", "Mappings")
+# the elements the index is read from, the others are cleared with their owner
+_TAGS = ("Device", "Box", "Name") + _GROUPS
+# the name TwinCAT writes into an .xti, the name is the one of the file
+_FILENAME = "__FILENAME__"
+_HEX = re.compile(r"^#x([0-9a-fA-F]+)$")
+
+Source = Union[Path, bytes]
+
+
+def _number(text: Optional[str]) -> Optional[int]:
+    """Numbers of the I/O configuration, decimal or hex like "#x1a00"."""
+    if text is None:
+        return None
+    match = _HEX.match(text.strip())
+    try:
+        return int(match.group(1), 16) if match else int(text)
+    except ValueError:
+        return None
+
+
+def _child_text(element, tag: str) -> Optional[str]:
+    # iterchildren does not compile a path like find, it is called per variable
+    for child in element.iterchildren(tag):
+        return None if child.text is None else child.text.strip()
+    return None
+
+
+def pdo_direction(pdo) -> str:
+    """
+    Direction of a pdo, outputs are RxPdos at index 0x1600 to 0x17ff.
+
+    Pdos written by the I/O configuration carry InOut="1" for outputs.
+    """
+    if pdo.get("InOut") is not None:
+        return "output" if pdo.get("InOut") == "1" else "input"
+    index = _number(pdo.get("Index"))
+    if index is not None and 0x1600 <= index < 0x1800:
+        return "output"
+    return "input"
+
+
+def _group_rows(element) -> Iterator[Tuple[str, str, str, str]]:
+    """(group, name, data type, direction) of the variables of a <Pdo> or <Vars>."""
+    if element.tag == "Pdo":
+        group = element.get("Name")
+        direction = pdo_direction(element)
+        for entry in element.iterchildren("Entry"):
+            name = entry.get("Name")
+            if name:
+                yield group, name, _child_text(entry, "Type"), direction
+    else:
+        group = _child_text(element, "Name")
+        direction = _GROUP_DIRECTIONS.get(element.get("VarGrpType"))
+        for var in element.iterchildren("Var"):
+            name = _child_text(var, "Name")
+            if name:
+                yield group, name, _child_text(var, "Type"), direction
+
+
+def parse_links(element, parent: Optional[tcd.Objects] = None) -> List[tcd.IoLink]:
+    """The links of a <Mappings> section."""
+    links = []
+    for owner_a in element.iterfind("OwnerA"):
+        for owner_b in owner_a.iterfind("OwnerB"):
+            for link in owner_b.iterfind("Link"):
+                links.append(
+                    tcd.IoLink(
+                        name=link.get("VarA", ""),
+                        parent=parent,
+                        owner_a=owner_a.get("Name", ""),
+                        var_a=link.get("VarA", ""),
+                        owner_b=owner_b.get("Name", ""),
+                        var_b=link.get("VarB", ""),
+                    )
+                )
+    return links
+
+
+class IoIndex:
+    """
+    Devices, boxes and process image variables of an I/O configuration.
+
+    The configuration is streamed with iterparse and every element is
+    cleared once it was read, an .xti of a few hundred megabytes is read in
+    the memory of its index. The index keeps one row per device, box and
+    variable in flat arrays of ids into a table of strings, the names of
+    channels and types repeat for every terminal. Devices become objects one
+    at a time with expand.
+
+        index = IoIndex.read(Path("_Config/IO/Device 1 (EtherCAT).xti"))
+        for identifier, data_type, direction in index.variables():
+            print(identifier, data_type, direction)
+        device = index.device("Device 1 (EtherCAT)")
+    """
+
+    def __init__(self):
+        self.strings: List[str] = [""]
+        self._string_ids: Dict[str, int] = {"": 0}
+        self._device_name = array("I")
+        self._device_id = array("i")
+        self._device_type = array("I")
+        self._device_file = array("I")
+        # first box and variable of every device, rows of a device are contiguous
+        self._device_boxes = array("I")
+        self._device_variables = array("I")
+        self._box_name = array("I")
+        self._box_parent = array("i")  # -1 for boxes of the device
+        self._box_id = array("i")
+        self._box_type = array("I")
+        self._box_file = array("I")
+        self._var_box = array("i")  # -1 for variables of the device
+        self._var_name = array("I")
+        self._var_group = array("I")
+        self._var_type = array("I")
+        self._var_direction = array("B")
+
+    def _string(self, text: Optional[str]) -> int:
+        if not text:
+            return 0
+        string = self._string_ids.get(text)
+        if string is None:
+            string = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string
+
+    # -- reading ------------------------------------------------------------
+
+    @classmethod
+    def read(cls, source: Source, path: Optional[Path] = None) -> "IoIndex":
+        """
+        Index the devices of an .xti, or of the Io section of a .tsproj.
+
+        Args:
+            source: The file, or its content as bytes.
+            path: The path of content given as bytes, to find the .xti files
+                of its boxes.
+        """
+        index = cls()
+        index.stream(source, path)
+        return index
+
+    def stream(
+        self,
+        source: Source,
+        path: Optional[Path] = None,
+        links: Optional[List[tcd.IoLink]] = None,
+        parent: Optional[tcd.Objects] = None,
+    ) -> None:
+        """
+        Add the devices of a file to the index, in one pass.
+
+        Args:
+            source: The file, or its content as bytes.
+            path: The path of content given as bytes.
+            links: Collects the links of the <Mappings> if given.
+            parent: The parent of the links.
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._stream(io.BytesIO(source), path, links, parent)
+        else:
+            self._stream(str(source), Path(source), links, parent)
+
+    def _stream(self, source, path, links, parent, stub: Optional[int] = None):
+        # open devices and boxes, (element, box row or None for a device)
+        owners: List[Tuple[object, Optional[int]]] = []
+        grouping = 0
+        for event, element in etree.iterparse(
+            source,
+            events=("start", "end"),
+            tag=_TAGS,
+            remove_comments=True,
+            resolve_entities=False,
+            huge_tree=True,
+        ):
+            tag = element.tag
+            if event == "start":
+                if tag in _GROUPS:
+                    grouping += 1
+                elif grouping:
+                    pass
+                elif tag == "Device":
+                    self._start_device(element, path)
+                    owners.append((element, None))
+                elif tag == "Box":
+                    if stub is not None and not owners:
+                        # the box of an .xti of its own fills the row of its stub
+                        row = self._fill_box(element, stub)
+                    else:
+                        row = self._start_box(element, owners, path)
+                    owners.append((element, row))
+                continue
+
+            if tag in _GROUPS:
+                grouping -= 1
+                if grouping:
+                    continue
+                if tag == "Mappings":
+                    if links is not None:
+                        links.extend(parse_links(element, parent))
+                elif owners and self._owns(owners[-1][0], element):
+                    self._add_variables(element, owners[-1][1])
+            elif grouping:
+                continue
+            elif tag == "Name" and owners and element.getparent() is owners[-1][0]:
+                self._set_name(element.text, owners[-1][1])
+            elif tag in ("Device", "Box") and owners:
+                owners.pop()
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    @staticmethod
+    def _owns(owner, element) -> bool:
+        """<Vars> are children of their device or box, <Pdo> are below <EtherCAT>."""
+        parent = element.getparent()
+        if element.tag == "Pdo" and parent is not None:
+            parent = parent.getparent()
+        return parent is owner
+
+    def _start_device(self, element, path: Optional[Path]):
+        file = element.get("File")
+        name = element.get("RemoteName") or (file and Path(file).stem)
+        if not name and path is not None and path.suffix.lower() == ".xti":
+            name = path.stem
+        self._device_name.append(self._string(name))
+        self._device_id.append(_number(element.get("Id")) or 0)
+        self._device_type.append(self._string(element.get("DevType")))
+        self._device_file.append(self._string(file))
+        self._device_boxes.append(len(self._box_name))
+        self._device_variables.append(len(self._var_name))
+
+    def _start_box(self, element, owners, path: Optional[Path]) -> int:
+        file = element.get("File")
+        row = len(self._box_name)
+        self._box_name.append(self._string(file and Path(file).stem))
+        self._box_parent.append(
+            owners[-1][1] if owners and owners[-1][1] is not None else -1
+        )
+        self._box_id.append(_number(element.get("Id")) or 0)
+        self._box_type.append(self._string(element.get("BoxType")))
+        self._box_file.append(self._string(file))
+        if file and path is not None and self._device_name:
+            # boxes stored in files of their own, in a folder named after their owner
+            box_path = path.parent / path.stem / file
+            if box_path.is_file():
+                self._stream(str(box_path), box_path, None, None, row)
+        return row
+
+    def _fill_box(self, element, row: int) -> int:
+        self._box_id[row] = _number(element.get("Id")) or self._box_id[row]
+        self._box_type[row] = self._string(element.get("BoxType"))
+        return row
+
+    def _set_name(self, text: Optional[str], box: Optional[int]):
+        text = (text or "").strip()
+        if not text or text == _FILENAME:
+            return
+        if box is None:
+            self._device_name[-1] = self._string(text)
+        else:
+            self._box_name[box] = self._string(text)
+
+    def _add_variables(self, element, box: Optional[int]):
+        string = self._string
+        for group, name, data_type, direction in _group_rows(element):
+            self._var_box.append(-1 if box is None else box)
+            self._var_name.append(string(name))
+            self._var_group.append(string(group))
+            self._var_type.append(string(data_type))
+            self._var_direction.append(_DIRECTIONS.index(direction))
+
+    # -- queries ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._var_name)
+
+    @property
+    def devices(self) -> List[str]:
+        return [self.strings[name] for name in self._device_name]
+
+    def _range(self, starts: array, total: int, device: int) -> range:
+        end = starts[device + 1] if device + 1 < len(starts) else total
+        return range(starts[device], end)
+
+    def _device_of(self, name: str) -> int:
+        for device, string in enumerate(self._device_name):
+            if self.strings[string] == name:
+                return device
+        raise KeyError(name)
+
+    def _box_paths(self, device: int) -> Dict[int, str]:
+        paths = {}
+        for box in self._range(self._device_boxes, len(self._box_name), device):
+            parent = self._box_parent[box]
+            prefix = (
+                self.strings[self._device_name[device]] if parent < 0 else paths[parent]
+            )
+            paths[box] = f"{prefix}^{self.strings[self._box_name[box]]}"
+        return paths
+
+    def variables(
+        self, device: Optional[str] = None
+    ) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        (identifier, data type, direction) of the variables, without objects.
+
+        The identifiers are the ones of IoVariable, like
+        "Device 1^Term 1 (EK1100)^Term 2 (EL1008)^Channel 1^Input".
+        """
+        devices = (
+            range(len(self._device_name))
+            if device is None
+            else [self._device_of(device)]
+        )
+        strings = self.strings
+        for number in devices:
+            paths = self._box_paths(number)
+            device_name = strings[self._device_name[number]]
+            for row in self._range(self._device_variables, len(self._var_name), number):
+                box = self._var_box[row]
+                owner = device_name if box < 0 else paths[box]
+                group = self._var_group[row]
+                name = strings[self._var_name[row]]
+                identifier = (
+                    f"{owner}^{strings[group]}^{name}" if group else f"{owner}^{name}"
+                )
+                yield (
+                    identifier,
+                    strings[self._var_type[row]] or None,
+                    _DIRECTIONS[self._var_direction[row]],
+                )
+
+    def device(self, name: str, parent: Optional[tcd.Objects] = None) -> tcd.IoDevice:
+        """A device by name with its boxes and variables."""
+        return self._device(self._device_of(name), parent).expand()
+
+    def stubs(
+        self, parent: Optional[tcd.Objects] = None, path: Optional[Path] = None
+    ) -> List[tcd.IoDevice]:
+        """
+        The devices without boxes and variables, which are created on expand.
+
+        Args:
+            parent: The parent of the devices.
+            path: The file the index was read from, devices with an .xti of
+                their own read it from _Config/IO next to this file.
+        """
+        devices = []
+        for number in range(len(self._device_name)):
+            device = self._device(number, parent)
+            if device.file and path is not None:
+                xti = path.parent / "_Config" / "IO" / device.file
+                if xti.is_file():
+                    device._index = XtiFile(xti)
+                    device.index_path = xti
+                else:
+                    device._index = None
+            devices.append(device)
+        return devices
+
+    def _device(self, number: int, parent: Optional[tcd.Objects]) -> tcd.IoDevice:
+        strings = self.strings
+        return tcd.IoDevice(
+            name=strings[self._device_name[number]],
+            parent=parent,
+            id=self._device_id[number],
+            device_type=strings[self._device_type[number]] or None,
+            file=strings[self._device_file[number]] or None,
+            _index=self,
+        )
+
+    def expand(self, device: tcd.IoDevice) -> None:
+        """Create the boxes and variables of a device, used by IoDevice.expand."""
+        number = self._device_of(device.name)
+        strings = self.strings
+        boxes: Dict[int, tcd.IoBox] = {}
+        for row in self._range(self._device_boxes, len(self._box_name), number):
+            parent = self._box_parent[row]
+            owner = device if parent < 0 else boxes[parent]
+            box = boxes[row] = tcd.IoBox(
+                name=strings[self._box_name[row]],
+                parent=owner,
+                id=self._box_id[row],
+                box_type=strings[self._box_type[row]] or None,
+                file=strings[self._box_file[row]] or None,
+            )
+            owner.boxes.append(box)
+        for row in self._range(self._device_variables, len(self._var_name), number):
+            box = self._var_box[row]
+            owner = device if box < 0 else boxes[box]
+            owner.variables.append(
+                tcd.IoVariable(
+                    name=strings[self._var_name[row]],
+                    parent=owner,
+                    group=strings[self._var_group[row]] or None,
+                    data_type=strings[self._var_type[row]] or None,
+                    direction=_DIRECTIONS[self._var_direction[row]],
+                )
+            )
+
+
+class XtiFile:
+    """A device in an .xti of its own, indexed when the device is expanded."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def expand(self, device: tcd.IoDevice) -> None:
+        index = IoIndex.read(self.path)
+        if not index.devices:
+            logger.error(f"no device in: {self.path}")
+            return
+        # the device keeps the name it has in the project
+        index._device_name[0] = index._string(device.name)
+        index.expand(device)
+
+
+class ProjectSections:
+    """
+    Reads the Io and Mappings sections of a .tsproj when they are used first.
+
+    A TwinCAT project with its I/O configuration inline can be tens of
+    megabytes, most of it in these sections, which nothing needs to list
+    tasks or plc projects. Both are read in one pass, the devices into an
+    IoIndex.
+    """
+
+    def __init__(self, source: Source, path: Path):
+        self.source = source
+        self.path = path
+        self._lock = threading.Lock()
+        self._devices: Optional[List[tcd.IoDevice]] = None
+        self._links: Optional[List[tcd.IoLink]] = None
+
+    def __getstate__(self):
+        # pickled with its project by the source cache, sections are read again
+        return {"source": self.source, "path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["source"], state["path"])
+
+    @property
+    def loaded(self) -> bool:
+        return self._devices is not None
+
+    def _load(self, project: tcd.Objects) -> None:
+        with self._lock:
+            if self._devices is not None:
+                return
+            index = IoIndex()
+            links: List[tcd.IoLink] = []
+            index.stream(self.source, self.path, links, project)
+            self._links = links
+            # devices inline in the project are complete, only those stored
+            # in an .xti of their own are read on expand
+            self._devices = [
+                device if device.file else device.expand()
+                for device in index.stubs(project, self.path)
+            ]
+
+    def devices(self, project: tcd.Objects) -> List[tcd.IoDevice]:
+        self._load(project)
+        return self._devices
+
+    def links(self, project: tcd.Objects) -> List[tcd.IoLink]:
+        self._load(project)
+        return self._links
@@ -0,0 +1,163 @@
+import marshal
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import TwincatDataclasses as tcd
+from .Reachability import is_program
+
+IO_MAPPING_VERSION = 1
+# owner of the plc side of a link, "TIPC^Machine^Machine Instance"
+_PLC_OWNER = "TIPC"
+
+
+def _split_owner(owner: str) -> Tuple[str, str]:
+    """("TIID", "Device 1^Term 1") of "TIID^Device 1^Term 1"."""
+    kind, _, path = owner.partition("^")
+    return kind, path
+
+
+def link_ends(link: tcd.IoLink) -> Optional[Tuple[str, str, str]]:
+    """
+    (plc project, plc variable, channel) of a link between a plc and the I/O.
+
+    The plc variable drops the name of its process image, "PlcTask
+    Inputs^GVL_IO.bDoorClosed" becomes "GVL_IO.bDoorClosed". The channel is
+    written like the identifier of an IoVariable. Links between two devices
+    return None.
+    """
+    ends = [(link.owner_a, link.var_a), (link.owner_b, link.var_b)]
+    plc = [end for end in ends if _split_owner(end[0])[0] == _PLC_OWNER]
+    if len(plc) != 1:
+        return None
+    (plc_owner, plc_var), (io_owner, io_var) = ends if ends[0] is plc[0] else ends[::-1]
+    project = _split_owner(plc_owner)[1].split("^")[0]
+    variable = plc_var.rpartition("^")[2]
+    io_path = _split_owner(io_owner)[1]
+    channel = f"{io_path}^{io_var}" if io_path else io_var
+    return project, variable, channel
+
+
+class IoMapping:
+    """
+    Which channel a plc variable is linked to, and which variables a channel is.
+
+    The links come from the mappings of the loaded TwinCAT projects, the
+    declarations "bDoorClosed AT %I* : BOOL;" of gvls, programs and function
+    blocks add the addresses. Everything is read in one pass over the
+    objects into hash maps in both directions, keyed case insensitive.
+
+        mapping = IoMapping(objects)
+        mapping.channels("GVL_IO.bDoorClosed")
+        # ["Device 1 (EtherCAT)^Term 1 (EK1100)^Term 2 (EL1008)^Channel 1^Input"]
+        mapping.variables("Device 1 (EtherCAT)^...^Channel 1^Input")
+        # ["GVL_IO.bDoorClosed"]
+    """
+
+    def __init__(self, objects: Iterable[tcd.Objects] = ()):
+        # (plc project, variable, channel) per link
+        self._links: List[Tuple[str, str, str]] = []
+        self._by_variable: Dict[str, List[int]] = {}
+        self._by_channel: Dict[str, List[int]] = {}
+        # variable -> (variable, address, declared in a gvl or program)
+        self._addresses: Dict[str, Tuple[str, str, bool]] = {}
+        self.add(objects)
+
+    def add(self, objects: Iterable[tcd.Objects]) -> None:
+        """Add the links of projects and the located variables of the objects."""
+        for obj in tcd.iter_objects(objects):
+            if isinstance(obj, tcd.TwincatProject):
+                for link in obj.mappings:
+                    ends = link_ends(link)
+                    if ends is not None:
+                        self._add_link(*ends)
+            elif isinstance(obj, tcd.Variable) and obj.address:
+                parent = tcd.unwrap(obj.parent)
+                if not isinstance(parent, (tcd.Gvl, tcd.Pou)):
+                    continue
+                variable = f"{parent.name}.{obj.name}"
+                self._addresses[variable.casefold()] = (
+                    variable,
+                    obj.address,
+                    isinstance(parent, tcd.Gvl) or is_program(parent),
+                )
+
+    def _add_link(self, project: str, variable: str, channel: str) -> None:
+        link = len(self._links)
+        self._links.append((project, variable, channel))
+        self._by_variable.setdefault(variable.casefold(), []).append(link)
+        self._by_channel.setdefault(channel.casefold(), []).append(link)
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+    # -- queries ------------------------------------------------------------
+
+    def channels(self, variable: str) -> List[str]:
+        """
+        The channels a plc variable is linked to.
+
+        Args:
+            variable: The path of the variable in its plc project, e.g.
+                "GVL_IO.bDoorClosed" or "MAIN.fbDoor.bSensor".
+        """
+        return [
+            self._links[link][2]
+            for link in self._by_variable.get(variable.casefold(), ())
+        ]
+
+    def variables(self, channel: str) -> List[str]:
+        """The plc variables linked to a channel, like "Device 1^Term 2^Channel 1^Input"."""
+        return [
+            self._links[link][1]
+            for link in self._by_channel.get(channel.casefold(), ())
+        ]
+
+    def project(self, variable: str) -> Optional[str]:
+        """The plc project whose variable is linked, None if it is not linked."""
+        links = self._by_variable.get(variable.casefold())
+        return self._links[links[0]][0] if links else None
+
+    def address(self, variable: str) -> Optional[str]:
+        """The address of a variable declared with AT, like "%I*"."""
+        declared = self._addresses.get(variable.casefold())
+        return None if declared is None else declared[1]
+
+    def unlinked(self) -> List[str]:
+        """
+        Variables of gvls and programs declared with %I* or %Q* but not linked.
+
+        Variables of function blocks are linked per instance, their paths are
+        only known from the mappings.
+        """
+        return [
+            variable
+            for key, (variable, address, static) in self._addresses.items()
+            if static and address.endswith("*") and key not in self._by_variable
+        ]
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Save the links and addresses, a loaded mapping needs no objects."""
+        payload = (
+            IO_MAPPING_VERSION,
+            self._links,
+            list(self._addresses.values()),
+        )
+        Path(path).write_bytes(marshal.dumps(payload, 4))
+
+    @classmethod
+    def load(cls, path: Path) -> "IoMapping":
+        """Load a mapping written by save."""
+        payload = marshal.loads(Path(path).read_bytes())
+        if not isinstance(payload, tuple) or payload[0] != IO_MAPPING_VERSION:
+            raise ValueError(
+                f"{path} is not an I/O mapping of version {IO_MAPPING_VERSION}"
+            )
+        _, links, addresses = payload
+        mapping = cls()
+        for link in links:
+            mapping._add_link(*link)
+        for declared in addresses:
+            mapping._addresses[declared[0].casefold()] = tuple(declared)
+        return mapping
@@ -0,0 +1,527 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from . import TwincatDataclasses as tcd
+from .parse_implementation import Token, tokenize
+from .TypeTable import TypeTable
+
+# sizes of the elementary types, alignment is the size
+_ELEMENTARY = {
+    "BOOL": 1,
+    "BYTE": 1,
+    "SINT": 1,
+    "USINT": 1,
+    "WORD": 2,
+    "INT": 2,
+    "UINT": 2,
+    "WCHAR": 2,
+    "DWORD": 4,
+    "DINT": 4,
+    "UDINT": 4,
+    "REAL": 4,
+    "TIME": 4,
+    "TOD": 4,
+    "TIME_OF_DAY": 4,
+    "DATE": 4,
+    "DT": 4,
+    "DATE_AND_TIME": 4,
+    "LWORD": 8,
+    "LINT": 8,
+    "ULINT": 8,
+    "LREAL": 8,
+    "LTIME": 8,
+    "LDATE": 8,
+    "LTOD": 8,
+    "LDT": 8,
+}
+# types as wide as a pointer of the target
+_POINTER_WIDE = ("PVOID", "XWORD", "XINT", "UXINT", "__XWORD", "__XINT", "__UXINT")
+# the values of {attribute 'pack_mode'}, 0 packs without gaps like 1
+_PACK_MODES = {"0": 1, "1": 1, "2": 2, "4": 4, "8": 8}
+# sections whose variables are not part of an instance
+_NOT_INSTANCE = ("var_temp", "var_stat", "var_global")
+
+_ARRAY = re.compile(r"^ARRAY\s*\[(.*?)\]\s*OF\s+(.+)$", re.IGNORECASE | re.DOTALL)
+_STRING = re.compile(r"^(W?STRING)\s*(?:[(\[](.*)[)\]])?$", re.IGNORECASE | re.DOTALL)
+_INDIRECT = re.compile(r"^(?:POINTER|REFERENCE)\s+TO\s+", re.IGNORECASE)
+_PACK_MODE = re.compile(
+    r"\{\s*attribute\s+'pack_mode'\s*:=\s*'(\d)'\s*\}", re.IGNORECASE
+)
+# the kind of a pou or dut, after comments and pragmas
+_PREAMBLE = r"^(?:\s|\(\*[\s\S]*?\*\)|//[^\n]*|\{[^}]*\})*"
+_POU_KIND = re.compile(_PREAMBLE + r"(FUNCTION_BLOCK|PROGRAM)\b", re.IGNORECASE)
+_DUT_HEAD = re.compile(
+    _PREAMBLE
+    + r"TYPE\s+[\w.]+\s*(?:EXTENDS\s+([\w.]+)\s*)?:\s*(.*?)\s*(?:;\s*)?END_TYPE",
+    re.IGNORECASE | re.DOTALL,
+)
+_COMMENTS = re.compile(r"\(\*[\s\S]*?\*\)|//[^\n]*")
+# the body of an enumeration and its base type, "( a, b ) UDINT"
+_ENUM = re.compile(r"^\((.*)\)\s*([\w.]*)$", re.DOTALL)
+_DEFAULT_STRING_LENGTH = 80
+
+
+@dataclass
+class Member:
+    """A variable in the layout of its type, offset in bytes from the start."""
+
+    name: str
+    type: str
+    offset: int
+    size: int
+    alignment: int
+    # position of a BIT in its byte
+    bit: Optional[int] = None
+
+
+@dataclass
+class TypeLayout:
+    """Size and alignment of a type, the members of structs and function blocks."""
+
+    name: str
+    size: int
+    alignment: int
+    members: List[Member] = field(default_factory=list)
+
+
+def _is_constant(variable: tcd.Variable) -> bool:
+    modifier = variable.section_modifier or []
+    if isinstance(modifier, str):
+        modifier = [modifier]
+    return any(item.upper() == "CONSTANT" for item in modifier)
+
+
+def _literal(text: str) -> Optional[int]:
+    """Integer literals, 42, 1_000, 16#FF, 2#1010 and typed ones like INT#5."""
+    text = text.replace("_", "")
+    parts = text.split("#")
+    if len(parts) == 3:  # INT#16#FF
+        parts = parts[1:]
+    try:
+        if len(parts) == 2:
+            if parts[0].isdigit():
+                return int(parts[1], int(parts[0]))
+            return int(parts[1])
+        return int(parts[0])
+    except ValueError:
+        return None
+
+
+class _Expression:
+    """Integer constant expressions with + - * / MOD and names of constants."""
+
+    def __init__(self, tokens: List[Token], lookup):
+        self.tokens = [token for token in tokens if token.kind != "eof"]
+        self.position = 0
+        self.lookup = lookup
+
+    def _peek(self) -> Optional[Token]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def _take(self) -> Optional[Token]:
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def value(self) -> Optional[int]:
+        result = self._sum()
+        if self._peek() is not None:
+            return None
+        return result
+
+    def _sum(self) -> Optional[int]:
+        left = self._product()
+        while left is not None:
+            token = self._peek()
+            if token is None or token.kind != "op" or token.value not in "+-":
+                break
+            self._take()
+            right = self._product()
+            if right is None:
+                return None
+            left = left + right if token.value == "+" else left - right
+        return left
+
+    def _product(self) -> Optional[int]:
+        left = self._factor()
+        while left is not None:
+            token = self._peek()
+            if token is None:
+                break
+            operator = token.value.upper()
+            if operator not in ("*", "/", "MOD"):
+                break
+            self._take()
+            right = self._factor()
+            if right is None or (operator != "*" and right == 0):
+                return None
+            if operator == "*":
+                left = left * right
+            elif operator == "/":
+                left = int(left / right)
+            else:
+                left = left - right * int(left / right)
+        return left
+
+    def _factor(self) -> Optional[int]:
+        token = self._take()
+        if token is None:
+            return None
+        if token.kind == "op" and token.value in "+-":
+            value = self._factor()
+            if value is None:
+                return None
+            return -value if token.value == "-" else value
+        if token.kind == "op" and token.value == "(":
+            value = self._sum()
+            closing = self._take()
+            if closing is None or closing.value != ")":
+                return None
+            return value
+        if token.kind in ("number", "typed"):
+            return _literal(token.value)
+        if token.kind == "ident":
+            names = [token.value]
+            while True:
+                dot = self._peek()
+                if dot is None or dot.kind != "op" or dot.value != ".":
+                    break
+                self._take()
+                name = self._take()
+                if name is None or name.kind != "ident":
+                    return None
+                names.append(name.value)
+            return self.lookup(names)
+        return None
+
+
+class Layout:
+    """
+    Sizes, alignments and member offsets of structs, unions and function blocks.
+
+    Follows the layout of TwinCAT 3 on x64: members are aligned to their
+    size up to the pack mode (8, or the {attribute 'pack_mode'} of the
+    type), consecutive BITs share a byte and a type is padded to its largest
+    alignment. Function block instances start with the pointer to their
+    virtual function table, inputs, outputs, locals and the VAR_INST of
+    methods follow in declaration order. Array bounds and string lengths may
+    name constants of gvls or of the type itself.
+
+    Every type is laid out once and memoised, so the layouts of a whole
+    library come from one pass in which each type reuses the layouts of its
+    members. A type which contains itself, directly or through other types,
+    has no layout.
+
+        layout = Layout(objects)
+        layout.sizeof("ST_AxisData")
+        for member in layout.of("FB_Axis").members:
+            print(member.offset, member.name, member.size)
+    """
+
+    def __init__(
+        self,
+        objects: Iterable[tcd.Objects],
+        pointer_size: int = 8,
+        pack_mode: int = 8,
+    ):
+        self.objects: List[tcd.Objects] = list(tcd.iter_objects(objects))
+        self.table = TypeTable(self.objects)
+        self.pointer_size = pointer_size
+        self.pack_mode = pack_mode
+        self._constants: Dict[str, tcd.Variable] = {}
+        for gvl in self.table.gvls.values():
+            for variable in gvl.variables:
+                if _is_constant(variable):
+                    self._constants.setdefault(variable.name.casefold(), variable)
+                    self._constants.setdefault(
+                        f"{gvl.name}.{variable.name}".casefold(), variable
+                    )
+        self._layouts: Dict[int, Optional[TypeLayout]] = {}
+        self._values: Dict[int, Optional[int]] = {}
+        self._visiting: Set[int] = set()
+
+    # -- constants ----------------------------------------------------------
+
+    def constant(
+        self, expression: str, owner: Optional[tcd.Objects] = None
+    ) -> Optional[int]:
+        """Value of an integer constant expression, like "GVL.cMax - 1"."""
+        return _Expression(
+            tokenize(expression), lambda names: self._named_value(names, owner)
+        ).value()
+
+    def _named_value(
+        self, names: List[str], owner: Optional[tcd.Objects]
+    ) -> Optional[int]:
+        variable = None
+        if owner is not None and len(names) == 1:
+            for local in getattr(owner, "variables", None) or []:
+                if _is_constant(local) and local.name.casefold() == names[0].casefold():
+                    variable = local
+                    break
+        if variable is None:
+            # GVL.cMax, Lib.GVL.cMax or a constant of a gvl without qualified_only
+            key = ".".join(names[-2:]).casefold()
+            variable = self._constants.get(key) or self._constants.get(
+                names[-1].casefold()
+            )
+        if variable is None or not variable.initial_value:
+            return None
+        key = id(variable)
+        if key in self._values:
+            return self._values[key]
+        self._values[key] = None  # a constant defined by itself has no value
+        parent = tcd.unwrap(variable.parent)
+        value = self.constant(variable.initial_value, parent)
+        self._values[key] = value
+        return value
+
+    # -- layouts ------------------------------------------------------------
+
+    def sizeof(
+        self, type_name: str, owner: Optional[tcd.Objects] = None
+    ) -> Optional[int]:
+        """Size of a type in bytes, None if a part of it is not known."""
+        layout = self.of(type_name, owner)
+        return None if layout is None else layout.size
+
+    def of(
+        self, type_name: str, owner: Optional[tcd.Objects] = None
+    ) -> Optional[TypeLayout]:
+        """
+        Layout of a type.
+
+        Args:
+            type_name: Any type of a declaration, "ST_Data", "STRING(20)" or
+                "ARRAY[0..GVL.cMax] OF LREAL".
+            owner: The type the declaration is part of, for its constants.
+        """
+        type_name = type_name.strip()
+        upper = type_name.upper()
+        if upper in _ELEMENTARY:
+            size = _ELEMENTARY[upper]
+            return TypeLayout(type_name, size, size)
+        if upper in _POINTER_WIDE or _INDIRECT.match(type_name):
+            return TypeLayout(type_name, self.pointer_size, self.pointer_size)
+        if upper == "BIT":
+            return TypeLayout(type_name, 1, 1)
+
+        string = _STRING.match(type_name)
+        if string:
+            length = (
+                _DEFAULT_STRING_LENGTH
+                if string.group(2) is None
+                else self.constant(string.group(2), owner)
+            )
+            if length is None:
+                return None
+            if string.group(1).upper() == "WSTRING":
+                return TypeLayout(type_name, 2 * (length + 1), 2)
+            return TypeLayout(type_name, length + 1, 1)
+
+        array = _ARRAY.match(type_name)
+        if array:
+            element = self.of(array.group(2), owner)
+            count = self._count(array.group(1), owner)
+            if element is None or count is None:
+                return None
+            return TypeLayout(type_name, element.size * count, element.alignment)
+
+        obj = self.table.type_of(type_name)
+        if isinstance(obj, tcd.Itf):
+            return TypeLayout(type_name, self.pointer_size, self.pointer_size)
+        if isinstance(obj, (tcd.Dut, tcd.Pou)):
+            return self.type_layout(obj)
+        return None
+
+    def _count(self, dimensions: str, owner: Optional[tcd.Objects]) -> Optional[int]:
+        count = 1
+        depth = 0
+        start = 0
+        parts = []
+        for position, char in enumerate(dimensions):
+            if char in "([":
+                depth += 1
+            elif char in ")]":
+                depth -= 1
+            elif char == "," and depth == 0:
+                parts.append(dimensions[start:position])
+                start = position + 1
+        parts.append(dimensions[start:])
+        for part in parts:
+            low, separator, high = part.partition("..")
+            if not separator:
+                return None  # ARRAY[*] of a VAR_IN_OUT
+            low = self.constant(low, owner)
+            high = self.constant(high, owner)
+            if low is None or high is None or high < low:
+                return None
+            count *= high - low + 1
+        return count
+
+    def type_layout(self, obj: tcd.Objects) -> Optional[TypeLayout]:
+        """Layout of a dut or of the instance of a function block or program."""
+        key = id(obj)
+        if key in self._layouts:
+            return self._layouts[key]
+        if key in self._visiting:
+            return None
+        self._visiting.add(key)
+        try:
+            if isinstance(obj, tcd.Dut):
+                layout = self._dut(obj)
+            else:
+                layout = self._pou(obj)
+        finally:
+            self._visiting.discard(key)
+        self._layouts[key] = layout
+        return layout
+
+    def layouts(self) -> Dict[str, Optional[TypeLayout]]:
+        """Layouts of all loaded duts, function blocks and programs by identifier."""
+        result = {}
+        for obj in self.objects:
+            if isinstance(obj, tcd.Dut) or (
+                isinstance(obj, tcd.Pou) and _POU_KIND.match(obj.declaration or "")
+            ):
+                result[obj.get_identifier()] = self.type_layout(obj)
+        return result
+
+    def _pack(self, obj: tcd.Objects) -> int:
+        match = _PACK_MODE.search(obj.declaration or "")
+        return (
+            _PACK_MODES.get(match.group(1), self.pack_mode) if match else self.pack_mode
+        )
+
+    def _dut(self, dut: tcd.Dut) -> Optional[TypeLayout]:
+        head = _DUT_HEAD.match(_COMMENTS.sub(" ", dut.declaration or ""))
+        body = head.group(2).strip() if head else ""
+        upper = body.upper()
+        if upper.startswith("STRUCT"):
+            base = self.of(head.group(1), dut) if head.group(1) else None
+            if head.group(1) and base is None:
+                return None
+            return self._struct(dut, dut.variables, base)
+        if upper.startswith("UNION"):
+            return self._union(dut)
+        enum = _ENUM.match(body)
+        if enum:
+            base = self.of(enum.group(2) or "INT", dut)
+            return (
+                None
+                if base is None
+                else TypeLayout(dut.name, base.size, base.alignment)
+            )
+        if body:
+            # an alias, TYPE T_Name : STRING(30); END_TYPE
+            alias = self.of(body.split(":=")[0], dut)
+            return (
+                None
+                if alias is None
+                else TypeLayout(dut.name, alias.size, alias.alignment)
+            )
+        return None
+
+    def _pou(self, pou: tcd.Pou) -> Optional[TypeLayout]:
+        kind = _POU_KIND.match(pou.declaration or "")
+        if kind is None:
+            return None  # functions have no instance
+        base = None
+        for name in getattr(pou, "extends", None) or []:
+            base = self.of(name, pou)
+            if base is None:
+                return None
+        variables = [
+            variable
+            for variable in pou.variables
+            if variable.section_type not in _NOT_INSTANCE and not _is_constant(variable)
+        ]
+        for method in pou.methods:
+            variables.extend(
+                variable
+                for variable in method.variables
+                if variable.section_type == "var_inst"
+            )
+        hidden = []
+        if base is None and kind.group(1).upper() == "FUNCTION_BLOCK":
+            hidden = [
+                Member(
+                    "__VFTABLE",
+                    "POINTER TO BYTE",
+                    0,
+                    self.pointer_size,
+                    self.pointer_size,
+                )
+            ]
+        return self._struct(pou, variables, base, hidden)
+
+    def _member_layout(self, variable: tcd.Variable, owner) -> Optional[TypeLayout]:
+        if variable.section_type == "var_in_out":
+            # passed by reference
+            return TypeLayout(variable.type, self.pointer_size, self.pointer_size)
+        return self.of(variable.type, owner)
+
+    def _struct(
+        self,
+        owner: tcd.Objects,
+        variables: List[tcd.Variable],
+        base: Optional[TypeLayout],
+        hidden: List[Member] = (),
+    ) -> Optional[TypeLayout]:
+        pack = self._pack(owner)
+        members: List[Member] = list(base.members) if base is not None else list(hidden)
+        offset = (
+            base.size if base is not None else sum(member.size for member in hidden)
+        )
+        alignment = (
+            base.alignment
+            if base is not None
+            else max([member.alignment for member in hidden] or [1])
+        )
+        bit = None  # next free bit of the byte at offset - 1
+        for variable in variables:
+            if variable.type.strip().upper() == "BIT":
+                if bit is None or bit == 8:
+                    bit = 0
+                    offset += 1
+                members.append(
+                    Member(variable.name, variable.type, offset - 1, 1, 1, bit)
+                )
+                bit += 1
+                continue
+            bit = None
+            layout = self._member_layout(variable, owner)
+            if layout is None:
+                return None
+            member_alignment = min(layout.alignment, pack)
+            offset = -(-offset // member_alignment) * member_alignment
+            members.append(
+                Member(
+                    variable.name, variable.type, offset, layout.size, member_alignment
+                )
+            )
+            offset += layout.size
+            alignment = max(alignment, member_alignment)
+        size = -(-offset // alignment) * alignment
+        return TypeLayout(owner.name, size, alignment, members)
+
+    def _union(self, dut: tcd.Dut) -> Optional[TypeLayout]:
+        pack = self._pack(dut)
+        members = []
+        size = 0
+        alignment = 1
+        for variable in dut.variables:
+            layout = self._member_layout(variable, dut)
+            if layout is None:
+                return None
+            member_alignment = min(layout.alignment, pack)
+            members.append(
+                Member(variable.name, variable.type, 0, layout.size, member_alignment)
+            )
+            size = max(size, layout.size)
+            alignment = max(alignment, member_alignment)
+        size = -(-size // alignment) * alignment
+        return TypeLayout(dut.name, size, alignment, members)
@@ -0,0 +1,194 @@
+import bisect
+import os
+import threading
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from lxml import etree
+
+from . import TwincatDataclasses as tcd
+from .BaseSource import BaseSource
+
+# elements of a TcPOU, TcDUT, ... file holding a named object
+_NAMED = ("POU", "DUT", "GVL", "Itf", "Method", "Property")
+_ACCESSORS = {"Get": "get", "Set": "set"}
+
+
+class LineIndex:
+    """
+    Start offsets of the lines of a text.
+
+    Maps an offset to its line and column in O(log n), lines and columns
+    start at 1.
+    """
+
+    __slots__ = ("starts", "length")
+
+    def __init__(self, text: str):
+        starts = array("I", [0])
+        position = text.find("\n")
+        while position != -1:
+            starts.append(position + 1)
+            position = text.find("\n", position + 1)
+        self.starts = starts
+        self.length = len(text)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Line and column of an offset."""
+        line = bisect.bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+    def line(self, offset: int) -> int:
+        """Line of an offset."""
+        return bisect.bisect_right(self.starts, offset)
+
+    def offset(self, line: int, column: int = 1) -> int:
+        """Offset of a line and column, the inverse of position."""
+        if not 1 <= line <= len(self.starts):
+            raise IndexError(f"line {line} out of range")
+        return min(self.starts[line - 1] + column - 1, self.length)
+
+
+@lru_cache(maxsize=4096)
+def line_index(text: str) -> LineIndex:
+    """LineIndex of a text, cached for declarations and implementations seen before."""
+    return LineIndex(text)
+
+
+_source_lock = threading.Lock()
+_source_cache: Dict[str, Tuple[int, Dict[tuple, int]]] = {}
+
+
+def _scan(path: Path, data: Optional[bytes] = None) -> Dict[tuple, int]:
+    """Line of the first text line of every declaration and implementation in a file."""
+    lines: Dict[tuple, int] = {}
+
+    def visit(element, key: tuple):
+        for child in element:
+            tag = child.tag
+            if not isinstance(tag, str):
+                continue
+            if tag in _NAMED:
+                visit(child, key + (child.get("Name"),))
+            elif tag in _ACCESSORS:
+                visit(child, key + (_ACCESSORS[tag],))
+            elif tag == "Declaration":
+                lines[key + ("declaration",)] = child.sourceline
+            elif tag == "Implementation":
+                st = child.find("ST")
+                if st is not None:
+                    lines[key + ("implementation",)] = st.sourceline
+
+    parser = etree.XMLParser(remove_comments=True, resolve_entities=False)
+    if data is None:
+        root = etree.parse(str(path), parser).getroot()
+    else:
+        root = etree.fromstring(data, parser)
+    visit(root, ())
+    return lines
+
+
+def source_lines(path: Path) -> Dict[tuple, int]:
+    """
+    Lines of the declarations and implementations in a file, cached by mtime.
+
+    The keys are the names down to the text, like ("FB_Base", "_Enabling",
+    "declaration") or ("FB_Base", "Reset", "get", "implementation").
+    """
+    key = str(path)
+    mtime = os.stat(key).st_mtime_ns
+    with _source_lock:
+        cached = _source_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    lines = _scan(path)
+    with _source_lock:
+        _source_cache[key] = (mtime, lines)
+    return lines
+
+
+def _source_lines(source: BaseSource, name: str) -> Dict[tuple, int]:
+    """source_lines of a file of a source, cached by the content key of the file."""
+    content = source.key(name)
+    if content is None:
+        return _scan(Path(name), source.read(name))
+    key = f"{type(source).__name__}:{content}"
+    with _source_lock:
+        cached = _source_cache.get(key)
+        if cached is not None:
+            return cached[1]
+    lines = _scan(Path(name), source.read(name))
+    with _source_lock:
+        _source_cache[key] = (0, lines)
+    return lines
+
+
+def source_line(
+    obj: tcd.Objects,
+    part: str = "declaration",
+    line: int = 1,
+    accessor: Optional[str] = None,
+    source: Optional[BaseSource] = None,
+) -> Optional[int]:
+    """
+    Map a line of a declaration or implementation to the line in its file.
+
+    TwinCAT writes the texts as CDATA starting on the line of their element,
+    so the first text line is the line of <Declaration> or <ST>.
+
+    Args:
+        obj: A pou, interface, dut, gvl, method, property or variable.
+            Variables use the start of their span in the declaration.
+        part: "declaration" or "implementation".
+        line: The line in the text, starting at 1.
+        accessor: "get" or "set" for the texts of a property accessor.
+        source: The source the object was loaded from with load_source, its
+            file is read from there instead of the disk.
+
+    Returns:
+        The line in the file, None if the object was not loaded from a file
+        or is not found in it.
+    """
+    if isinstance(obj, tcd.Variable):
+        if obj.span is None:
+            return None
+        owner = tcd.unwrap(obj.parent)
+        declaration = getattr(owner, "declaration", None)
+        if not declaration:
+            return None
+        return source_line(
+            owner,
+            "declaration",
+            line_index(declaration).line(obj.span[0]),
+            source=source,
+        )
+
+    names = [obj.name]
+    parent = tcd.unwrap(obj.parent)
+    if isinstance(obj, (tcd.Method, tcd.Property)):
+        if parent is None:
+            return None
+        names.insert(0, parent.name if isinstance(parent, tcd.Base) else parent)
+    if accessor is not None:
+        names.append(accessor.lower())
+    path = tcd.source_path(obj)
+    if path is None:
+        return None
+    if source is not None:
+        name = source.name_of(path)
+        if name is None or source.path_index.lookup(name) != name:
+            return None
+        lines = _source_lines(source, name)
+    elif os.path.isfile(path):
+        lines = source_lines(path)
+    else:
+        return None
+    start = lines.get(tuple(names) + (part,))
+    if start is None:
+        return None
+    return start + line - 1
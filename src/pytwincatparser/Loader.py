@@ -1,7 +1,9 @@
+from .BaseIndex import BaseIndex
+from .BaseSource import BaseSource
 from .BaseStrategy import BaseStrategy
-from typing import List
+from typing import BinaryIO, Iterable, List
 from pathlib import Path
-from .TwincatDataclasses import Objects
+from .TwincatDataclasses import Objects, weaken_parents
 
 
 _strategies: List[BaseStrategy] = []
@@ -31,8 +33,16 @@ def get_strategy_by_object_path(path: Path) -> BaseStrategy:
 
 
 class Loader:
-    def __init__(self, loader_strategy: BaseStrategy):
+    def __init__(self, loader_strategy: BaseStrategy, weak_parents: bool = False):
+        """
+        Args:
+            loader_strategy: The strategy which loads the files.
+            weak_parents: Link children to their parents with weak proxies, so
+                the loaded model holds no reference cycles. See weaken_parents.
+        """
         self._strategy = loader_strategy
+        self.weak_parents = weak_parents
+        self._indexes: List[BaseIndex] = []
 
     @property
     def strategy(self) -> BaseStrategy:
@@ -42,9 +52,134 @@ class Loader:
     def strategy(self, strategy: BaseStrategy) -> None:
         self._strategy = strategy
 
+    @property
+    def indexes(self) -> List[BaseIndex]:
+        return self._indexes
+
+    def add_index(self, index: BaseIndex) -> BaseIndex:
+        """Keep an index up to date with everything this loader loads from now on."""
+        self._indexes.append(index)
+        return index
+
     def load_objects(self, path: Path) -> List[Objects] | None:
         _path = Path(path)
-        return self._strategy.load_objects(path=_path)
+        return self._loaded(self._strategy.load_objects(path=_path))
+
+    def load_bytes(
+        self,
+        data: bytes | bytearray | memoryview,
+        path: Path | str,
+        root: Path | str | None = None,
+    ) -> List[Objects]:
+        """
+        Load a file from memory, e.g. a member of an archive or a cached download.
+
+        Args:
+            data: The content of the file. It is parsed by lxml in place.
+            path: Virtual path of the file. Its suffix selects the handler and it
+                becomes the path of the loaded objects, it does not have to exist.
+            root: Folder on disk the files of a .plcproj or .tsproj are loaded
+                from. Without it nothing but data is read and the includes
+                keep paths joined to the folder of path.
+
+        Returns:
+            The loaded objects.
+        """
+        return self._loaded(
+            self._strategy.load_data(
+                path=Path(path), data=data, root=None if root is None else Path(root)
+            )
+        )
+
+    def load_stream(
+        self, stream: BinaryIO, path: Path | str, root: Path | str | None = None
+    ) -> List[Objects]:
+        """Load a file from an open binary stream, see load_bytes."""
+        return self._loaded(
+            self._strategy.load_data(
+                path=Path(path), data=stream, root=None if root is None else Path(root)
+            )
+        )
+
+    def load_tree(
+        self,
+        root: Path,
+        include: List[str] | None = None,
+        exclude: List[str] | None = None,
+        name_space: str | None = None,
+        max_workers: int | None = None,
+    ) -> List[Objects]:
+        """
+        Load every TwinCAT object file below a folder, without a .plcproj.
+
+        Args:
+            root: The folder to scan.
+            include: Glob patterns (relative to root, case-insensitive) a file has to match.
+            exclude: Glob patterns of files to skip.
+            name_space: Namespace of the objects, defaults to the folder name.
+            max_workers: Number of parallel workers, 1 loads sequentially.
+
+        Returns:
+            The loaded objects followed by a synthetic PlcProject holding them.
+        """
+        return self._loaded(
+            self._strategy.load_tree(
+                root=Path(root),
+                include=include,
+                exclude=exclude,
+                name_space=name_space,
+                max_workers=max_workers,
+            )
+        )
+
+    def load_many(
+        self, paths: Iterable[Path], max_workers: int | None = None
+    ) -> List[Objects]:
+        """
+        Load many paths at once, every file is parsed only once.
+
+        Files reachable from a .plcproj and given explicitly as well are loaded
+        as part of the project. The result holds one object per identifier.
+
+        Args:
+            paths: Paths of projects and object files.
+            max_workers: Number of parallel workers, 1 loads sequentially.
+
+        Returns:
+            The loaded objects, without duplicates.
+        """
+        return self._loaded(
+            self._strategy.load_many(paths=paths, max_workers=max_workers)
+        )
+
+    def load_source(
+        self, source: BaseSource, path: str, max_workers: int | None = None
+    ) -> List[Objects]:
+        """
+        Load a project or object file from a source instead of the file system.
+
+        Args:
+            source: Where the files are read from, e.g. a GitSource.
+            path: Relative name of the file in the source, case-insensitive.
+            max_workers: Number of parallel workers, 1 loads sequentially.
+
+        Returns:
+            The loaded objects, the project last, with paths below source.root.
+        """
+        return self._loaded(
+            self._strategy.load_source(
+                source=source, path=path, max_workers=max_workers
+            )
+        )
+
+    def _loaded(self, objects: List[Objects] | None) -> List[Objects] | None:
+        if not objects:
+            return objects
+        for index in self._indexes:
+            index.update(objects)
+        if self.weak_parents:
+            weaken_parents(objects)
+        return objects
 
     # @abstractmethod
     # def get_item_by_name(self, name:str) -> TcObjects | None:
@@ -0,0 +1,123 @@
+import io
+import json
+from dataclasses import fields
+from pathlib import Path, PurePath
+from typing import IO, Any, Dict, Iterable, Iterator, Optional
+
+from . import TwincatDataclasses as tcd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# child lists which are records of their own, linked by their parent id
+_CHILD_LISTS = ("methods", "properties", "variables", "pous", "duts", "itfs", "gvls")
+
+
+def record_id(obj: tcd.Objects) -> Optional[str]:
+    """
+    Return the id of an object in the export.
+
+    The identifier of a variable only holds the name of its parent, so variables
+    of two methods with the same name would collide. They use the id of their
+    parent instead.
+    """
+    obj = tcd.unwrap(obj)
+    if not isinstance(obj, tcd.Base):
+        return None
+    if isinstance(obj, tcd.Variable):
+        parent_id = record_id(obj.parent)
+        return obj.name if parent_id is None else f"{parent_id}.{obj.name}"
+    try:
+        return obj.get_identifier() or None
+    except AttributeError:
+        return obj.name
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, tcd.Base):
+        return _nested(value)
+    if isinstance(value, PurePath):
+        return str(value)
+    if isinstance(value, list):
+        return [_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _value(item) for key, item in value.items()}
+    return value
+
+
+def _nested(obj: tcd.Objects) -> Dict[str, Any]:
+    """Documentation, get/set and dependencies are written inside their owner."""
+    return {
+        field.name: _value(getattr(obj, field.name))
+        for field in fields(obj)
+        if field.name not in ("parent", "path", "sub_paths", "name_space")
+        and field.metadata.get("snapshot", True)
+    }
+
+
+def object_record(obj: tcd.Objects) -> Dict[str, Any]:
+    """Convert one object to a JSON ready dict, with the parent as id."""
+    record: Dict[str, Any] = {
+        "id": record_id(obj),
+        "kind": obj.kind,
+        "parent": record_id(obj.parent),
+    }
+    for field in fields(obj):
+        if field.name in ("parent", "kind") or field.name in _CHILD_LISTS:
+            continue
+        if not field.metadata.get("snapshot", True):
+            continue
+        record[field.name] = _value(getattr(obj, field.name))
+    return record
+
+
+def iter_records(objects: Iterable[tcd.Objects]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one record per object, followed by the records of its variables.
+
+    Objects are consumed one by one, so a generator of objects is converted
+    while it is produced and nothing is kept after a record is yielded.
+    Methods and properties are records if they are part of objects, as in the
+    lists the Loader returns.
+    """
+    for obj in objects:
+        yield object_record(obj)
+        for variable in getattr(obj, "variables", None) or []:
+            yield object_record(variable)
+
+
+def _encoder():
+    if orjson is not None:
+        return lambda record: orjson.dumps(record) + b"\n"
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    return lambda record: (encoder.encode(record) + "\n").encode("utf-8")
+
+
+def export_ndjson(objects: Iterable[tcd.Objects], target: Path | IO) -> int:
+    """
+    Write loaded objects as newline delimited JSON, one record per line.
+
+    Every record holds the id of its parent instead of the parent itself, so
+    the cyclic parent links are never followed. orjson is used if installed.
+
+    Args:
+        objects: Objects as returned by the Loader, or a generator of them.
+        target: A file path, or an open text or binary file.
+
+    Returns:
+        The number of records written.
+    """
+    if isinstance(target, (str, PurePath)):
+        with open(target, "wb") as fp:
+            return export_ndjson(objects, fp)
+
+    encode = _encoder()
+    text = isinstance(target, io.TextIOBase)
+    count = 0
+    for record in iter_records(objects):
+        line = encode(record)
+        target.write(line.decode("utf-8") if text else line)
+        count += 1
+    return count
@@ -0,0 +1,406 @@
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from . import TwincatDataclasses as tcd
+from .BaseIndex import BaseIndex
+from .LineIndex import LineIndex, line_index
+from .parse_implementation import Token, tokenize
+from .TypeTable import Step, TypeTable, declared_names
+
+_PARTS = ("declaration", "implementation")
+
+# an access path with the text offset of every step, -1 for steps without a name
+AccessPath = List[Tuple[Step, int]]
+
+# an occurrence in a text, (symbol identifier, line, column, definition)
+_Row = Tuple[str, int, int, bool]
+
+
+@dataclass
+class Occurrence:
+    """A place where a symbol is named, line and column start at 1."""
+
+    symbol: str
+    identifier: str  # the object whose text names the symbol
+    part: str  # "declaration" or "implementation"
+    line: int
+    column: int
+    path: Optional[Path] = None
+    # the occurrence declares the symbol, e.g. "nCount : INT;"
+    definition: bool = False
+
+
+def symbol_identifier(obj: tcd.Objects) -> str:
+    """
+    Identifier of a symbol, variables of methods get the identifier of the method.
+
+    Variable.get_identifier only uses the name of the parent, so the locals of
+    FB_A.Run and FB_B.Run would share an identifier.
+    """
+    if isinstance(obj, tcd.Variable):
+        parent = tcd.unwrap(obj.parent)
+        if isinstance(parent, tcd.Method):
+            return f"{parent.get_identifier()}.{obj.name}"
+    return obj.get_identifier()
+
+
+def _matching(tokens: List[Token], start: int) -> int:
+    """Index after the bracket which closes the one at start."""
+    opening = tokens[start].value
+    closing = ")" if opening == "(" else "]"
+    depth = 0
+    for index in range(start, len(tokens)):
+        token = tokens[index]
+        if token.kind == "op":
+            if token.value == opening:
+                depth += 1
+            elif token.value == closing:
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+    return len(tokens)
+
+
+def _is_op(token: Token, value: str) -> bool:
+    return token.kind == "op" and token.value == value
+
+
+def access_paths(tokens: List[Token]) -> List[AccessPath]:
+    """
+    Find the access paths of a tokenized text, like fbAxis.aItems[i].Run().
+
+    Named arguments (Run(Position := 5)) become paths of the called target
+    with an "arg" step.
+    """
+    paths: List[AccessPath] = []
+    callees: Dict[int, AccessPath] = {}
+    open_calls: List[int] = []
+    count = len(tokens)
+    for index, token in enumerate(tokens):
+        if token.kind == "op":
+            if token.value == "(":
+                open_calls.append(index)
+            elif token.value == ")" and open_calls:
+                open_calls.pop()
+            continue
+        if token.kind != "ident" or (index and _is_op(tokens[index - 1], ".")):
+            continue
+        following = tokens[index + 1] if index + 1 < count else None
+        if (
+            following is not None
+            and following.kind == "op"
+            and following.value in (":=", "=>")
+            and index
+            and tokens[index - 1].kind == "op"
+            and tokens[index - 1].value in ("(", ",")
+            and open_calls
+        ):
+            callee = callees.get(open_calls[-1])
+            if callee is not None:
+                steps = [(step, -1) for step, _ in callee]
+                steps.append((("arg", token.value), token.offset))
+                paths.append(steps)
+            continue
+
+        upper = token.value.upper()
+        if (
+            upper in ("THIS", "SUPER")
+            and following is not None
+            and _is_op(following, "^")
+        ):
+            steps: AccessPath = [((upper.lower(),), -1)]
+            position = index + 2
+        else:
+            steps = [(("name", token.value), token.offset)]
+            position = index + 1
+        while position < count:
+            current = tokens[position]
+            if current.kind != "op":
+                break
+            if current.value == "." and tokens[position + 1].kind == "ident":
+                member = tokens[position + 1]
+                steps.append((("member", member.value), member.offset))
+                position += 2
+            elif current.value == "^":
+                steps.append((("deref",), -1))
+                position += 1
+            elif current.value == "[":
+                steps.append((("index",), -1))
+                position = _matching(tokens, position)
+            elif current.value == "(":
+                callees[position] = list(steps)
+                steps.append((("call",), -1))
+                position = _matching(tokens, position)
+            else:
+                break
+        paths.append(steps)
+    return paths
+
+
+@dataclass
+class _Text:
+    obj: tcd.Objects
+    identifier: str
+    path: Optional[Path]
+    part: int
+    owner: Optional[tcd.Objects]
+    local: Dict[str, tcd.Variable]
+    lines: LineIndex
+    paths: List[AccessPath]
+    # occurrences of the last resolution, None if it was not resolved yet
+    rows: Optional[List[_Row]] = None
+    # files the last resolution looked at
+    depends: frozenset = frozenset()
+    # casefolded names the last resolution looked up
+    consulted: frozenset = frozenset()
+
+
+class OccurrenceIndex(BaseIndex):
+    """
+    Find all references of variables, methods, properties and types.
+
+    Declarations and implementations are tokenized once when a file is
+    loaded, the names are resolved through the variable types like in the
+    CallGraph. The occurrences are kept in flat arrays sorted by symbol. On
+    the next query after a file was reloaded or removed, only the texts of
+    new files, and those whose resolution looked at a changed file or looked
+    up a name a changed file declares, are resolved again. The arrays are
+    rebuilt from the kept occurrences.
+
+        index = OccurrenceIndex()
+        index.update(objects)
+        for occurrence in index.references("Lib.FB_Axis.bBusy"):
+            print(occurrence.path, occurrence.line, occurrence.column)
+    """
+
+    def __init__(self):
+        self._objects_by_path: Dict[str, List[tcd.Objects]] = {}
+        self._texts_by_path: Dict[str, List[_Text]] = {}
+        self._changed_paths: Set[str] = set()
+        self._changed_names: Set[str] = set()
+        self._dirty = True
+        self._symbols: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self._containers: List[Tuple[str, Optional[Path]]] = []
+        self._offsets = array("I", [0])
+        self._container = array("I")
+        self._part = array("B")
+        self._line = array("I")
+        self._column = array("I")
+        self._definition = array("B")
+
+    # -- index --------------------------------------------------------------
+
+    def add_objects(self, objects: List[tcd.Objects]) -> None:
+        for obj in objects:
+            if not isinstance(
+                obj, (tcd.Pou, tcd.Itf, tcd.Dut, tcd.Gvl, tcd.Method, tcd.Property)
+            ):
+                continue
+            path = tcd.source_path(obj)
+            key = "" if path is None else str(path)
+            self._objects_by_path.setdefault(key, []).append(obj)
+            self._texts_by_path.setdefault(key, []).extend(self._texts(obj, path))
+            self._changed_paths.add(key)
+            self._changed_names |= declared_names(obj)
+        self._dirty = True
+
+    def remove_paths(self, paths: Iterable[str | Path]) -> None:
+        for path in paths:
+            for obj in self._objects_by_path.pop(str(path), []):
+                self._changed_names |= declared_names(obj)
+            self._texts_by_path.pop(str(path), None)
+            self._changed_paths.add(str(path))
+        self._dirty = True
+
+    def _texts(self, obj: tcd.Objects, path: Optional[Path]) -> List[_Text]:
+        if isinstance(obj, (tcd.Method, tcd.Property)):
+            owner = tcd.unwrap(obj.parent)
+        else:
+            owner = obj
+        local = {
+            variable.name.casefold(): variable
+            for variable in (obj.variables if isinstance(obj, tcd.Method) else [])
+        }
+        if isinstance(obj, tcd.Property):
+            sources = [
+                accessor for accessor in (obj.get, obj.set) if accessor is not None
+            ]
+        else:
+            sources = [obj]
+        identifier = symbol_identifier(obj)
+        texts = []
+        for source in sources:
+            for part, name in enumerate(_PARTS):
+                text = getattr(source, name, None)
+                if not text:
+                    continue
+                texts.append(
+                    _Text(
+                        obj,
+                        identifier,
+                        path,
+                        part,
+                        owner,
+                        local,
+                        line_index(text),
+                        access_paths(tokenize(text)),
+                    )
+                )
+        return texts
+
+    # -- arrays -------------------------------------------------------------
+
+    def _rebuild(self):
+        if not self._dirty:
+            return
+        table = TypeTable(
+            obj for objects in self._objects_by_path.values() for obj in objects
+        )
+        changed_paths, changed_names = self._changed_paths, self._changed_names
+        for texts in self._texts_by_path.values():
+            for text in texts:
+                if (
+                    text.rows is None
+                    or not text.depends.isdisjoint(changed_paths)
+                    or not text.consulted.isdisjoint(changed_names)
+                ):
+                    self._resolve_text(text, table)
+        self._changed_paths = set()
+        self._changed_names = set()
+
+        self._symbols = []
+        self._symbol_ids = {}
+        self._containers = []
+        rows = []
+        for texts in self._texts_by_path.values():
+            for text in texts:
+                container = len(self._containers)
+                self._containers.append((text.identifier, text.path))
+                for identifier, line, column, definition in text.rows:
+                    rows.append(
+                        (
+                            self._symbol(identifier),
+                            container,
+                            text.part,
+                            line,
+                            column,
+                            definition,
+                        )
+                    )
+        rows.sort()
+        self._offsets = array("I", [0]) * (len(self._symbols) + 1)
+        self._container = array("I", [row[1] for row in rows])
+        self._part = array("B", [row[2] for row in rows])
+        self._line = array("I", [row[3] for row in rows])
+        self._column = array("I", [row[4] for row in rows])
+        self._definition = array("B", [row[5] for row in rows])
+        for row in rows:
+            self._offsets[row[0] + 1] += 1
+        for symbol in range(len(self._symbols)):
+            self._offsets[symbol + 1] += self._offsets[symbol]
+        self._dirty = False
+
+    def _resolve_text(self, text: _Text, table: TypeTable) -> None:
+        """Resolve the access paths of a text and record the files and names it depends on."""
+        table.consulted = set()
+        rows: List[_Row] = []
+        found: List[tcd.Objects] = []
+        for steps in text.paths:
+            symbols, _ = table.resolve(
+                [step for step, _ in steps], text.owner, text.local
+            )
+            for (_, offset), symbol in zip(steps, symbols):
+                if symbol is None:
+                    continue
+                found.append(symbol)
+                if offset < 0:
+                    continue
+                line, column = text.lines.position(offset)
+                definition = text.part == 0 and (
+                    symbol is text.obj
+                    or (
+                        isinstance(symbol, tcd.Variable)
+                        and tcd.unwrap(symbol.parent) is text.obj
+                    )
+                )
+                rows.append((symbol_identifier(symbol), line, column, definition))
+        text.rows = rows
+        text.depends = frozenset(table.files(text.owner, found))
+        text.consulted = frozenset(table.consulted)
+        table.consulted = None
+
+    def _symbol(self, identifier: str) -> int:
+        key = identifier.casefold()
+        symbol = self._symbol_ids.get(key)
+        if symbol is None:
+            symbol = self._symbol_ids[key] = len(self._symbols)
+            self._symbols.append(identifier)
+        return symbol
+
+    # -- queries ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        self._rebuild()
+        return len(self._line)
+
+    @property
+    def symbols(self) -> List[str]:
+        """Identifiers of all symbols which are named somewhere."""
+        self._rebuild()
+        return list(self._symbols)
+
+    def count(self, identifier: str) -> int:
+        """Number of occurrences of a symbol."""
+        self._rebuild()
+        symbol = self._symbol_ids.get(identifier.casefold())
+        if symbol is None:
+            return 0
+        return self._offsets[symbol + 1] - self._offsets[symbol]
+
+    def edges(self) -> Iterator[Tuple[str, str]]:
+        """Pairs of (object, symbol) for every object naming a symbol, declarations excluded."""
+        self._rebuild()
+        for symbol, name in enumerate(self._symbols):
+            seen = set()
+            for row in range(self._offsets[symbol], self._offsets[symbol + 1]):
+                container = self._container[row]
+                if self._definition[row] or container in seen:
+                    continue
+                seen.add(container)
+                yield self._containers[container][0], name
+
+    def references(self, identifier: str) -> List[Occurrence]:
+        """
+        All places which name a symbol, its declaration included.
+
+        Args:
+            identifier: Identifier of the symbol, case insensitive, e.g.
+                "Lib.FB_Axis.MoveAbs". Locals of methods are named below the
+                method, "Lib.FB_Axis.MoveAbs.nRetry".
+
+        Returns:
+            The occurrences, by object and position.
+        """
+        self._rebuild()
+        symbol = self._symbol_ids.get(identifier.casefold())
+        if symbol is None:
+            return []
+        name = self._symbols[symbol]
+        occurrences = []
+        for row in range(self._offsets[symbol], self._offsets[symbol + 1]):
+            container, path = self._containers[self._container[row]]
+            occurrences.append(
+                Occurrence(
+                    symbol=name,
+                    identifier=container,
+                    part=_PARTS[self._part[row]],
+                    line=self._line[row],
+                    column=self._column[row],
+                    path=path,
+                    definition=bool(self._definition[row]),
+                )
+            )
+        return occurrences
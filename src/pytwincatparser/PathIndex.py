@@ -0,0 +1,143 @@
+import os
+import posixpath
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from typing import Dict, Iterable, List, Optional
+
+
+def normalize_include(include: str) -> str:
+    """
+    Normalize a project include (e.g. "POUs\\FB_Main.TcPOU") to a relative posix key.
+
+    Args:
+        include: The include path as written in the project file.
+
+    Returns:
+        The include as posix path with "." and ".." segments collapsed. An
+        absolute include keeps its anchor, "C:\\Lib\\F.TcPOU" -> "C:/Lib/F.TcPOU".
+    """
+    windows = PureWindowsPath(include)
+    parts = windows.parts
+    if not parts:
+        return ""
+    if windows.anchor:
+        anchor = windows.anchor.replace("\\", "/")
+        return posixpath.normpath(anchor + "/".join(parts[1:]))
+    return posixpath.normpath("/".join(parts))
+
+
+def _is_outside(key: str) -> bool:
+    """Check if a normalized include leaves the root or is absolute."""
+    return (
+        key == ".."
+        or key.startswith("../")
+        or key.startswith("/")
+        or bool(PureWindowsPath(key).drive)
+    )
+
+
+class PathIndex:
+    """
+    Case-insensitive lookup table of the files below a root.
+
+    TwinCAT projects are mostly authored on Windows, where "POUs\\fb_x.TcPOU" and
+    "POUs/FB_X.TcPOU" are the same file. The index is built once, and every
+    include is resolved with two dictionary lookups instead of a filesystem call.
+    """
+
+    def __init__(self, root: Path, names: Iterable[str]):
+        self.root = root
+        self._exact: Dict[str, str] = {}
+        self._folded: Dict[str, str] = {}
+        for name in names:
+            self._exact[name] = name
+            # first one wins if two files only differ in case
+            self._folded.setdefault(name.casefold(), name)
+        # names in folders outside the root by casefolded name, listed once
+        self._listings: Dict[str, Dict[str, str]] = {}
+
+    @classmethod
+    def from_directory(cls, root: Path) -> "PathIndex":
+        """Walk `root` once with os.scandir and index every file below it."""
+        root = Path(os.path.abspath(root))
+        names: List[str] = []
+        stack = [("", str(root))]
+        while stack:
+            prefix, directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = prefix + entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((name + "/", entry.path))
+                        elif entry.is_file():
+                            names.append(name)
+            except OSError:
+                continue
+        return cls(root=root, names=names)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def __iter__(self):
+        return iter(self._exact.values())
+
+    def lookup(self, include: str) -> Optional[str]:
+        """Return the real relative name of `include` or None if it is not indexed."""
+        key = normalize_include(include)
+        name = self._exact.get(key)
+        if name is None:
+            name = self._folded.get(key.casefold())
+        return name
+
+    def resolve(self, include: str) -> Path:
+        """
+        Resolve an include against the index.
+
+        Args:
+            include: The include path as written in the project file.
+
+        Returns:
+            The absolute path with the casing found on disk. If the file is not
+            indexed, the joined path is returned. Includes outside the root
+            are matched case-insensitive as well and normalized like the
+            root, with os.path.abspath, so a file has one path however it is
+            included.
+        """
+        name = self.lookup(include)
+        if name is not None:
+            return self.root / PurePosixPath(name)
+        name = normalize_include(include)
+        if not _is_outside(name):
+            return self.root / PurePosixPath(name)
+        if self.root.is_absolute():
+            return self._resolve_outside(name)
+        # a virtual root of a source, collapse the ".." without the disk
+        return Path(posixpath.normpath((self.root / Path(name)).as_posix()))
+
+    def _listing(self, directory: str) -> Dict[str, str]:
+        listing = self._listings.get(directory)
+        if listing is None:
+            listing = {}
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        listing.setdefault(entry.name.casefold(), entry.name)
+            except OSError:
+                pass
+            self._listings[directory] = listing
+        return listing
+
+    def _resolve_outside(self, name: str) -> Path:
+        """Match an include outside the root folder by folder, each listed once."""
+        path = os.path.normpath(os.path.join(self.root, name))
+        try:
+            # the casing of the folders the root is in is known
+            current = os.path.commonpath([os.fspath(self.root), path])
+        except ValueError:
+            # another drive
+            current = os.path.splitdrive(path)[0] + os.sep
+        for part in Path(os.path.relpath(path, current)).parts:
+            if part != ".":
+                listing = self._listing(current)
+                current = os.path.join(current, listing.get(part.casefold(), part))
+        return Path(current)
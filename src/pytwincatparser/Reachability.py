@@ -0,0 +1,193 @@
+import re
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+from . import TwincatDataclasses as tcd
+from .CallGraph import CallGraph
+from .OccurrenceIndex import OccurrenceIndex, symbol_identifier
+from .TypeTable import TypeTable
+
+# a declaration starting with PROGRAM, after comments and pragmas
+_PROGRAM = re.compile(
+    r"^(?:\s|\(\*[\s\S]*?\*\)|//[^\n]*|\{[^}]*\})*PROGRAM\b", re.IGNORECASE
+)
+# methods run by the runtime when an instance is created, copied or removed
+_IMPLICIT_METHODS = ("fb_init", "fb_reinit", "fb_exit")
+
+
+def is_program(pou: tcd.Pou) -> bool:
+    return bool(pou.declaration) and _PROGRAM.match(pou.declaration) is not None
+
+
+class Reachability:
+    """
+    Code reachable from the programs the tasks call, to find dead code.
+
+    The graph joins the references of the OccurrenceIndex (every name in a
+    declaration or implementation), the CallGraph including dispatch to
+    implementations and overrides, and the types of the variables. One
+    breadth first search over it is linear in objects and references.
+
+        reachability = Reachability(objects)
+        for obj in reachability.unreachable():
+            print(obj.kind, obj.get_identifier())
+    """
+
+    def __init__(self, objects: Iterable[tcd.Objects]):
+        self.objects: List[tcd.Objects] = list(tcd.iter_objects(objects))
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for obj in self.objects:
+            if isinstance(
+                obj,
+                (
+                    tcd.Pou,
+                    tcd.Itf,
+                    tcd.Dut,
+                    tcd.Gvl,
+                    tcd.Method,
+                    tcd.Property,
+                    tcd.Variable,
+                ),
+            ):
+                self._node(symbol_identifier(obj))
+        self._offsets, self._targets = self._build()
+
+    def _node(self, identifier: str) -> int:
+        key = identifier.casefold()
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self._names)
+            self._names.append(identifier)
+        return node
+
+    def _build(self):
+        calls = CallGraph()
+        calls.add_objects(self.objects)
+        occurrences = OccurrenceIndex()
+        occurrences.add_objects(self.objects)
+        table = TypeTable(self.objects)
+
+        edges = set()
+        for source, target in occurrences.edges():
+            edges.add((self._node(source), self._node(target)))
+        for caller in calls.nodes:
+            for callee in calls.callees(caller):
+                edges.add((self._node(caller), self._node(callee)))
+
+        for obj in self.objects:
+            if isinstance(obj, tcd.Variable):
+                node = self._node(symbol_identifier(obj))
+                type_obj = table.type_of(obj.type)
+                if type_obj is not None:
+                    edges.add((node, self._node(type_obj.get_identifier())))
+                parent = tcd.unwrap(obj.parent)
+                if isinstance(parent, tcd.Gvl):
+                    edges.add((node, self._node(parent.get_identifier())))
+            elif isinstance(obj, (tcd.Method, tcd.Property)):
+                parent = tcd.unwrap(obj.parent)
+                if isinstance(parent, tcd.Base):
+                    edges.add(
+                        (
+                            self._node(obj.get_identifier()),
+                            self._node(parent.get_identifier()),
+                        )
+                    )
+            elif isinstance(obj, tcd.Pou):
+                node = self._node(obj.get_identifier())
+                for method in obj.methods:
+                    if method.name.casefold() in _IMPLICIT_METHODS:
+                        edges.add((node, self._node(method.get_identifier())))
+
+        count = len(self._names)
+        offsets = array("I", [0]) * (count + 1)
+        targets = array("I")
+        for source, target in sorted(edges):
+            offsets[source + 1] += 1
+            targets.append(target)
+        for node in range(count):
+            offsets[node + 1] += offsets[node]
+        return offsets, targets
+
+    def entry_points(self, tasks: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        The programs called by the loaded tasks.
+
+        If no task lists its programs, every PROGRAM is an entry point.
+
+        Args:
+            tasks: Identifiers of the tasks to start from, e.g.
+                "LCA_NGP_Core.PlcTask" for the task of a plc project or
+                "PlcTask" for the one of a .tsproj. All tasks by default.
+        """
+        table = TypeTable(self.objects)
+        wanted = None if tasks is None else {task.casefold() for task in tasks}
+        programs = []
+        for obj in self.objects:
+            if not isinstance(obj, tcd.Task):
+                continue
+            if wanted is not None and obj.get_identifier().casefold() not in wanted:
+                continue
+            for name in obj.programs:
+                # the programs of a plc project task are in its namespace
+                pou = (
+                    table.type_of(f"{obj.name_space}.{name}")
+                    if obj.name_space
+                    else None
+                )
+                if pou is None:
+                    pou = table.type_of(name)
+                programs.append(pou.get_identifier() if pou is not None else name)
+        if not programs and tasks is None:
+            programs = [
+                obj.get_identifier()
+                for obj in self.objects
+                if isinstance(obj, tcd.Pou) and is_program(obj)
+            ]
+        return list(dict.fromkeys(programs))
+
+    def reachable(self, roots: Optional[Iterable[str]] = None) -> Set[str]:
+        """
+        Identifiers of everything reachable from the roots, the roots included.
+
+        Args:
+            roots: Identifiers to start from, by default the entry_points.
+        """
+        if roots is None:
+            roots = self.entry_points()
+        start = [
+            self._ids[root.casefold()] for root in roots if root.casefold() in self._ids
+        ]
+        seen = bytearray(len(self._names))
+        for node in start:
+            seen[node] = 1
+        queue = deque(start)
+        offsets, targets = self._offsets, self._targets
+        while queue:
+            node = queue.popleft()
+            for edge in range(offsets[node], offsets[node + 1]):
+                target = targets[edge]
+                if not seen[target]:
+                    seen[target] = 1
+                    queue.append(target)
+        return {self._names[node] for node in range(len(seen)) if seen[node]}
+
+    def unreachable(self, roots: Optional[Iterable[str]] = None) -> List[tcd.Objects]:
+        """
+        Pous, methods, properties and gvl variables which are not reachable.
+
+        Args:
+            roots: Identifiers to start from, by default the entry_points.
+        """
+        reached = {identifier.casefold() for identifier in self.reachable(roots)}
+        dead = []
+        for obj in self.objects:
+            if isinstance(obj, tcd.Variable):
+                if not isinstance(tcd.unwrap(obj.parent), tcd.Gvl):
+                    continue
+            elif not isinstance(obj, (tcd.Pou, tcd.Method, tcd.Property)):
+                continue
+            if symbol_identifier(obj).casefold() not in reached:
+                dead.append(obj)
+        return dead
@@ -0,0 +1,346 @@
+import marshal
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from . import TwincatDataclasses as tcd
+from .BaseIndex import BaseIndex
+
+SEARCH_INDEX_VERSION = 1
+
+# prefixes of the hungarian notation used in TwinCAT code (bEnable, nCount, stData, ...)
+HUNGARIAN_PREFIXES = frozenset(
+    [
+        "a",
+        "arr",
+        "b",
+        "by",
+        "c",
+        "d",
+        "dt",
+        "dw",
+        "e",
+        "f",
+        "fb",
+        "fn",
+        "i",
+        "ip",
+        "itf",
+        "lr",
+        "lw",
+        "n",
+        "p",
+        "r",
+        "ref",
+        "s",
+        "st",
+        "t",
+        "tod",
+        "u",
+        "w",
+        "ws",
+    ]
+)
+
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[0-9]+")
+_CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+# kinds of objects which are documents of the index
+_DOCUMENT_KINDS = (
+    tcd.Pou,
+    tcd.Itf,
+    tcd.Dut,
+    tcd.Gvl,
+    tcd.Method,
+    tcd.Property,
+    tcd.Variable,
+)
+
+
+def split_identifier(name: str) -> List[str]:
+    """
+    Split an identifier in lower case words.
+
+    Underscores and camelCase separate words, a leading hungarian prefix is
+    dropped: "_bDoorClosed" -> ["door", "closed"], "FB_AxisMove" -> ["fb", "axis", "move"].
+
+    Args:
+        name: The identifier.
+
+    Returns:
+        The words of the identifier.
+    """
+    words: List[str] = []
+    for part in name.split("_"):
+        words.extend(_CAMEL.findall(part))
+    if len(words) > 1 and words[0].islower() and words[0] in HUNGARIAN_PREFIXES:
+        if not name.lstrip("_").startswith(words[0] + "_"):
+            words = words[1:]
+    return [word.lower() for word in words]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a text in search terms.
+
+    Every word is split like an identifier. Identifiers made of several words
+    are added as a whole as well, so "FB_AxisMove" is found by its full name.
+
+    Args:
+        text: Comment, documentation or name.
+
+    Returns:
+        The terms in lower case, without stemming.
+    """
+    tokens: List[str] = []
+    if not text:
+        return tokens
+    for word in _WORD.findall(text):
+        parts = split_identifier(word)
+        tokens.extend(parts)
+        full = word.strip("_").lower()
+        if len(parts) > 1 and full:
+            tokens.append(full)
+    return tokens
+
+
+def document_text(obj: tcd.Objects) -> str:
+    """Collect the searchable text of an object: name, documentation and comment."""
+    texts = [obj.name or ""]
+    documentation = getattr(obj, "documentation", None)
+    if documentation is not None:
+        texts.append(documentation.details or "")
+        texts.append(documentation.usage or "")
+        texts.append(documentation.returns or "")
+        texts.extend(documentation.custom_tags.values())
+    if isinstance(obj, tcd.Variable):
+        texts.append(obj.comment or "")
+    return "\n".join(text for text in texts if text)
+
+
+def _identifier(obj: tcd.Objects) -> str:
+    try:
+        return obj.get_identifier()
+    except AttributeError:
+        return obj.name or ""
+
+
+@dataclass
+class SearchHit:
+    identifier: str
+    kind: str
+    score: float
+    obj: Optional[tcd.Objects] = None
+
+
+class SearchIndex(BaseIndex):
+    """
+    Inverted index with BM25 ranking over names, documentation and comments.
+
+    Add it to a Loader with add_index to build it while loading, or fill it
+    with update() from already loaded objects.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> {document id: term frequency}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._identifiers: List[Optional[str]] = []
+        self._kinds: List[str] = []
+        self._paths: List[Optional[str]] = []
+        self._lengths: List[int] = []
+        self._objects: List[Optional[tcd.Objects]] = []
+        self._terms: List[tuple] = []
+        self._by_path: Dict[str, List[int]] = {}
+        self._free: List[int] = []
+        self._count = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add_objects(self, objects: List[tcd.Objects]) -> None:
+        for obj in objects:
+            if isinstance(obj, _DOCUMENT_KINDS):
+                path = tcd.source_path(obj)
+                self.add_document(
+                    identifier=_identifier(obj),
+                    kind=obj.kind,
+                    text=document_text(obj),
+                    path=None if path is None else str(path),
+                    obj=obj,
+                )
+
+    def add_document(
+        self,
+        identifier: str,
+        kind: str,
+        text: str,
+        path: Optional[str] = None,
+        obj: Optional[tcd.Objects] = None,
+    ) -> int:
+        """Add a single document and return its id."""
+        terms: Dict[str, int] = {}
+        tokens = tokenize(text)
+        for token in tokens:
+            terms[token] = terms.get(token, 0) + 1
+
+        if self._free:
+            doc = self._free.pop()
+            self._identifiers[doc] = identifier
+            self._kinds[doc] = kind
+            self._paths[doc] = path
+            self._lengths[doc] = len(tokens)
+            self._objects[doc] = obj
+            self._terms[doc] = tuple(terms)
+        else:
+            doc = len(self._identifiers)
+            self._identifiers.append(identifier)
+            self._kinds.append(kind)
+            self._paths.append(path)
+            self._lengths.append(len(tokens))
+            self._objects.append(obj)
+            self._terms.append(tuple(terms))
+
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc] = frequency
+        if path is not None:
+            self._by_path.setdefault(path, []).append(doc)
+        self._count += 1
+        self._total_length += len(tokens)
+        return doc
+
+    def remove_paths(self, paths: Iterable[str | Path]) -> None:
+        removed = set()
+        for path in paths:
+            removed.update(self._by_path.pop(str(path), []))
+        if not removed:
+            return
+        for doc in removed:
+            for term in self._terms[doc]:
+                postings = self._postings[term]
+                del postings[doc]
+                if not postings:
+                    del self._postings[term]
+            self._terms[doc] = ()
+            self._count -= 1
+            self._total_length -= self._lengths[doc]
+            self._identifiers[doc] = None
+            self._objects[doc] = None
+            self._paths[doc] = None
+            self._lengths[doc] = 0
+            self._free.append(doc)
+
+    def search(
+        self, query: str, limit: int = 10, kinds: Iterable[str] | None = None
+    ) -> List[SearchHit]:
+        """
+        Search the index.
+
+        Args:
+            query: Free text, split like the documents.
+            limit: Maximum number of hits.
+            kinds: Only return objects of these kinds ("pou", "variable", ...).
+
+        Returns:
+            The hits, best first.
+        """
+        if self._count == 0:
+            return []
+        kinds = set(kinds) if kinds is not None else None
+        average_length = self._total_length / self._count or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(
+                1.0 + (self._count - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for doc, frequency in postings.items():
+                norm = self.k1 * (
+                    1.0 - self.b + self.b * self._lengths[doc] / average_length
+                )
+                score = idf * frequency * (self.k1 + 1.0) / (frequency + norm)
+                scores[doc] = scores.get(doc, 0.0) + score
+
+        ranked = sorted(
+            scores.items(), key=lambda item: (-item[1], self._identifiers[item[0]])
+        )
+        hits: List[SearchHit] = []
+        for doc, score in ranked:
+            if kinds is not None and self._kinds[doc] not in kinds:
+                continue
+            hits.append(
+                SearchHit(
+                    identifier=self._identifiers[doc],
+                    kind=self._kinds[doc],
+                    score=score,
+                    obj=self._objects[doc],
+                )
+            )
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def bind(self, objects: Iterable[tcd.Objects]) -> None:
+        """Link the documents of a loaded index to objects, e.g. from a snapshot."""
+        by_identifier = {}
+        for obj in tcd.iter_objects(objects):
+            if isinstance(obj, _DOCUMENT_KINDS):
+                by_identifier.setdefault((_identifier(obj), obj.kind), obj)
+        for doc, identifier in enumerate(self._identifiers):
+            if identifier is not None:
+                self._objects[doc] = by_identifier.get((identifier, self._kinds[doc]))
+
+    def save(self, path: Path) -> None:
+        """Save the index, the objects are not part of the file."""
+        postings = {
+            term: (list(docs.keys()), list(docs.values()))
+            for term, docs in self._postings.items()
+        }
+        payload = (
+            SEARCH_INDEX_VERSION,
+            self.k1,
+            self.b,
+            self._identifiers,
+            self._kinds,
+            self._paths,
+            self._lengths,
+            postings,
+        )
+        Path(path).write_bytes(marshal.dumps(payload, 4))
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        """Load an index written by save, use bind() to get objects in the hits."""
+        payload = marshal.loads(Path(path).read_bytes())
+        if not isinstance(payload, tuple) or payload[0] != SEARCH_INDEX_VERSION:
+            raise ValueError(
+                f"{path} is not a search index of version {SEARCH_INDEX_VERSION}"
+            )
+        _, k1, b, identifiers, kinds, paths, lengths, postings = payload
+        index = cls(k1=k1, b=b)
+        index._identifiers = identifiers
+        index._kinds = kinds
+        index._paths = paths
+        index._lengths = lengths
+        index._objects = [None] * len(identifiers)
+        terms = [[] for _ in identifiers]
+        for term, (docs, frequencies) in postings.items():
+            index._postings[term] = dict(zip(docs, frequencies))
+            for doc in docs:
+                terms[doc].append(term)
+        index._terms = [tuple(doc_terms) for doc_terms in terms]
+        for doc, identifier in enumerate(identifiers):
+            if identifier is None:
+                index._free.append(doc)
+                continue
+            index._count += 1
+            index._total_length += lengths[doc]
+            if paths[doc] is not None:
+                index._by_path.setdefault(paths[doc], []).append(doc)
+        return index
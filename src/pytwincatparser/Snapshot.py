@@ -0,0 +1,234 @@
+import dataclasses
+import marshal
+import os
+import struct
+from pathlib import Path, PurePath
+from typing import Any, Dict, List
+
+from . import TwincatDataclasses as tcd
+
+# file layout: magic, format version, marshal payload
+#   payload = (strings, classes, records, roots)
+#   strings: every string of the model exactly once
+#   classes: (class name, field names) as string ids
+#   records: (class id, encoded field values) per object, parents are object ids
+#   roots:   object ids of the list that was saved
+SNAPSHOT_MAGIC = b"TCSNAP"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct(">6sH")
+_MARSHAL_VERSION = 4
+
+
+class SnapshotError(Exception):
+    """Raised if a file is not a snapshot or was written by an incompatible version."""
+
+
+class _Encoder:
+    def __init__(self):
+        self.strings: List[str] = []
+        self.string_ids: Dict[str, int] = {}
+        self.classes: List[tuple] = []
+        self.class_ids: Dict[type, int] = {}
+        self.class_fields: Dict[type, List[str]] = {}
+        self.objects: List[tcd.Objects] = []
+        self.object_ids: Dict[int, int] = {}
+
+    def string(self, value: str) -> int:
+        sid = self.string_ids.get(value)
+        if sid is None:
+            sid = len(self.strings)
+            self.strings.append(value)
+            self.string_ids[value] = sid
+        return sid
+
+    def reference(self, obj: tcd.Objects) -> int:
+        obj = tcd.unwrap(obj)
+        oid = self.object_ids.get(id(obj))
+        if oid is None:
+            oid = len(self.objects)
+            self.objects.append(obj)
+            self.object_ids[id(obj)] = oid
+        return oid
+
+    def class_id(self, cls: type) -> int:
+        cid = self.class_ids.get(cls)
+        if cid is None:
+            names = [
+                field.name
+                for field in dataclasses.fields(cls)
+                if field.metadata.get("snapshot", True)
+            ]
+            cid = len(self.classes)
+            self.classes.append(
+                (self.string(cls.__name__), [self.string(name) for name in names])
+            )
+            self.class_ids[cls] = cid
+            self.class_fields[cls] = names
+        return cid
+
+    def value(self, value: Any) -> Any:
+        if value is None or isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            return self.string(value)
+        if isinstance(value, tcd.Base):
+            return ("r", self.reference(value))
+        if isinstance(value, list):
+            return [self.value(item) for item in value]
+        if isinstance(value, dict):
+            return {self.value(key): self.value(item) for key, item in value.items()}
+        if isinstance(value, PurePath):
+            return ("p", self.string(str(value)))
+        if isinstance(value, (int, float)):
+            return ("n", value)
+        if isinstance(value, tuple):
+            return ("t", [self.value(item) for item in value])
+        raise TypeError(f"can not write {type(value).__name__} to a snapshot")
+
+    def encode(self, roots: List[tcd.Objects]) -> bytes:
+        root_ids = [self.reference(obj) for obj in roots]
+        records = []
+        # objects found while encoding are appended, so this walks the whole graph
+        index = 0
+        while index < len(self.objects):
+            obj = self.objects[index]
+            if isinstance(obj, tcd.IoDevice) and obj.index_path is None:
+                # an index of data can not be read again, its boxes are written
+                obj.expand()
+            cid = self.class_id(obj.__class__)
+            values = [
+                self.value(getattr(obj, name))
+                for name in self.class_fields[obj.__class__]
+            ]
+            records.append((cid, values))
+            index += 1
+        payload = (self.strings, self.classes, records, root_ids)
+        return marshal.dumps(payload, _MARSHAL_VERSION)
+
+
+class _Decoder:
+    def __init__(self, strings: List[str], objects: List[tcd.Objects]):
+        self.strings = strings
+        self.objects = objects
+
+    def value(self, value: Any) -> Any:
+        if value is None or value is True or value is False:
+            return value
+        if isinstance(value, int):
+            return self.strings[value]
+        if isinstance(value, list):
+            return [self.value(item) for item in value]
+        if isinstance(value, dict):
+            return {self.value(key): self.value(item) for key, item in value.items()}
+        tag, data = value
+        if tag == "r":
+            return self.objects[data]
+        if tag == "p":
+            return Path(self.strings[data])
+        if tag == "n":
+            return data
+        if tag == "t":
+            return tuple(self.value(item) for item in data)
+        raise SnapshotError(f"unknown value tag: {tag}")
+
+
+def _resolve_class(name: str) -> type:
+    cls = getattr(tcd, name, None)
+    if not (isinstance(cls, type) and issubclass(cls, tcd.Base)):
+        raise SnapshotError(f"unknown object class in snapshot: {name}")
+    return cls
+
+
+def _defaults(cls: type, names: List[str]) -> Dict[str, Any]:
+    """Values of fields added to a class after the snapshot was written."""
+    defaults = {}
+    for field in dataclasses.fields(cls):
+        if field.name in names:
+            continue
+        if field.default_factory is not dataclasses.MISSING:
+            defaults[field.name] = (field.default_factory, None)
+        else:
+            defaults[field.name] = (None, field.default)
+    return defaults
+
+
+def dumps_snapshot(objects: List[tcd.Objects]) -> bytes:
+    """Serialize loaded objects, see save_snapshot."""
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION) + _Encoder().encode(
+        list(objects)
+    )
+
+
+def loads_snapshot(data: bytes, weak_parents: bool = False) -> List[tcd.Objects]:
+    """Restore objects serialized with dumps_snapshot."""
+    if len(data) < _HEADER.size:
+        raise SnapshotError("file is too short to be a snapshot")
+    magic, version = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("file is not a pytwincatparser snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"snapshot version {version} is not supported, expected {SNAPSHOT_VERSION}"
+        )
+    try:
+        strings, classes, records, root_ids = marshal.loads(
+            memoryview(data)[_HEADER.size :]
+        )
+    except (EOFError, ValueError, TypeError) as e:
+        raise SnapshotError(f"snapshot is corrupt: {e}") from e
+
+    layouts = []
+    for name_id, field_ids in classes:
+        cls = _resolve_class(strings[name_id])
+        names = [strings[field_id] for field_id in field_ids]
+        layouts.append((cls, names, _defaults(cls, names)))
+
+    # create every object first, so references can point forward
+    objects = [layouts[cid][0].__new__(layouts[cid][0]) for cid, _ in records]
+    decoder = _Decoder(strings=strings, objects=objects)
+    for obj, (cid, values) in zip(objects, records):
+        _, names, defaults = layouts[cid]
+        state = obj.__dict__
+        for name, value in zip(names, values):
+            state[name] = decoder.value(value)
+        for name, (factory, default) in defaults.items():
+            state[name] = factory() if factory is not None else default
+
+    roots = [objects[oid] for oid in root_ids]
+    if weak_parents:
+        tcd.weaken_parents(roots)
+    return roots
+
+
+def save_snapshot(objects: List[tcd.Objects], path: Path) -> None:
+    """
+    Save loaded objects to a compact binary snapshot.
+
+    Strings are stored once and parents are stored as object ids, so the
+    snapshot holds no cycles and is read back sequentially.
+
+    Args:
+        objects: The objects returned by the Loader.
+        path: The snapshot file, it is replaced atomically.
+    """
+    path = Path(path)
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_bytes(dumps_snapshot(objects))
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path: Path, weak_parents: bool = False) -> List[tcd.Objects]:
+    """
+    Load objects from a snapshot written by save_snapshot.
+
+    Args:
+        path: The snapshot file.
+        weak_parents: Restore the parent links as weak proxies, see tcd.weaken_parents.
+
+    Returns:
+        The objects in the order they were saved.
+
+    Raises:
+        SnapshotError: If the file is no snapshot or has another format version.
+    """
+    return loads_snapshot(Path(path).read_bytes(), weak_parents=weak_parents)
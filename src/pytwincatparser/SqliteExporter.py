@@ -0,0 +1,311 @@
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import TwincatDataclasses as tcd
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE objects (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    name TEXT,
+    identifier TEXT,
+    name_space TEXT,
+    parent_id INTEGER REFERENCES objects(id),
+    path TEXT,
+    return_type TEXT,
+    access_modifier TEXT,
+    declaration TEXT,
+    implementation TEXT
+);
+CREATE TABLE variables (
+    id INTEGER PRIMARY KEY,
+    owner_id INTEGER REFERENCES objects(id),
+    name TEXT NOT NULL,
+    identifier TEXT,
+    type TEXT,
+    initial_value TEXT,
+    comment TEXT,
+    section_type TEXT,
+    section_modifier TEXT
+);
+CREATE TABLE variable_attributes (
+    variable_id INTEGER NOT NULL REFERENCES variables(id),
+    attribute TEXT NOT NULL,
+    value TEXT
+);
+CREATE TABLE documentation (
+    owner_id INTEGER PRIMARY KEY,
+    details TEXT,
+    usage TEXT,
+    returns TEXT
+);
+CREATE TABLE documentation_tags (
+    owner_id INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    value TEXT
+);
+CREATE TABLE dependencies (
+    project_id INTEGER NOT NULL REFERENCES objects(id),
+    name TEXT NOT NULL,
+    version TEXT,
+    category TEXT
+);
+CREATE TABLE inheritance (
+    object_id INTEGER NOT NULL REFERENCES objects(id),
+    relation TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+CREATE INDEX objects_name ON objects(name);
+CREATE INDEX objects_identifier ON objects(identifier);
+CREATE INDEX objects_kind ON objects(kind);
+CREATE INDEX objects_parent ON objects(parent_id);
+CREATE INDEX variables_name ON variables(name);
+CREATE INDEX variables_type ON variables(type);
+CREATE INDEX variables_owner ON variables(owner_id);
+CREATE INDEX variables_section ON variables(section_type);
+CREATE INDEX variable_attributes_variable ON variable_attributes(variable_id);
+CREATE INDEX variable_attributes_attribute ON variable_attributes(attribute);
+CREATE INDEX documentation_tags_owner ON documentation_tags(owner_id);
+CREATE INDEX dependencies_project ON dependencies(project_id);
+CREATE INDEX inheritance_object ON inheritance(object_id);
+CREATE INDEX inheritance_target ON inheritance(target);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE documentation_fts USING fts5(
+    owner_id UNINDEXED, identifier, text
+);
+"""
+
+_INSERTS = {
+    "objects": "INSERT INTO objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "variables": "INSERT INTO variables VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "variable_attributes": "INSERT INTO variable_attributes VALUES (?, ?, ?)",
+    "documentation": "INSERT INTO documentation VALUES (?, ?, ?, ?)",
+    "documentation_tags": "INSERT INTO documentation_tags VALUES (?, ?, ?)",
+    "dependencies": "INSERT INTO dependencies VALUES (?, ?, ?, ?)",
+    "inheritance": "INSERT INTO inheritance VALUES (?, ?, ?)",
+    "documentation_fts": "INSERT INTO documentation_fts VALUES (?, ?, ?)",
+}
+
+
+_ATTRIBUTE = re.compile(
+    r"^\{\s*attribute\s+'([^']*)'(?:\s*:=\s*'([^']*)')?\s*\}$", re.IGNORECASE
+)
+
+
+def _attributes(
+    attributes: Dict[str, str] | List[str],
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    (name, value) of the attributes of a variable.
+
+    The parser keeps the pragmas as written, {attribute 'pack_mode' := '1'}
+    becomes ("pack_mode", "1"). Other pragmas are stored as they are.
+    """
+    if isinstance(attributes, dict):
+        yield from attributes.items()
+        return
+    for pragma in attributes:
+        match = _ATTRIBUTE.match(pragma.strip())
+        if match:
+            yield match.group(1), match.group(2)
+        else:
+            yield pragma, None
+
+
+def _identifier(obj: tcd.Objects) -> Optional[str]:
+    try:
+        return obj.get_identifier() or None
+    except AttributeError:
+        return None
+
+
+def _path(obj: tcd.Objects) -> Optional[str]:
+    return None if obj.path is None else str(obj.path)
+
+
+def _modifier(value) -> Optional[str]:
+    # parse_variables stores the block keyword as a list, e.g. ["PERSISTENT"]
+    if isinstance(value, list):
+        return " ".join(value) or None
+    return value
+
+
+class _Batches:
+    """Rows per table, written with executemany whenever a batch is full."""
+
+    def __init__(self, connection: sqlite3.Connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.rows: Dict[str, List[tuple]] = {table: [] for table in _INSERTS}
+
+    def add(self, table: str, row: tuple):
+        rows = self.rows[table]
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table: str | None = None):
+        for name in [table] if table else list(self.rows):
+            if self.rows[name]:
+                self.connection.executemany(_INSERTS[name], self.rows[name])
+                self.rows[name] = []
+
+
+def export_sqlite(
+    objects: Iterable[tcd.Objects],
+    path: Path,
+    fts: bool = True,
+    batch_size: int = 10000,
+) -> None:
+    """
+    Export loaded objects to a new SQLite database.
+
+    Pous, interfaces, duts, gvls, methods, properties (with get/set) and projects
+    are rows of "objects", variables have their own table. Objects and variables
+    share one id space, so documentation rows point to either of them.
+
+    Args:
+        objects: The objects returned by the Loader.
+        path: The database file, an existing file is replaced.
+        fts: Also fill the FTS5 table documentation_fts, if SQLite supports it.
+        batch_size: Rows per executemany call.
+    """
+    path = Path(path)
+    if path.exists():
+        path.unlink()
+
+    all_objects = list(tcd.iter_objects(objects))
+    ids = {id(obj): index + 1 for index, obj in enumerate(all_objects)}
+
+    connection = sqlite3.connect(path)
+    try:
+        connection.executescript(SCHEMA)
+        if fts:
+            try:
+                connection.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                logger.warning(f"no FTS5 support, documentation_fts is skipped: {e}")
+                fts = False
+
+        batches = _Batches(connection, batch_size=batch_size)
+        with connection:
+            for obj in all_objects:
+                _export_object(obj, ids, batches, fts)
+            batches.flush()
+    finally:
+        connection.close()
+
+
+def _export_object(
+    obj: tcd.Objects, ids: Dict[int, int], batches: _Batches, fts: bool
+) -> None:
+    if isinstance(obj, (tcd.Documentation, tcd.Dependency, tcd.Get, tcd.Set)):
+        # exported with their owner
+        return
+
+    object_id = ids[id(obj)]
+    parent = tcd.unwrap(obj.parent)
+    parent_id = ids.get(id(parent)) if isinstance(parent, tcd.Base) else None
+    identifier = _identifier(obj)
+
+    if isinstance(obj, tcd.Variable):
+        batches.add(
+            "variables",
+            (
+                object_id,
+                parent_id,
+                obj.name,
+                identifier,
+                obj.type,
+                obj.initial_value,
+                obj.comment,
+                obj.section_type,
+                _modifier(obj.section_modifier),
+            ),
+        )
+        for attribute, value in _attributes(obj.attributes):
+            batches.add("variable_attributes", (object_id, attribute, value))
+    else:
+        batches.add(
+            "objects",
+            (
+                object_id,
+                obj.kind,
+                obj.name,
+                identifier,
+                obj.name_space,
+                parent_id,
+                _path(obj),
+                getattr(obj, "returnType", None),
+                getattr(obj, "accessModifier", None)
+                or getattr(obj, "access_specifier", None)
+                or None,
+                getattr(obj, "declaration", None),
+                getattr(obj, "implementation", None),
+            ),
+        )
+
+    if isinstance(obj, tcd.Property):
+        # get and set have no parent link of their own, the property is the parent
+        for accessor in (obj.get, obj.set):
+            if accessor is not None:
+                batches.add(
+                    "objects",
+                    (
+                        ids[id(accessor)],
+                        accessor.kind,
+                        accessor.name,
+                        None,
+                        obj.name_space,
+                        object_id,
+                        None,
+                        None,
+                        None,
+                        accessor.declaration,
+                        accessor.implementation,
+                    ),
+                )
+
+    for relation in ("extends", "implements"):
+        for target in getattr(obj, relation, None) or []:
+            batches.add("inheritance", (object_id, relation, target))
+
+    if isinstance(obj, tcd.PlcProject):
+        for dependency in obj.dependencies:
+            batches.add(
+                "dependencies",
+                (object_id, dependency.name, dependency.version, dependency.category),
+            )
+
+    documentation = getattr(obj, "documentation", None)
+    if documentation is not None:
+        batches.add(
+            "documentation",
+            (
+                object_id,
+                documentation.details,
+                documentation.usage,
+                documentation.returns,
+            ),
+        )
+        for tag, value in documentation.custom_tags.items():
+            batches.add("documentation_tags", (object_id, tag, value))
+        if fts:
+            texts = [
+                documentation.details,
+                documentation.usage,
+                documentation.returns,
+                *documentation.custom_tags.values(),
+            ]
+            if isinstance(obj, tcd.Variable):
+                texts.append(obj.comment)
+            text = "\n".join(text for text in texts if text)
+            if text:
+                batches.add("documentation_fts", (object_id, identifier, text))
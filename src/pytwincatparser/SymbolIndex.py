@@ -0,0 +1,290 @@
+import bisect
+import re
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import TwincatDataclasses as tcd
+from .BaseIndex import BaseIndex
+
+# kinds of objects which are symbols of the index
+_SYMBOL_KINDS = (
+    tcd.Pou,
+    tcd.Itf,
+    tcd.Dut,
+    tcd.Gvl,
+    tcd.Method,
+    tcd.Property,
+    tcd.Variable,
+)
+
+_WORD_START = re.compile(r"(?:^|(?<=_)|(?<=\.))[A-Za-z0-9]|(?<=[a-z0-9])[A-Z]")
+
+# candidates taken from the trigram index before fuzzy matching
+_MAX_CANDIDATES = 256
+# postings counted at most for a query
+_MAX_COUNTED = 8192
+
+
+def normalize_symbol(name: str) -> str:
+    """Lower case name without separators, "FB_Axis.MoveAbs" -> "fbaxismoveabs"."""
+    return name.lower().replace("_", "").replace(".", "")
+
+
+def trigrams(text: str) -> List[str]:
+    """Distinct trigrams of a normalized name."""
+    return list(dict.fromkeys(text[i : i + 3] for i in range(len(text) - 2)))
+
+
+def fuzzy_score(query: str, name: str) -> Optional[float]:
+    """
+    Score how well a query matches a name as abbreviation.
+
+    Every character of the query has to appear in the name in the same order.
+    Characters at the start of a word (after "_" or at a camelCase hump) and
+    consecutive runs score higher, long names score lower.
+
+    Args:
+        query: The normalized query, see normalize_symbol.
+        name: The name as written in the code.
+
+    Returns:
+        The score or None if the query does not match.
+    """
+    starts = [match.start() for match in _WORD_START.finditer(name)]
+    lowered = name.lower()
+    score = 0.0
+    position = 0
+    for char in query:
+        if position > 0 and lowered.startswith(char, position):
+            # continue the current run
+            index = position
+            score += 2.0
+        else:
+            # otherwise prefer the next word starting with the character
+            index = -1
+            for start in starts[bisect.bisect_left(starts, position) :]:
+                if lowered[start] == char:
+                    index = start
+                    break
+            if index == -1:
+                index = lowered.find(char, position)
+                if index == -1:
+                    return None
+        if index in starts:
+            score += 3.0
+        score += 1.0
+        position = index + 1
+    return score - 0.05 * len(name)
+
+
+@dataclass
+class SymbolMatch:
+    identifier: str
+    kind: str
+    score: float
+    obj: Optional[tcd.Objects] = None
+
+
+class SymbolIndex(BaseIndex):
+    """
+    Symbol search for completion and workspace symbols.
+
+    Every identifier get_identifier() produces is indexed by sorted prefix
+    tables, one per name length, and a trigram index. Prefix queries are
+    answered with a binary search per length, shortest names first,
+    abbreviations ("fbaxmov" -> FB_AxisMove) through the trigrams and a
+    fuzzy subsequence score. Removed symbols are tombstoned and compacted once
+    they make up half of the index.
+    """
+
+    def __init__(self):
+        self._identifiers: List[Optional[str]] = []
+        self._names: List[str] = []
+        self._keys: List[str] = []
+        self._kinds: List[str] = []
+        self._objects: List[Optional[tcd.Objects]] = []
+        self._by_path: Dict[str, List[int]] = {}
+        self._trigrams: Dict[str, array] = {}
+        self._deleted: set[int] = set()
+        # (key, symbol) sorted per length of the key
+        self._prefix: Optional[Dict[int, List[Tuple[str, int]]]] = None
+
+    def __len__(self) -> int:
+        return len(self._identifiers) - len(self._deleted)
+
+    def add_objects(self, objects: List[tcd.Objects]) -> None:
+        for obj in objects:
+            if isinstance(obj, _SYMBOL_KINDS) and obj.name:
+                try:
+                    identifier = obj.get_identifier()
+                except AttributeError:
+                    # e.g. a variable without parent, it has no identifier
+                    continue
+                path = tcd.source_path(obj)
+                self.add_symbol(
+                    identifier=identifier,
+                    name=obj.name,
+                    kind=obj.kind,
+                    path=None if path is None else str(path),
+                    obj=obj,
+                )
+
+    def add_symbol(
+        self,
+        identifier: str,
+        name: str,
+        kind: str,
+        path: Optional[str] = None,
+        obj: Optional[tcd.Objects] = None,
+    ) -> int:
+        """Add a single symbol and return its id."""
+        symbol = len(self._identifiers)
+        key = normalize_symbol(name)
+        self._identifiers.append(identifier)
+        self._names.append(name)
+        self._keys.append(key)
+        self._kinds.append(kind)
+        self._objects.append(obj)
+        if path is not None:
+            self._by_path.setdefault(path, []).append(symbol)
+        for trigram in trigrams(key):
+            postings = self._trigrams.get(trigram)
+            if postings is None:
+                postings = self._trigrams[trigram] = array("I")
+            postings.append(symbol)
+        if self._prefix is not None:
+            # keep an existing table sorted, a missing one is built on demand
+            bisect.insort(self._prefix.setdefault(len(key), []), (key, symbol))
+        return symbol
+
+    def remove_paths(self, paths: Iterable[str | Path]) -> None:
+        for path in paths:
+            for symbol in self._by_path.pop(str(path), []):
+                self._deleted.add(symbol)
+                self._objects[symbol] = None
+        if len(self._deleted) > 1024 and len(self._deleted) * 2 > len(self._keys):
+            self._compact()
+
+    def _compact(self):
+        alive = [
+            (self._identifiers[i], self._names[i], self._kinds[i], self._objects[i])
+            for i in range(len(self._identifiers))
+            if i not in self._deleted
+        ]
+        paths = {
+            symbol: path
+            for path, symbols in self._by_path.items()
+            for symbol in symbols
+        }
+        old_ids = [i for i in range(len(self._identifiers)) if i not in self._deleted]
+        self.__init__()
+        for old_id, (identifier, name, kind, obj) in zip(old_ids, alive):
+            self.add_symbol(identifier, name, kind, path=paths.get(old_id), obj=obj)
+
+    def _prefix_tables(self) -> Dict[int, List[Tuple[str, int]]]:
+        if self._prefix is None:
+            tables: Dict[int, List[Tuple[str, int]]] = {}
+            for symbol, key in enumerate(self._keys):
+                if symbol not in self._deleted:
+                    tables.setdefault(len(key), []).append((key, symbol))
+            for table in tables.values():
+                table.sort()
+            self._prefix = tables
+        return self._prefix
+
+    def complete(self, prefix: str, limit: int = 50) -> List[SymbolMatch]:
+        """Return the symbols whose name starts with prefix, shortest first."""
+        return [
+            self._match(symbol, 0.0)
+            for symbol in self._complete(normalize_symbol(prefix), limit)
+        ]
+
+    def _complete(self, key: str, limit: int) -> List[int]:
+        # shorter names first, each length is sorted, so the first `limit`
+        # matches are found without looking at the other names of the prefix
+        tables = self._prefix_tables()
+        matches: List[int] = []
+        for length in sorted(tables):
+            if length < len(key):
+                continue
+            table = tables[length]
+            index = bisect.bisect_left(table, (key, -1))
+            while index < len(table) and len(matches) < limit:
+                name_key, symbol = table[index]
+                if not name_key.startswith(key):
+                    break
+                if symbol not in self._deleted:
+                    matches.append(symbol)
+                index += 1
+            if len(matches) >= limit:
+                break
+        return matches
+
+    def search(
+        self, query: str, limit: int = 20, kinds: Iterable[str] | None = None
+    ) -> List[SymbolMatch]:
+        """
+        Fuzzy symbol search.
+
+        Args:
+            query: Name, prefix or abbreviation of the symbol.
+            limit: Maximum number of matches.
+            kinds: Only return symbols of these kinds ("pou", "method", ...).
+
+        Returns:
+            The matches, best first.
+        """
+        key = normalize_symbol(query)
+        if not key:
+            return []
+        kinds = set(kinds) if kinds is not None else None
+
+        candidates: Dict[int, int] = {}
+        for symbol in self._complete(key, limit=_MAX_CANDIDATES):
+            candidates[symbol] = len(key)
+        # count the rare trigrams only, common ones ("fb_") say little and cost most
+        postings_lists = sorted(
+            (
+                self._trigrams[trigram]
+                for trigram in trigrams(key)
+                if trigram in self._trigrams
+            ),
+            key=len,
+        )
+        counter: Counter = Counter()
+        counted = 0
+        for postings in postings_lists:
+            if counted and counted + len(postings) > _MAX_COUNTED:
+                break
+            counter.update(postings)
+            counted += len(postings)
+        for symbol, hits in counter.most_common(_MAX_CANDIDATES):
+            candidates.setdefault(symbol, hits)
+
+        scored = []
+        for symbol in candidates:
+            if symbol in self._deleted:
+                continue
+            if kinds is not None and self._kinds[symbol] not in kinds:
+                continue
+            score = fuzzy_score(key, self._names[symbol])
+            if score is None:
+                continue
+            if self._keys[symbol] == key:
+                score += 10.0
+            elif self._keys[symbol].startswith(key):
+                score += 5.0
+            scored.append((-score, self._identifiers[symbol], symbol))
+        scored.sort()
+        return [self._match(symbol, -score) for score, _, symbol in scored[:limit]]
+
+    def _match(self, symbol: int, score: float) -> SymbolMatch:
+        return SymbolMatch(
+            identifier=self._identifiers[symbol],
+            kind=self._kinds[symbol],
+            score=score,
+            obj=self._objects[symbol],
+        )
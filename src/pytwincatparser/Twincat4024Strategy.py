@@ -1,16 +1,27 @@
+import fnmatch
+import io
 import logging
+import os
+import pickle
+import posixpath
 import re
+import threading
 from abc import ABC, abstractmethod
-from pathlib import Path, PurePath, PureWindowsPath
-from typing import List, Optional
+from pathlib import Path, PurePath, PurePosixPath
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
 
 from . import parse_declaration as parse_decl
+from lxml import etree
 from xsdata.formats.dataclass.parsers import XmlParser
 from xsdata.formats.dataclass.parsers.config import ParserConfig
 
 from . import TwincatDataclasses as tcd
+from .BaseSource import BaseSource
+from .IoConfig import LAZY_SECTIONS, IoIndex, ProjectSections
 from .BaseStrategy import BaseStrategy
 from .Loader import add_strategy
+from .PathIndex import PathIndex, normalize_include
 from .TwincatObjects.tc_plc_object import (
     Dut,
     Get,
@@ -23,9 +34,70 @@ from .TwincatObjects.tc_plc_object import (
     TcPlcObject,
 )
 from .TwincatObjects.tc_plc_project import Compile, PlaceholderReference, Project
+from .TwincatObjects.tc_twincat_project import Project as TsProject
+from .TwincatObjects.tc_twincat_project import Plc, System
 
 logger = logging.getLogger(__name__)
 
+# content of a file handed to a handler instead of its path
+Data = Union[bytes, bytearray, memoryview, BinaryIO]
+
+
+# comments, pragmas and strings, which may contain names or ";"
+_NOT_CODE = re.compile(
+    r"\(\*[\s\S]*?\*\)|//[^\n]*|\{[^}]*\}|'(?:\$.|[^'$])*'|\"(?:\$.|[^\"$])*\""
+)
+
+
+# a located variable, "bDoor AT %I*"
+_AT = re.compile(r"^(.*?)\s+AT\s+(%\S+)$", re.IGNORECASE | re.DOTALL)
+
+
+def _blank_comments(text: str) -> str:
+    """Replace comments, pragmas and strings with spaces, offsets stay the same."""
+    return _NOT_CODE.sub(lambda match: " " * len(match.group()), text)
+
+
+_DECLARATION_TOKEN = re.compile(r"\w+|[()\[\];,:]")
+
+
+def _variable_span(
+    code: str, name: str, start: int, offset: int
+) -> Tuple[Optional[Tuple[int, int]], int]:
+    """
+    Find the declaration of a variable in the blanked content of a var block.
+
+    Only names at the start of a declaration count, after a ";", after a ","
+    of a name list or at the start of the block, not the names in the
+    initial values or array bounds of earlier declarations.
+
+    Returns:
+        The span in the declaration (the content starts at offset) and the
+        position to search the next variable from.
+    """
+    identifier = re.match(r"\w+", name)
+    key = (identifier.group() if identifier else name).casefold()
+    depth = 0
+    # the search continues behind the name of the variable before
+    at_start = start == 0
+    for token in _DECLARATION_TOKEN.finditer(code, start):
+        text = token.group()
+        if text in "([":
+            depth += 1
+        elif text in ")]":
+            depth = max(depth - 1, 0)
+        elif depth:
+            continue
+        elif text in ";,":
+            at_start = True
+        elif text == ":":
+            at_start = False
+        elif at_start and text.casefold() == key:
+            end = code.find(";", token.end())
+            end = len(code) if end == -1 else end + 1
+            return (offset + token.start(), offset + end), token.end()
+    return None, start
+
 
 def parse_documentation(declaration: str) -> Optional[tcd.Documentation]:
     # Helper function to clean up tag content
@@ -54,6 +126,13 @@ def parse_documentation(declaration: str) -> Optional[tcd.Documentation]:
     comments = parse_decl.get_comments(decl=decl_without_varblocks)
     for comment in comments.get("comments"):
         temp = parse_decl.get_comment_content(comment)
+        if temp.get("documentation"):
+            start = declaration.find(comment)
+            if start != -1:
+                span = (start, start + len(comment))
+                if doc.span is not None:
+                    span = (min(doc.span[0], span[0]), max(doc.span[1], span[1]))
+                doc.span = span
         for key, value in temp.get("documentation").items():
             if key == "details":
                 doc.details = clean_tag_content(value)
@@ -80,19 +159,28 @@ def parse_variables(declaration: str) -> List[tcd.Variable]:
     variables = []
 
     found_var = []
-    found_var_blocks = parse_decl.get_var_blocks(declaration)
+    found_var_blocks = parse_decl.get_var_blocks(declaration, spans=True)
     for var_block in found_var_blocks:
         temp_variables = parse_decl.get_var(var_block["content"])
         keyword = parse_decl.get_var_keyword(var_block["content"])
+        code = _blank_comments(var_block["content"])
+        position = 0
         for var in temp_variables:
             temp = parse_decl.get_var_content(var)
             for temp_var in temp:
                 temp_var["var_type"] = var_block["name"]
                 temp_var["access_modifier"] = keyword
+                temp_var["span"], position = _variable_span(
+                    code, temp_var["name"], position, var_block["start"]
+                )
                 found_var.append(temp_var)
 
     for var in found_var:
         comments = parse_decl.get_comment_content(var["comments"])
+        located = _AT.match(var["name"])
+        name, address = (
+            (located.group(1), located.group(2)) if located else (var["name"], None)
+        )
 
         if comments["documentation"].get("details") is not None:
             details = comments["documentation"].get("details")
@@ -108,7 +196,7 @@ def parse_variables(declaration: str) -> List[tcd.Variable]:
         
         # Create the variable
         current_var = tcd.Variable(
-            name=var["name"],
+            name=name,
             type=var["type"],
             initial_value=var["init"],
             comment=var["comments"],
@@ -116,7 +204,8 @@ def parse_variables(declaration: str) -> List[tcd.Variable]:
             section_type=var["var_type"].lower(),
             documentation=doc,
             section_modifier=var["access_modifier"],
-
+            span=var["span"],
+            address=address,
         )
         current_var.labels.append(var["type"])
         variables.append(current_var)
@@ -234,19 +323,71 @@ def parse_placeholder_reference(placeholder: PlaceholderReference) -> tcd.Depend
         return tcd.Dependency(name=name, version=version, category=vendor)
 
 
+def absolute_path(path: Path) -> Path:
+    """Paths coming from a PathIndex are already absolute, only resolve the others."""
+    if path.is_absolute():
+        return path
+    return path.resolve()
+
+
+def object_path(path: Path, data: Data | None = None) -> Path:
+    """Path of a loaded object, a file given as data keeps its (virtual) path."""
+    if data is not None:
+        return Path(path)
+    return absolute_path(Path(path))
+
+
 class FileHandler(ABC):
     def __init__(self, suffix):
         self.suffix: str = suffix.lower()
         self.config = ParserConfig(fail_on_unknown_properties=False)
-        self.parser = XmlParser(config=self.config)
+        self._local = threading.local()
         super().__init__()
 
+    @property
+    def parser(self) -> XmlParser:
+        # xsdata parsers keep state while parsing, every thread gets its own
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = XmlParser(config=self.config)
+            self._local.parser = parser
+        return parser
+
+    @property
+    def xml_parser(self) -> etree.XMLParser:
+        # same settings as the iterparse of xsdata, one parser per thread as well
+        xml_parser = getattr(self._local, "xml_parser", None)
+        if xml_parser is None:
+            xml_parser = etree.XMLParser(
+                recover=True, remove_comments=True, resolve_entities=False
+            )
+            self._local.xml_parser = xml_parser
+        return xml_parser
+
+    def parse(self, path: Path, clazz: type, data: Data | None = None):
+        """
+        Parse the file at path, or data if given.
+
+        Args:
+            path: The file, only read if data is None.
+            clazz: The xsdata class of the root element.
+            data: The content as bytes, bytearray or memoryview, or an open
+                binary stream. Buffers are handed to lxml as they are,
+                without a file object or a copy in between.
+        """
+        if data is None:
+            return self.parser.parse(path, clazz)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return self.parser.parse(etree.fromstring(data, self.xml_parser), clazz)
+        return self.parser.parse(data, clazz)
+
     @abstractmethod
     def load_object(
         self,
         path: Path,
         obj_store: List[tcd.Objects],
         parent: tcd.Objects | None = None,
+        data: Data | None = None,
     ):
         raise NotImplementedError()
 
@@ -284,7 +425,11 @@ class SolutionHandler(FileHandler):
         super().__init__(suffix=".sln")
 
     def load_object(
-        self, path, obj_store: List[tcd.Objects], parent: tcd.Objects | None = None
+        self,
+        path,
+        obj_store: List[tcd.Objects],
+        parent: tcd.Objects | None = None,
+        data: Data | None = None,
     ):
         raise NotImplementedError("SolutionFileHandler not implemented")
 
@@ -294,9 +439,152 @@ class TwincatProjectHandler(FileHandler):
         super().__init__(suffix=".tsproj")
 
     def load_object(
-        self, path, obj_store: List[tcd.Objects], parent: tcd.Objects | None = None
+        self,
+        path,
+        obj_store: List[tcd.Objects],
+        parent: tcd.Objects | None = None,
+        data: Data | None = None,
+        path_index: PathIndex | None = None,
     ):
-        raise NotImplementedError("TwincatProjectHandler not implemented")
+        """
+        Load a .tsproj and the plc projects stored next to it.
+
+        Args:
+            path_index: Files the plc projects are resolved against. A project
+                given as data without it loads no other file and keeps the
+                paths of its plc projects virtual.
+        """
+        if data is not None and not isinstance(data, (bytes, bytearray, memoryview)):
+            data = data.read()
+        system, plc = self.read_sections(path, data)
+
+        tsproj = tcd.TwincatProject(
+            name=Path(path).stem,
+            path=object_path(path, data),
+        )
+        tsproj._sections = ProjectSections(
+            tsproj.path if data is None else bytes(data), tsproj.path
+        )
+
+        if system is not None and system.tasks is not None:
+            for _task in system.tasks.task:
+                task = tcd.Task(
+                    name=_task.name,
+                    path=tsproj.path,
+                    parent=tsproj,
+                    priority=_task.priority,
+                    cycle_time=_task.cycle_time,
+                    ams_port=_task.ams_port,
+                )
+                tsproj.tasks.append(task)
+
+        if plc is not None:
+            # without an index the project paths are joined to the folder of path
+            folder = path_index or PathIndex(Path(path).parent, ())
+            for _plc in plc.project:
+                tsproj.plc_instances.append(
+                    load_plc_instance(_plc, tsproj, folder, resolve=data is None)
+                )
+
+        if parent is not None:
+            tsproj.parent = parent
+
+        # plc projects stored next to the .tsproj are loaded with it, those of
+        # a project given as data only from a folder the caller named
+        for instance in tsproj.plc_instances:
+            project_path = instance.project_path
+            if project_path is None or (data is not None and path_index is None):
+                continue
+            if not project_path.is_file():
+                continue
+            if is_handler_in_list(project_path.suffix):
+                tsproj.sub_paths.append(project_path)
+                handler = get_handler(project_path.suffix)
+                handler.load_object(path=project_path, obj_store=obj_store)
+
+        obj_store.append(tsproj)
+
+
+    def read_sections(self, path: Path, data: Data | None = None):
+        """
+        Parse the System and Plc sections of a .tsproj, streamed with iterparse.
+
+        The Io and Mappings sections are skipped without building their
+        elements, reading stops at the first of them after both sections.
+        """
+        source = str(path) if data is None else io.BytesIO(data)
+        system = plc = None
+        skipping = 0
+        for event, element in etree.iterparse(
+            source,
+            events=("start", "end"),
+            remove_comments=True,
+            resolve_entities=False,
+            huge_tree=True,
+        ):
+            tag = element.tag
+            if event == "start":
+                if tag in LAZY_SECTIONS:
+                    if system is not None and plc is not None:
+                        break
+                    skipping += 1
+                continue
+            if skipping:
+                if tag in LAZY_SECTIONS:
+                    skipping -= 1
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+            elif tag == "System" and system is None:
+                system = self.parser.parse(element, System)
+                element.clear()
+            elif tag == "Plc" and plc is None:
+                plc = self.parser.parse(element, Plc)
+                element.clear()
+        return system, plc
+
+
+def load_plc_instance(
+    _plc: TsProject,
+    tsproj: tcd.TwincatProject,
+    path_index: PathIndex,
+    resolve: bool = True,
+) -> tcd.PlcInstance:
+    """
+    A plc project entry of a .tsproj, File="X.xti" entries are stored in the .xti.
+
+    Args:
+        path_index: Files next to the .tsproj the project path is resolved against.
+        resolve: Make the project path absolute, False keeps a virtual path.
+    """
+    if _plc.file is not None:
+        project_path = path_index.resolve("_Config/PLC/" + normalize_include(_plc.file))
+        name = Path(normalize_include(_plc.file)).stem
+    else:
+        project_path = (
+            path_index.resolve(_plc.prj_file_path) if _plc.prj_file_path else None
+        )
+        name = _plc.name
+
+    tasks = []
+    instance = _plc.instance
+    if instance is not None and instance.contexts is not None:
+        context = instance.contexts.context
+        if context is not None and context.name:
+            tasks.append(context.name)
+
+    return tcd.PlcInstance(
+        name=name,
+        path=tsproj.path,
+        parent=tsproj,
+        project_path=(
+            absolute_path(project_path)
+            if project_path is not None and resolve
+            else project_path
+        ),
+        ams_port=_plc.ams_port,
+        tasks=tasks,
+    )
 
 
 class XtiHandler(FileHandler):
@@ -304,9 +592,25 @@ class XtiHandler(FileHandler):
         super().__init__(suffix=".xti")
 
     def load_object(
-        self, path, obj_store: List[tcd.Objects], parent: tcd.Objects | None = None
+        self,
+        path,
+        obj_store: List[tcd.Objects],
+        parent: tcd.Objects | None = None,
+        data: Data | None = None,
     ):
-        raise NotImplementedError("XtiHandler not implemented")
+        if data is not None and not isinstance(data, (bytes, bytearray, memoryview)):
+            data = data.read()
+        _path = object_path(path, data)
+        index = IoIndex.read(_path if data is None else bytes(data), _path)
+        if not index.devices:
+            # plc projects and boxes are stored in .xti files as well
+            logger.debug(f"no device in: {path}")
+            return None
+        for device in index.stubs(parent):
+            device.path = _path
+            # a snapshot keeps the file, the index of data is not read again
+            device.index_path = _path if data is None else None
+            obj_store.append(device)
 
 
 class TcTtoHandler(FileHandler):
@@ -314,9 +618,50 @@ class TcTtoHandler(FileHandler):
         super().__init__(suffix=".tctto")
 
     def load_object(
-        self, path, obj_store: List[tcd.Objects], parent: tcd.Objects | None = None
+        self,
+        path,
+        obj_store: List[tcd.Objects],
+        parent: tcd.Objects | None = None,
+        data: Data | None = None,
     ):
-        raise NotImplementedError("tcttoHandler not implemented")
+        if data is None:
+            root = etree.parse(str(path), self.xml_parser).getroot()
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            root = etree.fromstring(data, self.xml_parser)
+        else:
+            root = etree.parse(data, self.xml_parser).getroot()
+        _task = None if root is None else root.find("Task")
+        if _task is None:
+            return None
+
+        # the .TcTTO stores microseconds, tasks of the .tsproj 100 ns
+        cycle_time = _int(_task.findtext("CycleTime"))
+        task = tcd.Task(
+            name=_task.get("Name"),
+            path=object_path(path, data),
+            priority=_int(_task.findtext("Priority")),
+            cycle_time=None if cycle_time is None else cycle_time * 10,
+            programs=[
+                name.strip()
+                for name in _task.xpath("PouCall/Name/text()")
+                if name.strip()
+            ],
+        )
+
+        if parent is not None:
+            task.parent = parent
+            if isinstance(parent, tcd.PlcProject):
+                task.name_space = parent.name_space
+                parent.tasks.append(task)
+
+        obj_store.append(task)
+
+
+def _int(text: Optional[str]) -> Optional[int]:
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
 
 
 class PlcProjectHandler(FileHandler):
@@ -324,9 +669,53 @@ class PlcProjectHandler(FileHandler):
         super().__init__(suffix=".plcproj")
 
     def load_object(
-        self, path, obj_store: List[tcd.Objects], parent: tcd.Objects | None = None
+        self,
+        path,
+        obj_store: List[tcd.Objects],
+        parent: tcd.Objects | None = None,
+        data: Data | None = None,
+        path_index: PathIndex | None = None,
     ):
-        _prj: Project = self.parser.parse(path, Project)
+        """
+        Load a .plcproj and its objects.
+
+        Args:
+            path_index: Files the includes are resolved against. A project
+                given as data without it loads no other file.
+        """
+        plcproj = self.read_project(path, data=data, path_index=path_index)
+        if plcproj is None:
+            return None
+
+        for object_path in plcproj.sub_paths:
+            if data is not None and (path_index is None or not object_path.is_file()):
+                # a project given as data loads objects from a folder the caller named
+                continue
+            if is_handler_in_list(object_path.suffix):
+                handler = get_handler(object_path.suffix)
+                handler.load_object(
+                    path=object_path, obj_store=obj_store, parent=plcproj
+                )
+
+        obj_store.append(plcproj)
+
+    def read_project(
+        self,
+        path,
+        data: Data | None = None,
+        path_index: PathIndex | None = None,
+    ) -> tcd.PlcProject | None:
+        """
+        Read the project file only, the objects in sub_paths are not loaded.
+
+        Args:
+            path: The .plcproj file.
+            data: Content of the file, if it is not read from path.
+            path_index: Files the includes are resolved against. Defaults to
+                the folder of the project on disk, a project given as data
+                joins its includes to the folder of path without reading it.
+        """
+        _prj: Project = self.parse(path, Project, data)
         if _prj is None:
             return None
 
@@ -346,16 +735,20 @@ class PlcProjectHandler(FileHandler):
                     if _dep:
                         dependencies.append(_dep)
 
+        # one directory walk instead of a resolve() per include, matches case-insensitive
+        if path_index is None and data is not None:
+            # bytes have no folder on disk, unrelated files must not match
+            path_index = PathIndex(Path(path).parent, ())
+        elif path_index is None:
+            path_index = PathIndex.from_directory(path.parent)
         for elem in compile_elements:
-            object_paths.append(
-                (path.parent / Path(PureWindowsPath(elem.include))).resolve()
-            )
+            object_paths.append(path_index.resolve(elem.include))
 
         doc = tcd.Documentation(details=_prj.property_group.description)
 
         plcproj = tcd.PlcProject(
             name=_prj.property_group.name,
-            path=path.resolve(),
+            path=path.resolve() if data is None else Path(path),
             default_namespace=_prj.property_group.default_namespace,
             name_space=_prj.property_group.default_namespace,
             version=_prj.property_group.project_version,
@@ -364,17 +757,10 @@ class PlcProjectHandler(FileHandler):
             documentation=doc,
         )
 
-        for object_path in object_paths:
-            if is_handler_in_list(object_path.suffix):
-                handler = get_handler(object_path.suffix)
-                handler.load_object(
-                    path=object_path, obj_store=obj_store, parent=plcproj
-                )
-
         if plcproj.version is not None:
             plcproj.labels.append(plcproj.version)
 
-        obj_store.append(plcproj)
+        return plcproj
 
 
 class TcPouHandler(FileHandler):
@@ -382,9 +768,13 @@ class TcPouHandler(FileHandler):
         super().__init__(suffix=".tcpou")
 
     def load_object(
-        self, path, obj_store: List[tcd.Objects], parent: tcd.Objects | None = None
+        self,
+        path,
+        obj_store: List[tcd.Objects],
+        parent: tcd.Objects | None = None,
+        data: Data | None = None,
     ):
-        _pou: Pou = self.parser.parse(path, TcPlcObject).pou
+        _pou: Pou = self.parse(path, TcPlcObject, data).pou
         if _pou is None:
             return None
 
@@ -424,7 +814,7 @@ class TcPouHandler(FileHandler):
 
         tcPou = tcd.Pou(
             name=_pou.name,
-            path=path.resolve(),
+            path=object_path(path, data),
             declaration=_pou.declaration,
             implementation=implementation_text,
             extends=extends,
@@ -470,9 +860,13 @@ class TcItfHandler(FileHandler):
         super().__init__(suffix=".tcio")
 
     def load_object(
-        self, path, obj_store: List[tcd.Objects], parent: tcd.Objects | None = None
+        self,
+        path,
+        obj_store: List[tcd.Objects],
+        parent: tcd.Objects | None = None,
+        data: Data | None = None,
     ):
-        _itf: Itf = self.parser.parse(path, TcPlcObject).itf
+        _itf: Itf = self.parse(path, TcPlcObject, data).itf
         if _itf is None:
             return None
 
@@ -494,19 +888,11 @@ class TcItfHandler(FileHandler):
 
         tcitf = tcd.Itf(
             name=_itf.name,
-            path=path.resolve(),
+            path=object_path(path, data),
             extends=extends,
             documentation=documentation,
         )
 
-        for prop in properties:
-            prop.parent = tcitf
-        for meth in methods:
-            meth.parent = tcitf
-
-        tcitf.properties = properties
-        tcitf.methods = methods
-
         if parent is not None:
             tcitf.parent = parent
             if parent.__class__ == tcd.PlcProject:
@@ -515,6 +901,16 @@ class TcItfHandler(FileHandler):
                 if hasattr(parent, "itfs"):
                     parent.itfs.append(tcitf)
 
+        for prop in properties:
+            prop.parent = tcitf
+            prop.name_space = tcitf.name_space
+        for meth in methods:
+            meth.parent = tcitf
+            meth.name_space = tcitf.name_space
+
+        tcitf.properties = properties
+        tcitf.methods = methods
+
         if extends is not None:
             tcitf.labels.append("Ext: " + ", ".join([ext for ext in extends]))
 
@@ -528,9 +924,13 @@ class TcDutHandler(FileHandler):
         super().__init__(suffix=".tcdut")
 
     def load_object(
-        self, path, obj_store: List[tcd.Objects], parent: tcd.Objects | None = None
+        self,
+        path,
+        obj_store: List[tcd.Objects],
+        parent: tcd.Objects | None = None,
+        data: Data | None = None,
     ):
-        _dut: Dut = self.parser.parse(path, TcPlcObject).dut
+        _dut: Dut = self.parse(path, TcPlcObject, data).dut
         if _dut is None:
             return None
 
@@ -545,15 +945,11 @@ class TcDutHandler(FileHandler):
 
         dut = tcd.Dut(
             name=_dut.name,
-            path=path.resolve(),
+            path=object_path(path, data),
             declaration=_dut.declaration,
             documentation=documentation,
         )
 
-        for var in variables:
-            var.parent = dut
-            var.name_space = dut.name_space
-
         if parent is not None:
             dut.parent = parent
             if parent.__class__ == tcd.PlcProject:
@@ -562,6 +958,10 @@ class TcDutHandler(FileHandler):
                 if hasattr(parent, "duts"):
                     parent.duts.append(dut)
 
+        for var in variables:
+            var.parent = dut
+            var.name_space = dut.name_space
+
         dut.variables = variables
 
         obj_store.append(dut)
@@ -572,9 +972,13 @@ class TcGvlHandler(FileHandler):
         super().__init__(suffix=".tcgvl")
 
     def load_object(
-        self, path, obj_store: List[tcd.Objects], parent: tcd.Objects | None = None
+        self,
+        path,
+        obj_store: List[tcd.Objects],
+        parent: tcd.Objects | None = None,
+        data: Data | None = None,
     ):
-        _gvl: Gvl = self.parser.parse(path, TcPlcObject).gvl
+        _gvl: Gvl = self.parse(path, TcPlcObject, data).gvl
         if _gvl is None:
             return None
 
@@ -589,15 +993,11 @@ class TcGvlHandler(FileHandler):
 
         gvl: tcd.Gvl = tcd.Gvl(
             name=_gvl.name,
-            path=path.resolve(),
+            path=object_path(path, data),
             declaration=_gvl.declaration,
             documentation=documentation,
         )
 
-        for var in variables:
-            var.parent = gvl
-            var.name_space = gvl.name_space
-
         if parent is not None:
             gvl.parent = parent
             if parent.__class__ == tcd.PlcProject:
@@ -606,20 +1006,200 @@ class TcGvlHandler(FileHandler):
                 if hasattr(parent, "gvls"):
                     parent.gvls.append(gvl)
 
+        for var in variables:
+            var.parent = gvl
+            var.name_space = gvl.name_space
+
         gvl.variables = variables
 
         obj_store.append(gvl)
 
 
 # add_handler(handler=SolutionHandler())
-# add_handler(handler=TwincatProjectHandler())
-# add_handler(handler=XtiHandler())
+add_handler(handler=TwincatProjectHandler())
+add_handler(handler=XtiHandler())
 add_handler(handler=PlcProjectHandler())
 add_handler(handler=TcPouHandler())
 add_handler(handler=TcItfHandler())
 add_handler(handler=TcDutHandler())
 add_handler(handler=TcGvlHandler())
-# add_handler(handler=TcTtoHandler())
+add_handler(handler=TcTtoHandler())
+
+
+# suffixes of the objects a plc project is made of
+PLC_OBJECT_SUFFIXES = (".tcpou", ".tcio", ".tcdut", ".tcgvl", ".tctto")
+
+
+def _load_single(
+    path: Path, parent: tcd.Objects | None, data: Data | None = None
+) -> List[tcd.Objects]:
+    obj_store: List[tcd.Objects] = []
+    try:
+        handler = get_handler(suffix=path.suffix)
+        handler.load_object(path=path, obj_store=obj_store, parent=parent, data=data)
+    except Exception:
+        logger.exception(f"could not load: {path}")
+        return []
+    return obj_store
+
+
+def _map(function, jobs: List[tuple], max_workers: int | None) -> list:
+    if max_workers == 1 or len(jobs) < 2:
+        return [function(*job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda job: function(*job), jobs))
+
+
+def _collect_results(
+    jobs: List[tuple], results: List[List[tcd.Objects]]
+) -> List[tcd.Objects]:
+    objects: List[tcd.Objects] = []
+    for result in results:
+        objects.extend(result)
+
+    # the handlers append to the parents concurrently, restore the job order
+    parents = {id(job[1]): job[1] for job in jobs if job[1] is not None}
+    for parent in parents.values():
+        if isinstance(parent, tcd.PlcProject):
+            _sort_project_lists(parent, objects)
+    return objects
+
+
+def load_files(
+    jobs: Iterable[tuple],
+    max_workers: int | None = None,
+) -> List[tcd.Objects]:
+    """
+    Load many object files, in parallel if max_workers is not 1.
+
+    Args:
+        jobs: Tuples of the file path and the parent the object is attached to,
+            optionally followed by the content of the file.
+        max_workers: Number of worker threads, None lets the executor decide.
+
+    Returns:
+        The loaded objects in the order of the jobs, independent of which thread
+        finished first. Files which fail to load are logged and skipped.
+    """
+    jobs = list(jobs)
+    return _collect_results(jobs, _map(_load_single, jobs, max_workers))
+
+
+class _ParentPickler(pickle.Pickler):
+    """Pickle the objects of one file without the project they are attached to."""
+
+    def __init__(self, file, parent: tcd.Objects | None):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._parent = parent
+
+    def persistent_id(self, obj):
+        if self._parent is not None and obj is self._parent:
+            return "parent"
+        return None
+
+
+class _ParentUnpickler(pickle.Unpickler):
+    def __init__(self, file, parent: tcd.Objects | None):
+        super().__init__(file)
+        self._parent = parent
+
+    def persistent_load(self, pid):
+        return self._parent
+
+
+def _attach(objects: List[tcd.Objects], parent: tcd.Objects | None):
+    """Append cached objects to the lists of their new project, like the handlers do."""
+    if not isinstance(parent, tcd.PlcProject):
+        return
+    for obj in objects:
+        if obj.parent is parent:
+            for cls, name in (
+                (tcd.Pou, "pous"),
+                (tcd.Itf, "itfs"),
+                (tcd.Dut, "duts"),
+                (tcd.Gvl, "gvls"),
+                (tcd.Task, "tasks"),
+            ):
+                if isinstance(obj, cls):
+                    getattr(parent, name).append(obj)
+
+
+def _load_from_source(
+    source: BaseSource, path: Path, parent: tcd.Objects | None, name: str
+) -> List[tcd.Objects]:
+    try:
+        data = source.read(name)
+    except Exception:
+        logger.exception(f"could not read: {path}")
+        return []
+    return _load_single(path, parent, data)
+
+
+def load_source_files(
+    source: BaseSource,
+    jobs: Iterable[Tuple[Path, tcd.Objects | None]],
+    max_workers: int | None = None,
+) -> List[tcd.Objects]:
+    """
+    Load object files from a source, like load_files does from disk.
+
+    If the source has a cache, files whose content key is cached are not
+    parsed again. The cached objects are unpickled and attached to the parent
+    of the job, every load gets objects of its own with the path of the job.
+    """
+    jobs = list(jobs)
+    results: List[List[tcd.Objects] | None] = [None] * len(jobs)
+    misses = []
+    for position, (path, parent) in enumerate(jobs):
+        name = source.name_of(path)
+        if name is None:
+            logger.error(f"not part of the source: {path}")
+            results[position] = []
+            continue
+        key = source.key(name) if source.cache is not None else None
+        cache_key = None
+        if key is not None:
+            cache_key = (key, name, getattr(parent, "name_space", None))
+            cached = source.cache.get(cache_key)
+            if cached is not None:
+                objects = _ParentUnpickler(io.BytesIO(cached), parent).load()
+                # cached by another source, e.g. the same blob in another revision
+                for obj in tcd.iter_objects(objects):
+                    if obj.path is not None:
+                        obj.path = path
+                _attach(objects, parent)
+                results[position] = objects
+                continue
+        misses.append((position, cache_key, (source, path, parent, name)))
+
+    loaded = _map(_load_from_source, [job for _, _, job in misses], max_workers)
+    for (position, cache_key, job), objects in zip(misses, loaded):
+        results[position] = objects
+        if cache_key is not None and objects:
+            buffer = io.BytesIO()
+            _ParentPickler(buffer, job[2]).dump(objects)
+            source.cache[cache_key] = buffer.getvalue()
+
+    return _collect_results(jobs, results)
+
+
+def _sort_project_lists(plcproj: tcd.PlcProject, objects: List[tcd.Objects]):
+    position = {id(obj): index for index, obj in enumerate(objects)}
+    for name in ("pous", "duts", "itfs", "gvls", "tasks"):
+        getattr(plcproj, name).sort(key=lambda obj: position.get(id(obj), -1))
+
+
+def dedupe_objects(objects: Iterable[tcd.Objects]) -> List[tcd.Objects]:
+    """Keep the first object of every identifier, like the README loop does."""
+    index: dict[str, tcd.Objects] = {}
+    for obj in objects:
+        index.setdefault(obj.get_identifier(), obj)
+    return list(index.values())
+
+
+def _matches(name: str, patterns: List[str] | None) -> bool:
+    name = name.casefold()
+    return any(fnmatch.fnmatchcase(name, pattern.casefold()) for pattern in patterns)
 
 
 class Twincat4024Strategy(BaseStrategy):
@@ -638,6 +1218,162 @@ class Twincat4024Strategy(BaseStrategy):
         else:
             return []
 
+    def load_data(
+        self, path: Path, data: Data, root: Path | None = None
+    ) -> List[tcd.Objects]:
+        _path = PurePath(path)
+        _obj: List[tcd.Objects] = []
+        if is_handler_in_list(suffix=_path.suffix):
+            handler = get_handler(suffix=_path.suffix)
+            if root is not None and isinstance(
+                handler, (PlcProjectHandler, TwincatProjectHandler)
+            ):
+                handler.load_object(
+                    Path(path),
+                    obj_store=_obj,
+                    data=data,
+                    path_index=PathIndex.from_directory(root),
+                )
+            else:
+                handler.load_object(Path(path), obj_store=_obj, data=data)
+        return _obj
+
+    def load_tree(
+        self,
+        root: Path,
+        include: List[str] | None = None,
+        exclude: List[str] | None = None,
+        name_space: str | None = None,
+        max_workers: int | None = None,
+    ) -> List[tcd.Objects]:
+        root = Path(root)
+        path_index = PathIndex.from_directory(root)
+        suffixes = [
+            suffix
+            for suffix in PLC_OBJECT_SUFFIXES
+            if any(handler.suffix == suffix for handler in _handler)
+        ]
+
+        object_paths: List[Path] = []
+        for name in sorted(path_index):
+            if PurePath(name).suffix.lower() not in suffixes:
+                continue
+            if include and not _matches(name, include):
+                continue
+            if exclude and _matches(name, exclude):
+                continue
+            object_paths.append(path_index.root / name)
+
+        if name_space is None:
+            name_space = path_index.root.name
+
+        # there is no .plcproj, the folder stands in for the project
+        plcproj = tcd.PlcProject(
+            name=path_index.root.name,
+            path=path_index.root,
+            default_namespace=name_space,
+            name_space=name_space,
+            sub_paths=object_paths,
+        )
+
+        _obj = load_files(
+            [(object_path, plcproj) for object_path in object_paths],
+            max_workers=max_workers,
+        )
+        _obj.append(plcproj)
+        return _obj
+
+    def load_source(
+        self, source: BaseSource, path: str, max_workers: int | None = None
+    ) -> List[tcd.Objects]:
+        name = source.path_index.lookup(str(path))
+        if name is None:
+            raise FileNotFoundError(f"{path} is not part of the source")
+        virtual_path = source.root / PurePosixPath(name)
+        if not is_handler_in_list(suffix=virtual_path.suffix):
+            return []
+        handler = get_handler(suffix=virtual_path.suffix)
+        if isinstance(handler, TwincatProjectHandler):
+            return self._load_source_tsproj(source, virtual_path, max_workers)
+        if not isinstance(handler, PlcProjectHandler):
+            return load_source_files(source, [(virtual_path, None)], max_workers=1)
+
+        plcproj = handler.read_project(
+            virtual_path,
+            data=source.read(name),
+            path_index=source.index_below(posixpath.dirname(name)),
+        )
+        if plcproj is None:
+            return []
+        _obj = load_source_files(
+            source,
+            [
+                (object_path, plcproj)
+                for object_path in plcproj.sub_paths
+                if is_handler_in_list(object_path.suffix)
+            ],
+            max_workers=max_workers,
+        )
+        _obj.append(plcproj)
+        return _obj
+
+    def _load_source_tsproj(
+        self, source: BaseSource, virtual_path: Path, max_workers: int | None
+    ) -> List[tcd.Objects]:
+        """A .tsproj of a source, its plc projects are read from the source too."""
+        _obj = load_source_files(source, [(virtual_path, None)], max_workers=1)
+        tsproj = _obj[-1] if _obj else None
+        if not isinstance(tsproj, tcd.TwincatProject):
+            return _obj
+        projects: List[tcd.Objects] = []
+        for instance in tsproj.plc_instances:
+            if instance.project_path is None:
+                continue
+            name = source.name_of(instance.project_path)
+            if name is None or source.path_index.lookup(name) is None:
+                continue
+            projects.extend(self.load_source(source, name, max_workers=max_workers))
+            tsproj.sub_paths.append(instance.project_path)
+        return projects + _obj
+
+    def load_many(
+        self, paths: Iterable[Path], max_workers: int | None = None
+    ) -> List[tcd.Objects]:
+        paths = [Path(path) for path in paths]
+        # projects first, a file reachable from a project gets the project as parent
+        paths.sort(key=lambda path: path.suffix.lower() != ".plcproj")
+
+        seen: set[str] = set()
+        jobs: List[Tuple[Path, tcd.Objects | None]] = []
+        projects: List[tcd.PlcProject] = []
+        for path in paths:
+            key = os.path.normcase(os.path.abspath(path))
+            if key in seen:
+                continue
+            seen.add(key)
+
+            if not is_handler_in_list(suffix=path.suffix):
+                continue
+            handler = get_handler(suffix=path.suffix)
+            if not isinstance(handler, PlcProjectHandler):
+                jobs.append((path, None))
+                continue
+
+            plcproj = handler.read_project(path)
+            if plcproj is None:
+                continue
+            projects.append(plcproj)
+            for object_path in plcproj.sub_paths:
+                key = os.path.normcase(str(object_path))
+                if key in seen or not is_handler_in_list(object_path.suffix):
+                    continue
+                seen.add(key)
+                jobs.append((object_path, plcproj))
+
+        _obj = load_files(jobs, max_workers=max_workers)
+        _obj.extend(projects)
+        return dedupe_objects(_obj)
+
 
 # present the strategy to the loader
 add_strategy(Twincat4024Strategy)
@@ -1,8 +1,27 @@
-from dataclasses import dataclass
+import weakref
+from functools import lru_cache
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from abc import ABC, abstractmethod
 
+from .parse_implementation import Implementation, implementation_ast
+
+
+def _implementation_ast(self) -> Implementation:
+    """
+    Syntax tree of the implementation, parsed on first access.
+
+    The tree is kept on the object together with the text it was parsed
+    from and taken again as long as the implementation is not replaced.
+    Equal texts share one tree through the cache of implementation_ast.
+    """
+    text = self.implementation
+    cached = self._ast
+    if cached is None or cached[0] is not text:
+        cached = self._ast = (text, implementation_ast(text))
+    return cached[1]
+
 
 @dataclass
 class Base(ABC):
@@ -34,6 +53,8 @@ class Documentation(Base):
     usage: Optional[str] = None
     returns: Optional[str] = None
     custom_tags: Optional[Dict[str, str]] = None
+    # offsets of the documentation comments in the declaration
+    span: Optional[Tuple[int, int]] = None
 
     def __post_init__(self):
         if self.custom_tags is None:
@@ -52,6 +73,10 @@ class Variable(Base):
     documentation: Optional[Documentation] = None
     section_type: str = None
     section_modifier: Optional[str] = None
+    # offsets of the declaration in the declaration of the parent, "nCount : INT;"
+    span: Optional[Tuple[int, int]] = None
+    # location of a variable declared with AT, "%I*" or "%QX0.1"
+    address: Optional[str] = None
 
     def __post_init__(self):
         if self.attributes is None:
@@ -72,6 +97,10 @@ class Variable(Base):
 class Get(Base):
     declaration: str = ""
     implementation: str = ""
+    # (implementation, tree) of the ast property, not part of snapshots and exports
+    _ast: Optional[tuple] = field(
+        default=None, repr=False, compare=False, metadata={"snapshot": False}
+    )
 
     def __post_init__(self):
         Base.__post_init__(self)
@@ -79,10 +108,16 @@ class Get(Base):
     def get_identifier(self) -> str:
         return ""
 
+    ast = property(_implementation_ast)
+
 @dataclass
 class Set(Base):
     declaration: str = ""
     implementation: str = ""
+    # (implementation, tree) of the ast property, not part of snapshots and exports
+    _ast: Optional[tuple] = field(
+        default=None, repr=False, compare=False, metadata={"snapshot": False}
+    )
 
     def __post_init__(self):
         Base.__post_init__(self)
@@ -90,6 +125,8 @@ class Set(Base):
     def get_identifier(self) -> str:
         return ""
 
+    ast = property(_implementation_ast)
+
 @dataclass
 class Method(Base):
     accessModifier: Optional[str] = None
@@ -98,6 +135,10 @@ class Method(Base):
     implementation: str = ""
     variables: Optional[List[Variable]] = None
     documentation: Optional[Documentation] = None
+    # (implementation, tree) of the ast property, not part of snapshots and exports
+    _ast: Optional[tuple] = field(
+        default=None, repr=False, compare=False, metadata={"snapshot": False}
+    )
 
     def __post_init__(self):
         if self.variables is None:
@@ -114,6 +155,8 @@ class Method(Base):
         _identifier += self.name
         return _identifier
 
+    ast = property(_implementation_ast)
+
 @dataclass
 class Property(Base):
     returnType: Optional[str] = None
@@ -147,6 +190,10 @@ class Pou(Base):
     properties: Optional[list[Property]] = None
     variables: Optional[List[Variable]] = None
     documentation: Optional[Documentation] = None
+    # (implementation, tree) of the ast property, not part of snapshots and exports
+    _ast: Optional[tuple] = field(
+        default=None, repr=False, compare=False, metadata={"snapshot": False}
+    )
 
     def __post_init__(self):
         if self.implements is None:
@@ -166,6 +213,8 @@ class Pou(Base):
         _identifier += self.name
         return _identifier
 
+    ast = property(_implementation_ast)
+
 @dataclass
 class Itf(Base):
     extends: Optional[list[str]] = None
@@ -253,6 +302,8 @@ class PlcProject(Base):
     duts: Optional[List[Dut]] = None
     itfs: Optional[List[Itf]] = None
     gvls: Optional[List[Gvl]] = None
+    # tasks of the project, from its .TcTTO files
+    tasks: Optional[List["Task"]] = None
 
     def __post_init__(self):
         if self.dependencies is None:
@@ -265,6 +316,8 @@ class PlcProject(Base):
             self.itfs = []    
         if self.gvls is None:
             self.gvls = []    
+        if self.tasks is None:
+            self.tasks = []
 
 
         Base.__post_init__(self)
@@ -277,6 +330,203 @@ class PlcProject(Base):
 
 
 
+@dataclass
+class Task(Base):
+    """A real time task, cycle_time is in 100 ns like in the .tsproj."""
+
+    priority: Optional[int] = None
+    cycle_time: Optional[int] = None
+    ams_port: Optional[int] = None
+    # programs called by the task, in call order
+    programs: Optional[List[str]] = None
+
+    def __post_init__(self):
+        if self.programs is None:
+            self.programs = []
+        Base.__post_init__(self)
+
+    def get_identifier(self) -> str:
+        # a .TcTTO task of a plc project and the .tsproj task may share a name
+        if self.name_space:
+            return f"{self.name_space}.{self.name}"
+        return self.name
+
+
+@dataclass
+class PlcInstance(Base):
+    """A plc project linked into a TwinCAT project, with the tasks it runs in."""
+
+    project_path: Optional[Path] = None
+    ams_port: Optional[int] = None
+    tasks: Optional[List[str]] = None
+
+    def __post_init__(self):
+        if self.tasks is None:
+            self.tasks = []
+        Base.__post_init__(self)
+
+    def get_identifier(self) -> str:
+        return self.name
+
+
+@dataclass
+class IoVariable(Base):
+    """A variable of the process image, e.g. the "Input" entry of pdo "Channel 1"."""
+
+    group: Optional[str] = None  # the pdo or variable group, "Channel 1"
+    data_type: Optional[str] = None
+    direction: Optional[str] = None  # "input" or "output"
+
+    def get_identifier(self) -> str:
+        # the notation of the mappings, "Device 1^Term 2 (EL1008)^Channel 1^Input"
+        parts = [] if self.parent is None else [self.parent.get_identifier()]
+        if self.group:
+            parts.append(self.group)
+        parts.append(self.name)
+        return "^".join(parts)
+
+
+@dataclass
+class IoBox(Base):
+    """A box or terminal of an I/O device, boxes may contain boxes."""
+
+    id: Optional[int] = None
+    box_type: Optional[str] = None
+    file: Optional[str] = None  # stored in a separate .xti
+    boxes: Optional[List["IoBox"]] = None
+    variables: Optional[List[IoVariable]] = None
+
+    def __post_init__(self):
+        if self.boxes is None:
+            self.boxes = []
+        if self.variables is None:
+            self.variables = []
+        Base.__post_init__(self)
+
+    def get_identifier(self) -> str:
+        if self.parent is None:
+            return self.name
+        return f"{self.parent.get_identifier()}^{self.name}"
+
+
+@dataclass
+class IoDevice(Base):
+    """An I/O device, like an EtherCAT master, with its boxes."""
+
+    id: Optional[int] = None
+    device_type: Optional[str] = None
+    file: Optional[str] = None  # stored in a separate .xti
+    boxes: Optional[List[IoBox]] = None
+    variables: Optional[List[IoVariable]] = None
+    # file the index is read from again, if the device is restored from a
+    # snapshot before it was expanded
+    index_path: Optional[Path] = None
+    # compact index the boxes and variables are taken from on expand
+    _index: Optional[object] = field(
+        default=None, repr=False, compare=False, metadata={"snapshot": False}
+    )
+
+    def __post_init__(self):
+        if self.boxes is None:
+            self.boxes = []
+        if self.variables is None:
+            self.variables = []
+        Base.__post_init__(self)
+
+    def get_identifier(self) -> str:
+        return self.name
+
+    @property
+    def expanded(self) -> bool:
+        return self._index is None and self.index_path is None
+
+    def expand(self) -> "IoDevice":
+        """
+        Create the boxes and variables of a device read into an index.
+
+        Devices of an .xti or of the io of a project are only indexed when
+        they are loaded, a device in an .xti of its own is read on expand.
+        A device from a snapshot reads its index_path again.
+        """
+        if self._index is None and self.index_path is not None:
+            path = Path(self.index_path)
+            if not path.is_file():
+                raise FileNotFoundError(
+                    f"cannot expand the device {self.name}, {path} is not a file"
+                )
+            from .IoConfig import IoIndex, XtiFile
+
+            self._index = XtiFile(path) if self.file else IoIndex.read(path)
+        if self._index is not None:
+            index, self._index = self._index, None
+            self.index_path = None
+            index.expand(self)
+        return self
+
+
+@dataclass
+class IoLink(Base):
+    """A link of the mappings, between a variable of owner_a and one of owner_b."""
+
+    owner_a: str = ""
+    var_a: str = ""
+    owner_b: str = ""
+    var_b: str = ""
+
+    def get_identifier(self) -> str:
+        return f"{self.owner_a}^{self.var_a} <-> {self.owner_b}^{self.var_b}"
+
+
+@dataclass
+class TwincatProject(Base):
+    """
+    Represents a TwinCAT project (.tsproj) with its tasks and plc projects.
+
+    The I/O configuration and the mappings are read from the file when io
+    or mappings is used first, they are large in projects with inline I/O.
+    """
+
+    tasks: Optional[List[Task]] = None
+    plc_instances: Optional[List[PlcInstance]] = None
+    # reads io and mappings on first use, not part of snapshots and exports
+    _sections: Optional[object] = field(
+        default=None, repr=False, compare=False, metadata={"snapshot": False}
+    )
+
+    def __post_init__(self):
+        if self.tasks is None:
+            self.tasks = []
+        if self.plc_instances is None:
+            self.plc_instances = []
+        Base.__post_init__(self)
+
+    def get_identifier(self) -> str:
+        return self.name
+
+    def _project_sections(self):
+        # a project from a snapshot reads its sections from the file again
+        if self._sections is None:
+            if self.path is None or not Path(self.path).is_file():
+                raise FileNotFoundError(
+                    f"cannot read the io and mappings of {self.name}, "
+                    f"{self.path} is not a file"
+                )
+            from .IoConfig import ProjectSections
+
+            self._sections = ProjectSections(Path(self.path), Path(self.path))
+        return self._sections
+
+    @property
+    def io(self) -> List[IoDevice]:
+        """The I/O devices, loaded on first access."""
+        return self._project_sections().devices(self)
+
+    @property
+    def mappings(self) -> List[IoLink]:
+        """The links between plc variables and the process image, loaded on first access."""
+        return self._project_sections().links(self)
+
+
 @dataclass
 class Project(Base):
     """Represents a project in a TwinCAT solution."""
@@ -298,3 +548,98 @@ class Solution(Base):
 
 
 Objects = Base
+
+
+_PROXY_TYPES = (weakref.ProxyType, weakref.CallableProxyType)
+
+
+def is_weak(obj) -> bool:
+    """Check if obj is a weak parent proxy."""
+    return isinstance(obj, _PROXY_TYPES)
+
+
+def unwrap(obj):
+    """Return the object behind a weak parent proxy, other objects are returned as is."""
+    if isinstance(obj, _PROXY_TYPES):
+        # attribute access is forwarded, the bound method belongs to the referent
+        return obj.get_identifier.__self__
+    return obj
+
+
+@lru_cache(maxsize=None)
+def _child_fields(cls: type) -> tuple:
+    return tuple(field.name for field in fields(cls) if field.name != "parent")
+
+
+def source_path(obj: Base) -> Optional[Path]:
+    """Return the file an object was loaded from, methods and variables ask their parents."""
+    depth = 0
+    while obj is not None and depth < 16:
+        path = getattr(obj, "path", None)
+        if path is not None:
+            return path
+        obj = getattr(obj, "parent", None)
+        if not isinstance(obj, Base):
+            return None
+        depth += 1
+    return None
+
+
+def iter_objects(objects: Iterable[Base]) -> Iterator[Base]:
+    """
+    Iterate over the objects and every object nested in them, each once.
+
+    Nested objects are found in the fields of the dataclasses (variables,
+    methods, documentation, pous, ...). The parent links are not followed.
+    """
+    seen = set()
+    stack = list(objects)
+    stack.reverse()
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        yield obj
+        children = []
+        for name in _child_fields(obj.__class__):
+            value = getattr(obj, name)
+            if isinstance(value, Base):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(item for item in value if isinstance(item, Base))
+        children.reverse()
+        stack.extend(children)
+
+
+def weaken_parents(objects: Iterable[Base]) -> List[Base]:
+    """
+    Replace the parent links of all objects with weak proxies.
+
+    Parents own their children (pous, methods, variables, ...) and the children
+    only point back weakly, so the model holds no reference cycles. Objects are
+    freed by reference counting as soon as they are dropped, without waiting for
+    the cyclic garbage collector. A child outliving its parent raises
+    ReferenceError when the parent is accessed.
+
+    Args:
+        objects: The loaded objects, changed in place.
+
+    Returns:
+        The objects.
+    """
+    objects = list(objects)
+    for obj in iter_objects(objects):
+        if isinstance(obj.parent, Base) and not is_weak(obj.parent):
+            obj.parent = weakref.proxy(obj.parent)
+    return objects
+
+
+def strengthen_parents(objects: Iterable[Base]) -> List[Base]:
+    """Undo weaken_parents, every parent link becomes a normal reference again."""
+    objects = list(objects)
+    for obj in iter_objects(objects):
+        if isinstance(obj.parent, _PROXY_TYPES):
+            obj.parent = unwrap(obj.parent)
+    return objects
+
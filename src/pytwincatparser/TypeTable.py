@@ -0,0 +1,293 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import TwincatDataclasses as tcd
+from . import parse_declaration as parse_decl
+
+_ARRAY = re.compile(r"^ARRAY\s*\[.*?\]\s*OF\s+(.+)$", re.IGNORECASE | re.DOTALL)
+_POINTER = re.compile(r"^POINTER\s+TO\s+(.+)$", re.IGNORECASE | re.DOTALL)
+_REFERENCE = re.compile(r"^REFERENCE\s+TO\s+(.+)$", re.IGNORECASE | re.DOTALL)
+
+# a step of an access path: ("name", x), ("member", x), ("arg", x) for a named
+# argument of the call before, ("index",), ("deref",), ("call",), ("this",) or
+# ("super",)
+Step = Tuple[str, ...]
+
+# the value of an access path: ("type", type name), ("callable", method or pou),
+# ("gvl", gvl), ("namespace", "Lib"), ("external", "FB_Log.Info") or None if it
+# is not known
+State = Optional[Tuple[str, object]]
+
+
+def _without_reference(type_name: str) -> str:
+    match = _REFERENCE.match(type_name.strip())
+    return match.group(1).strip() if match else type_name.strip()
+
+
+def base_type_name(type_name: Optional[str]) -> Optional[str]:
+    """The type behind pointers, references and arrays, "ARRAY [1..2] OF FB_X" -> "FB_X"."""
+    if not type_name:
+        return None
+    type_name = type_name.strip()
+    while True:
+        for pattern in (_REFERENCE, _POINTER, _ARRAY):
+            match = pattern.match(type_name)
+            if match:
+                type_name = match.group(1).strip()
+                break
+        else:
+            return type_name
+
+
+def declared_names(obj: tcd.Objects) -> Set[str]:
+    """Names an object brings into scope, itself, its namespace and variables."""
+    names = {obj.name.casefold()} if obj.name else set()
+    if obj.name_space:
+        names.add(obj.name_space.casefold())
+    for variable in getattr(obj, "variables", None) or []:
+        names.add(variable.name.casefold())
+    return names
+
+
+class TypeTable:
+    """
+    Lookup tables of all loaded types, to resolve names in implementations.
+
+    The table is a snapshot of the objects it was built from, indexes build
+    a new one when files were reloaded. While consulted is a set, every type
+    and name looked up is added to it casefolded, found or not, so an index
+    knows which declarations a resolution depends on.
+    """
+
+    def __init__(self, objects: Iterable[tcd.Objects]):
+        self.types: Dict[str, tcd.Objects] = {}
+        self.gvls: Dict[str, tcd.Gvl] = {}
+        self.globals: Dict[str, tcd.Variable] = {}
+        # types and gvls by namespace qualified name, "lib.f_calc"
+        self.qualified: Dict[str, tcd.Objects] = {}
+        self.namespaces: Dict[str, str] = {}
+        for obj in objects:
+            if isinstance(obj, (tcd.Pou, tcd.Itf, tcd.Dut)):
+                self.types.setdefault(obj.name.casefold(), obj)
+            elif isinstance(obj, tcd.Gvl):
+                self.gvls.setdefault(obj.name.casefold(), obj)
+                for variable in obj.variables:
+                    self.globals.setdefault(variable.name.casefold(), variable)
+            else:
+                continue
+            if obj.name_space:
+                self.namespaces.setdefault(obj.name_space.casefold(), obj.name_space)
+                self.qualified.setdefault(
+                    f"{obj.name_space}.{obj.name}".casefold(), obj
+                )
+        self._chains: Dict[int, List[tcd.Objects]] = {}
+        self._members: Dict[int, Dict[str, tcd.Objects]] = {}
+        self.consulted: Optional[Set[str]] = None
+
+    def _consult(self, name: str) -> None:
+        if self.consulted is not None:
+            key = name.casefold()
+            self.consulted.add(key)
+            # Lib.FB_X may also be found as FB_X
+            self.consulted.add(key.rsplit(".", 1)[-1])
+
+    def type_of(self, type_name: Optional[str]) -> Optional[tcd.Objects]:
+        name = base_type_name(type_name)
+        if not name:
+            return None
+        self._consult(name)
+        obj = self.types.get(name.casefold())
+        if obj is None and "." in name:
+            # namespace qualified, Lib.FB_X
+            obj = self.qualified.get(name.casefold())
+            if not isinstance(obj, (tcd.Pou, tcd.Itf, tcd.Dut)):
+                obj = self.types.get(name.rsplit(".", 1)[1].casefold())
+        return obj
+
+    def chain(self, obj: tcd.Objects) -> List[tcd.Objects]:
+        """The type and all its bases, interfaces may extend several."""
+        chain = self._chains.get(id(obj))
+        if chain is None:
+            chain = []
+            seen = set()
+            queue = deque([obj])
+            while queue:
+                current = queue.popleft()
+                if current is None or id(current) in seen:
+                    continue
+                seen.add(id(current))
+                chain.append(current)
+                for base in getattr(current, "extends", None) or []:
+                    queue.append(self.type_of(base))
+            self._chains[id(obj)] = chain
+        if self.consulted is not None:
+            # the bases are looked up once, a cached chain still depends on them
+            for current in chain:
+                for base in getattr(current, "extends", None) or []:
+                    self._consult(base_type_name(base) or base)
+        return chain
+
+    def interfaces(self, pou: tcd.Pou) -> List[tcd.Itf]:
+        """All interfaces a pou implements, through its bases and interface bases."""
+        interfaces = []
+        seen = set()
+        for current in self.chain(pou):
+            for name in getattr(current, "implements", None) or []:
+                itf = self.type_of(name)
+                if isinstance(itf, tcd.Itf):
+                    for base in self.chain(itf):
+                        if id(base) not in seen:
+                            seen.add(id(base))
+                            interfaces.append(base)
+        return interfaces
+
+    def members(self, obj: tcd.Objects) -> Dict[str, tcd.Objects]:
+        """Variables, methods and properties of a type, the nearest definition wins."""
+        members = self._members.get(id(obj))
+        if members is None:
+            members = {}
+            for current in self.chain(obj):
+                for name in ("variables", "methods", "properties"):
+                    for member in getattr(current, name, None) or []:
+                        members.setdefault(member.name.casefold(), member)
+            self._members[id(obj)] = members
+        return members
+
+    def return_type(self, callable_obj: tcd.Objects) -> Optional[str]:
+        if isinstance(callable_obj, tcd.Method):
+            return callable_obj.returnType
+        if isinstance(callable_obj, tcd.Pou) and callable_obj.declaration:
+            return parse_decl.get_return(callable_obj.declaration)
+        return None
+
+    def lookup(
+        self,
+        name: str,
+        owner: Optional[tcd.Objects],
+        local: Dict[str, tcd.Variable],
+    ) -> Optional[tcd.Objects]:
+        """Find what a plain name in a body of owner stands for."""
+        key = name.casefold()
+        self._consult(name)
+        symbol = local.get(key)
+        if symbol is None and owner is not None:
+            symbol = self.members(owner).get(key)
+        if symbol is None:
+            symbol = self.globals.get(key) or self.gvls.get(key) or self.types.get(key)
+        return symbol
+
+    def files(
+        self, owner: Optional[tcd.Objects], symbols: Iterable[Optional[tcd.Objects]]
+    ) -> Set[str]:
+        """Files a resolution in a body of owner looked at, to resolve it again if one changes."""
+        files: Set[str] = set()
+
+        def add(obj: Optional[tcd.Objects]):
+            for current in self.chain(obj) if obj is not None else ():
+                path = tcd.source_path(current)
+                if path is not None:
+                    files.add(str(path))
+
+        add(owner)
+        for symbol in symbols:
+            if symbol is None:
+                continue
+            add(symbol)
+            if isinstance(symbol, tcd.Variable):
+                add(self.type_of(symbol.type))
+            elif isinstance(symbol, (tcd.Method, tcd.Property)):
+                add(self.type_of(symbol.returnType))
+        return files
+
+    @staticmethod
+    def state_of(symbol: Optional[tcd.Objects]) -> State:
+        if isinstance(symbol, tcd.Variable):
+            return ("type", symbol.type)
+        if isinstance(symbol, tcd.Property):
+            return ("type", symbol.returnType)
+        if isinstance(symbol, tcd.Gvl):
+            return ("gvl", symbol)
+        if isinstance(symbol, (tcd.Method, tcd.Pou, tcd.Itf, tcd.Dut)):
+            return ("callable", symbol)
+        return None
+
+    def resolve(
+        self,
+        steps: List[Step],
+        owner: Optional[tcd.Objects],
+        local: Dict[str, tcd.Variable],
+    ) -> Tuple[List[Optional[tcd.Objects]], State]:
+        """
+        Resolve an access path like fbAxis.aItems[1].MoveAbs in a body of owner.
+
+        Args:
+            steps: The access path.
+            owner: The pou or interface the body belongs to.
+            local: Variables of the method by casefolded name.
+
+        Returns:
+            The symbol of every name, member and arg step (None for other
+            steps and names which are not known) and the value of the path.
+        """
+        symbols: List[Optional[tcd.Objects]] = []
+        state: State = None
+        for step in steps:
+            kind = step[0]
+            symbol = None
+            if kind == "name":
+                symbol = self.lookup(step[1], owner, local)
+                state = self.state_of(symbol)
+                if symbol is None and step[1].casefold() in self.namespaces:
+                    state = ("namespace", self.namespaces[step[1].casefold()])
+            elif kind == "this":
+                state = ("type", owner.name) if owner is not None else None
+            elif kind == "super":
+                extends = getattr(owner, "extends", None) or []
+                state = ("type", extends[0]) if extends else None
+            elif kind in ("member", "arg"):
+                if state is None or state[0] == "external":
+                    state = None
+                elif state[0] == "namespace":
+                    # Lib.F_Calc or Lib.GVL_Main
+                    self._consult(f"{state[1]}.{step[1]}")
+                    symbol = self.qualified.get(f"{state[1]}.{step[1]}".casefold())
+                    state = self.state_of(symbol) if kind == "member" else None
+                else:
+                    type_name = None
+                    if state[0] == "type":
+                        type_name = state[1]
+                        container = self.type_of(type_name)
+                    elif kind == "member" and isinstance(state[1], tcd.Method):
+                        type_name = self.return_type(state[1])
+                        container = self.type_of(type_name)
+                    else:
+                        # a gvl, a program or the called method or pou of an arg
+                        container = state[1]
+                    if container is None:
+                        # not loaded, keep the name for an external node
+                        base = base_type_name(type_name)
+                        state = (
+                            ("external", f"{base}.{step[1]}")
+                            if base and kind == "member"
+                            else None
+                        )
+                    else:
+                        symbol = self.members(container).get(step[1].casefold())
+                        state = self.state_of(symbol) if kind == "member" else None
+            elif kind == "index":
+                if state is not None and state[0] == "type":
+                    match = _ARRAY.match(_without_reference(state[1] or ""))
+                    state = ("type", match.group(1)) if match else state
+            elif kind == "deref":
+                if state is not None and state[0] == "type":
+                    match = _POINTER.match(_without_reference(state[1] or ""))
+                    state = ("type", match.group(1)) if match else state
+            elif kind == "call":
+                # the value is the return value of the call
+                if state is not None and state[0] == "callable":
+                    state = ("type", self.return_type(state[1]))
+                else:
+                    state = None
+            symbols.append(symbol)
+        return symbols, state
@@ -0,0 +1,193 @@
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from . import TwincatDataclasses as tcd
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+COLUMNS = ("name", "type", "section_type", "section_modifier", "owner", "initial_value")
+# columns holding several keywords, "RETAIN PERSISTENT" matches "PERSISTENT"
+KEYWORD_COLUMNS = ("section_modifier",)
+
+
+def _owner_identifier(variable: tcd.Variable) -> str:
+    parent = variable.parent
+    if not isinstance(parent, tcd.Base):
+        return ""
+    try:
+        return parent.get_identifier()
+    except AttributeError:
+        return parent.name or ""
+
+
+def _column_value(variable: tcd.Variable, column: str) -> str:
+    if column == "owner":
+        return _owner_identifier(variable)
+    value = getattr(variable, column)
+    if isinstance(value, list):
+        # parse_variables stores the block keyword as a list, e.g. ["PERSISTENT"]
+        value = " ".join(value)
+    return value or ""
+
+
+class StringColumn:
+    """A column of interned strings, stored as codes into a list of distinct values."""
+
+    def __init__(self, values: Iterable[str], use_numpy: bool, keywords: bool = False):
+        self.keywords = keywords
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        codes = array("i")
+        for value in values:
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.values)
+                self.values.append(value)
+            codes.append(code)
+        self.codes = np.frombuffer(codes, dtype=np.int32) if use_numpy else codes
+
+    def codes_of(self, values: str | Iterable[str]) -> List[int]:
+        """
+        Codes of the values, compared case-insensitive like IEC 61131-3 does.
+
+        In a keyword column a value also matches every row that contains it
+        as one of its words.
+        """
+        if isinstance(values, str):
+            values = [values]
+        wanted = {value.casefold() for value in values}
+        return [
+            code
+            for code, value in enumerate(self.values)
+            if value.casefold() in wanted
+            or (self.keywords and not wanted.isdisjoint(value.casefold().split()))
+        ]
+
+
+class VariableTable:
+    """
+    Column store of all variables of a loaded model.
+
+    Every column (name, type, section_type, section_modifier, owner and
+    initial_value) is an array of codes into its distinct strings, so filters
+    and group-bys compare integers. With NumPy installed they are vectorised,
+    otherwise the columns are plain `array` objects.
+
+        table = VariableTable.from_objects(objects)
+        table.count_by("owner", section_modifier="PERSISTENT")
+        table.select(section_type="var_input", type="LREAL")
+    """
+
+    def __init__(
+        self, variables: Sequence[tcd.Variable], use_numpy: bool | None = None
+    ):
+        if use_numpy is None:
+            use_numpy = np is not None
+        elif use_numpy and np is None:
+            raise ImportError("numpy is not installed")
+        self.use_numpy = use_numpy
+        self.variables: List[tcd.Variable] = list(variables)
+        self.columns: Dict[str, StringColumn] = {
+            column: StringColumn(
+                (_column_value(variable, column) for variable in self.variables),
+                use_numpy=use_numpy,
+                keywords=column in KEYWORD_COLUMNS,
+            )
+            for column in COLUMNS
+        }
+
+    @classmethod
+    def from_objects(
+        cls, objects: Iterable[tcd.Objects], use_numpy: bool | None = None
+    ) -> "VariableTable":
+        """Collect the variables of all objects, nested ones included."""
+        variables = [
+            obj for obj in tcd.iter_objects(objects) if isinstance(obj, tcd.Variable)
+        ]
+        return cls(variables, use_numpy=use_numpy)
+
+    def __len__(self) -> int:
+        return len(self.variables)
+
+    def mask(self, **conditions: str | Iterable[str]):
+        """
+        Return a boolean mask of the rows matching all conditions.
+
+        Args:
+            conditions: Column name and the value, or a list of values, it has
+                to match, e.g. section_type="var_input", type=["REAL", "LREAL"].
+                section_modifier matches per keyword, "PERSISTENT" selects
+                the variables of a RETAIN PERSISTENT block too.
+
+        Returns:
+            A NumPy bool array, or a list of bools without NumPy.
+        """
+        result = None
+        for column, values in conditions.items():
+            if column not in self.columns:
+                raise KeyError(f"unknown column: {column}")
+            string_column = self.columns[column]
+            codes = string_column.codes_of(values)
+            if self.use_numpy:
+                matches = np.isin(string_column.codes, codes)
+                result = matches if result is None else result & matches
+            else:
+                wanted = set(codes)
+                if result is None:
+                    result = [code in wanted for code in string_column.codes]
+                else:
+                    result = [
+                        keep and code in wanted
+                        for keep, code in zip(result, string_column.codes)
+                    ]
+        if result is None:
+            result = (
+                np.ones(len(self), dtype=bool) if self.use_numpy else [True] * len(self)
+            )
+        return result
+
+    def indices(self, **conditions: str | Iterable[str]):
+        """Row numbers matching all conditions, see mask."""
+        mask = self.mask(**conditions)
+        if self.use_numpy:
+            return np.flatnonzero(mask)
+        return [index for index, keep in enumerate(mask) if keep]
+
+    def select(self, **conditions: str | Iterable[str]) -> List[tcd.Variable]:
+        """The variables matching all conditions, see mask."""
+        return [self.variables[index] for index in self.indices(**conditions)]
+
+    def count_by(
+        self, column: str, **conditions: str | Iterable[str]
+    ) -> Dict[str, int]:
+        """
+        Count the rows matching the conditions per value of a column.
+
+        Args:
+            column: The column to group by, e.g. "owner".
+            conditions: Filter, see mask.
+
+        Returns:
+            Value of the column mapped to its count, values without rows are left out.
+        """
+        string_column = self.columns[column]
+        mask: Optional[object] = self.mask(**conditions) if conditions else None
+        if self.use_numpy:
+            codes = string_column.codes if mask is None else string_column.codes[mask]
+            counts = np.bincount(codes, minlength=len(string_column.values))
+            return {
+                string_column.values[code]: int(count)
+                for code, count in enumerate(counts)
+                if count
+            }
+        codes = (
+            string_column.codes if mask is None else compress(string_column.codes, mask)
+        )
+        return {
+            string_column.values[code]: count for code, count in Counter(codes).items()
+        }
@@ -0,0 +1,54 @@
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, List
+
+from .BaseSource import BaseSource
+from .PathIndex import normalize_include
+
+
+class ZipSource(BaseSource):
+    """
+    The files of a zip archive, e.g. an exported project bundle.
+
+    Members are read straight from the archive, nothing is extracted. The
+    loaded objects get paths below the archive path, like
+    "Bundle.zip/Lib/POUs/FB_Main.TcPOU".
+
+        with ZipSource("Bundle.zip") as source:
+            for project in source.projects():
+                objects = loader.load_source(source, project, max_workers=4)
+    """
+
+    def __init__(self, path: Path | str):
+        super().__init__(root=Path(path).absolute())
+        self._zip = zipfile.ZipFile(path)
+        # archives written on windows may use "\\" as separator
+        self._members: Dict[str, str] = {
+            normalize_include(info.filename): info.filename
+            for info in self._zip.infolist()
+            if not info.is_dir()
+        }
+
+    def __enter__(self) -> "ZipSource":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def names(self) -> Iterable[str]:
+        return self._members.keys()
+
+    def read(self, name: str) -> bytes:
+        # ZipFile serializes the access to the archive, reading from threads is safe
+        return self._zip.read(self._members[name])
+
+    def projects(self) -> List[str]:
+        """Names of all .plcproj files in the archive."""
+        return sorted(
+            name
+            for name in self._members
+            if PurePosixPath(name).suffix.lower() == ".plcproj"
+        )
+
+    def close(self) -> None:
+        self._zip.close()
@@ -15,11 +15,42 @@ from .TwincatDataclasses import (
     Objects,
     Solution,
     PlcProject,
-    Dependency
+    TwincatProject,
+    PlcInstance,
+    Task,
+    IoDevice,
+    IoBox,
+    IoVariable,
+    IoLink,
+    Dependency,
+    iter_objects,
+    source_path,
+    weaken_parents,
+    strengthen_parents,
 )
 from .Loader import add_strategy, Loader, get_default_strategy, get_strategy, get_strategy_by_object_path
 from .Twincat4024Strategy import Twincat4024Strategy
 from .BaseStrategy import BaseStrategy
+from .PathIndex import PathIndex
+from .BaseIndex import BaseIndex
+from .SearchIndex import SearchIndex, SearchHit
+from .SymbolIndex import SymbolIndex, SymbolMatch
+from .SqliteExporter import export_sqlite
+from .NdjsonExporter import export_ndjson
+from .VariableTable import VariableTable
+from .CallGraph import CallGraph
+from .OccurrenceIndex import OccurrenceIndex, Occurrence
+from .LineIndex import LineIndex, source_line
+from .IoConfig import IoIndex
+from .IoMapping import IoMapping
+from .Layout import Layout, TypeLayout, Member
+from .Reachability import Reachability
+from .Fingerprint import FingerprintIndex, MerkleNode, TreeChange, merkle_tree, compare_trees, content_hash
+from .Diff import diff_objects, ProjectDiff, ObjectDiff, FieldChange
+from .BaseSource import BaseSource
+from .GitSource import GitRepository, GitSource, GitError
+from .ZipSource import ZipSource
+from .Snapshot import save_snapshot, load_snapshot, SnapshotError
 
 __version__ = "0.1.1"
 __all__ = [
@@ -35,6 +66,13 @@ __all__ = [
     "Objects",
     "Solution",
     "PlcProject",
+    "TwincatProject",
+    "PlcInstance",
+    "Task",
+    "IoDevice",
+    "IoBox",
+    "IoVariable",
+    "IoLink",
     "add_strategy",
     "Twincat4024Strategy",
     "BaseStrategy",
@@ -43,4 +81,46 @@ __all__ = [
     "get_strategy", 
     "get_strategy_by_object_path",
     "Dependency",
+    "PathIndex",
+    "BaseIndex",
+    "SearchIndex",
+    "SearchHit",
+    "SymbolIndex",
+    "SymbolMatch",
+    "export_sqlite",
+    "export_ndjson",
+    "VariableTable",
+    "CallGraph",
+    "OccurrenceIndex",
+    "Occurrence",
+    "LineIndex",
+    "source_line",
+    "IoIndex",
+    "IoMapping",
+    "Layout",
+    "TypeLayout",
+    "Member",
+    "Reachability",
+    "FingerprintIndex",
+    "MerkleNode",
+    "TreeChange",
+    "merkle_tree",
+    "compare_trees",
+    "content_hash",
+    "diff_objects",
+    "ProjectDiff",
+    "ObjectDiff",
+    "FieldChange",
+    "BaseSource",
+    "GitRepository",
+    "GitSource",
+    "GitError",
+    "ZipSource",
+    "iter_objects",
+    "source_path",
+    "weaken_parents",
+    "strengthen_parents",
+    "save_snapshot",
+    "load_snapshot",
+    "SnapshotError",
 ]
@@ -148,12 +148,13 @@ def get_comments(decl):
     return {"comments": comments}
 
 
-def get_var_blocks(decl):
+def get_var_blocks(decl, spans=False):
     """
     Extract variable blocks from a declaration string.
 
     Args:
         decl: The declaration string
+        spans: Add 'start' and 'end' keys with the offsets of the content in decl
 
     Returns:
         A list of dictionaries, each with 'name' and 'content' keys representing a variable block
@@ -187,10 +188,10 @@ def get_var_blocks(decl):
         flags=re.MULTILINE,
     )
 
-    # Define the pattern to match variable blocks and struct blocks
+    # Define the pattern to match variable blocks, struct and union blocks
     # This pattern captures the block type (VAR, VAR_INPUT, STRUCT, etc.),
     # and everything up to the corresponding END block
-    pattern = r"\s*((?:VAR(?:_[A-Za-z_]+)?|STRUCT))(.*?)END_(?:VAR|STRUCT)"
+    pattern = r"\s*((?:VAR(?:_[A-Za-z_]+)?|STRUCT|UNION))(.*?)END_(?:VAR|STRUCT|UNION)"
 
     # Find all matches in the processed declaration string
     matches = list(re.finditer(pattern, processed_decl, re.DOTALL))
@@ -218,6 +219,9 @@ def get_var_blocks(decl):
 
         # Create the block dictionary
         block = {"name": var_type, "content": original_content}
+        if spans:
+            block["start"] = start_pos
+            block["end"] = end_pos
 
         blocks.append(block)
 
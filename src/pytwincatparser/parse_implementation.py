@@ -0,0 +1,771 @@
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from hashlib import blake2b
+from typing import Iterator, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# lexer
+# ---------------------------------------------------------------------------
+
+KEYWORDS = frozenset(
+    [
+        "IF",
+        "THEN",
+        "ELSIF",
+        "ELSE",
+        "END_IF",
+        "CASE",
+        "OF",
+        "END_CASE",
+        "FOR",
+        "TO",
+        "BY",
+        "DO",
+        "END_FOR",
+        "WHILE",
+        "END_WHILE",
+        "REPEAT",
+        "UNTIL",
+        "END_REPEAT",
+        "EXIT",
+        "CONTINUE",
+        "RETURN",
+        "JMP",
+        "AND",
+        "AND_THEN",
+        "OR",
+        "OR_ELSE",
+        "XOR",
+        "NOT",
+        "MOD",
+        "TRUE",
+        "FALSE",
+    ]
+)
+
+_TOKEN = re.compile(
+    r"""
+    (?P<ws>\s+)
+    |(?P<comment>//[^\n]*|\(\*[\s\S]*?(?:\*\)|\Z)|/\*[\s\S]*?(?:\*/|\Z))
+    |(?P<pragma>\{[^}]*\}?)
+    |(?P<string>'(?:\$.|[^'$])*'?|"(?:\$.|[^"$])*"?)
+    |(?P<typed>[A-Za-z_][A-Za-z0-9_]*\#(?:'(?:\$.|[^'$])*'|[A-Za-z0-9_.:+\-\#]+))
+    |(?P<number>\d[\d_]*\#[0-9A-Za-z_]+|\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?)
+    |(?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+    |(?P<op>:=|=>|<>|<=|>=|\*\*|\.\.|[-+*/=<>&^.,;:()\[\]\#])
+    |(?P<error>.)
+    """,
+    re.VERBOSE,
+)
+
+
+class Token:
+    """
+    A token of a Structured Text body.
+
+    kind is one of "ident", "keyword", "number", "typed" (T#1s, INT#5, ...),
+    "string", "op", "comment", "pragma", "error" or "eof". Keywords are
+    upper case in value, identifiers keep the case of the code.
+    """
+
+    __slots__ = ("kind", "value", "offset", "end")
+
+    def __init__(self, kind: str, value: str, offset: int, end: int):
+        self.kind = kind
+        self.value = value
+        self.offset = offset
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"Token({self.kind!r}, {self.value!r}, {self.offset})"
+
+
+def tokenize(text: str, comments: bool = False) -> List[Token]:
+    """
+    Split a Structured Text body in tokens, in one pass over the text.
+
+    Args:
+        text: The implementation.
+        comments: Keep comment and pragma tokens, they are dropped by default.
+
+    Returns:
+        The tokens, the last one is of kind "eof".
+    """
+    tokens: List[Token] = []
+    append = tokens.append
+    for match in _TOKEN.finditer(text or ""):
+        kind = match.lastgroup
+        if kind == "ws":
+            continue
+        if kind in ("comment", "pragma") and not comments:
+            continue
+        value = match.group()
+        if kind == "ident":
+            upper = value.upper()
+            if upper in KEYWORDS:
+                kind, value = "keyword", upper
+        append(Token(kind, value, match.start(), match.end()))
+    end = len(text or "")
+    append(Token("eof", "", end, end))
+    return tokens
+
+
+# ---------------------------------------------------------------------------
+# syntax tree
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Node:
+    offset: int
+
+
+@dataclass
+class Name(Node):
+    name: str
+
+
+@dataclass
+class Literal(Node):
+    kind: str  # "number", "typed", "string" or "bool"
+    value: str
+
+
+@dataclass
+class Unary(Node):
+    op: str
+    operand: Node
+
+
+@dataclass
+class Binary(Node):
+    op: str
+    left: Node
+    right: Node
+
+
+@dataclass
+class Member(Node):
+    target: Node
+    name: str
+
+
+@dataclass
+class Index(Node):
+    target: Node
+    indices: List[Node]
+
+
+@dataclass
+class Deref(Node):
+    """target^, THIS^ and SUPER^ are a Deref of the Name THIS or SUPER."""
+
+    target: Node
+
+
+@dataclass
+class Argument(Node):
+    name: Optional[str]
+    value: Node
+    output: bool = False  # name => variable
+
+
+@dataclass
+class Call(Node):
+    target: Node
+    arguments: List[Argument]
+
+
+@dataclass
+class Aggregate(Node):
+    """(a := 1, b := 2) or [1, 2, 3] on the right side of an assignment."""
+
+    elements: List[Node]
+
+
+@dataclass
+class Range(Node):
+    low: Node
+    high: Node
+
+
+@dataclass
+class Assign(Node):
+    target: Node
+    value: Node
+    op: str = ":="  # ":=", "S=", "R=" or "REF="
+
+
+@dataclass
+class CallStatement(Node):
+    call: Call
+
+
+@dataclass
+class If(Node):
+    branches: List[Tuple[Node, List[Node]]]
+    orelse: List[Node] = field(default_factory=list)
+
+
+@dataclass
+class CaseBranch(Node):
+    labels: List[Node]
+    body: List[Node]
+
+
+@dataclass
+class Case(Node):
+    selector: Node
+    branches: List[CaseBranch]
+    orelse: List[Node] = field(default_factory=list)
+
+
+@dataclass
+class For(Node):
+    variable: Node
+    start: Node
+    end: Node
+    step: Optional[Node]
+    body: List[Node]
+
+
+@dataclass
+class While(Node):
+    condition: Node
+    body: List[Node]
+
+
+@dataclass
+class Repeat(Node):
+    body: List[Node]
+    condition: Node
+
+
+@dataclass
+class Exit(Node):
+    pass
+
+
+@dataclass
+class Continue(Node):
+    pass
+
+
+@dataclass
+class Return(Node):
+    pass
+
+
+@dataclass
+class Jump(Node):
+    label: str
+
+
+@dataclass
+class Label(Node):
+    name: str
+
+
+@dataclass
+class ParseError:
+    message: str
+    offset: int
+
+
+@dataclass
+class Implementation:
+    body: List[Node]
+    errors: List[ParseError] = field(default_factory=list)
+
+
+def walk(node) -> Iterator[Node]:
+    """Yield a node and every node below it, depth first in source order."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, (list, tuple)):
+            stack.extend(reversed(current))
+            continue
+        if isinstance(current, Implementation):
+            stack.extend(reversed(current.body))
+            continue
+        if not isinstance(current, Node):
+            continue
+        yield current
+        children = []
+        for item in fields(current):
+            value = getattr(current, item.name)
+            if isinstance(value, (Node, list, tuple)):
+                children.append(value)
+        stack.extend(reversed(children))
+
+
+# ---------------------------------------------------------------------------
+# parser
+# ---------------------------------------------------------------------------
+
+
+class StSyntaxError(Exception):
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} at offset {offset}")
+        self.message = message
+        self.offset = offset
+
+
+# binding power of the binary operators, IEC 61131-3 precedence
+_BINARY = {
+    "OR": 10,
+    "OR_ELSE": 10,
+    "XOR": 20,
+    "AND": 30,
+    "AND_THEN": 30,
+    "&": 30,
+    "=": 40,
+    "<>": 40,
+    "<": 50,
+    ">": 50,
+    "<=": 50,
+    ">=": 50,
+    "+": 60,
+    "-": 60,
+    "*": 70,
+    "/": 70,
+    "MOD": 70,
+    "**": 80,
+}
+# negation and NOT bind below ** and above *, -2 ** 2 is -(2 ** 2)
+_UNARY = 75
+
+_BLOCK_ENDS = {
+    "IF": ("ELSIF", "ELSE", "END_IF"),
+    "CASE": ("ELSE", "END_CASE"),
+    "FOR": ("END_FOR",),
+    "WHILE": ("END_WHILE",),
+    "REPEAT": ("UNTIL",),
+}
+# keywords which end any statement list, used to recover from errors
+_ALL_ENDS = frozenset(word for ends in _BLOCK_ENDS.values() for word in ends)
+
+
+class _Parser:
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.position = 0
+        self.errors: List[ParseError] = []
+
+    # -- token helpers ------------------------------------------------------
+
+    def peek(self, ahead: int = 0) -> Token:
+        index = min(self.position + ahead, len(self.tokens) - 1)
+        return self.tokens[index]
+
+    def advance(self) -> Token:
+        token = self.tokens[self.position]
+        if token.kind != "eof":
+            self.position += 1
+        return token
+
+    def at(self, kind: str, *values: str) -> bool:
+        token = self.peek()
+        return token.kind == kind and (not values or token.value in values)
+
+    def accept(self, kind: str, *values: str) -> Optional[Token]:
+        if self.at(kind, *values):
+            return self.advance()
+        return None
+
+    def expect(self, kind: str, value: str) -> Token:
+        token = self.peek()
+        if token.kind != kind or token.value != value:
+            found = token.value or "end of text"
+            raise StSyntaxError(f"expected {value}, found {found}", token.offset)
+        return self.advance()
+
+    # -- statements ---------------------------------------------------------
+
+    def parse_body(self) -> Implementation:
+        body = self.statements(())
+        while not self.at("eof"):
+            # an END_IF without IF and the like
+            token = self.advance()
+            self.errors.append(ParseError(f"unexpected {token.value}", token.offset))
+            body.extend(self.statements(()))
+        return Implementation(body=body, errors=self.errors)
+
+    def statements(self, ends: Tuple[str, ...], case: bool = False) -> List[Node]:
+        """Parse statements until one of the keywords in ends or the end of text."""
+        body: List[Node] = []
+        while True:
+            token = self.peek()
+            if token.kind == "eof":
+                return body
+            if token.kind == "keyword" and token.value in ends:
+                return body
+            if case and self.at_case_label():
+                return body
+            if self.accept("op", ";"):
+                continue
+            start = self.position
+            try:
+                statement = self.statement()
+                if statement is not None:
+                    body.append(statement)
+            except StSyntaxError as e:
+                self.errors.append(ParseError(e.message, e.offset))
+                self.recover(start, ends)
+
+    def recover(self, start: int, ends: Tuple[str, ...]):
+        """Skip to the end of the broken statement."""
+        if self.position == start:
+            self.advance()
+        while not self.at("eof"):
+            token = self.peek()
+            if token.kind == "op" and token.value == ";":
+                self.advance()
+                return
+            if token.kind == "keyword" and (
+                token.value in ends or token.value in _ALL_ENDS
+            ):
+                return
+            self.advance()
+
+    def end_statement(self):
+        self.accept("op", ";")
+
+    def statement(self) -> Optional[Node]:
+        token = self.peek()
+        if token.kind == "keyword":
+            handler = getattr(self, "statement_" + token.value.lower(), None)
+            if handler is not None:
+                return handler()
+        if (
+            token.kind == "ident"
+            and self.peek(1).kind == "op"
+            and self.peek(1).value == ":"
+        ):
+            # jump label "name:"
+            self.advance()
+            self.advance()
+            return Label(token.offset, token.value)
+
+        target = self.expression()
+        if self.accept("op", ":="):
+            value = self.expression()
+            self.end_statement()
+            return Assign(token.offset, target, value)
+        operator = self.peek()
+        if (
+            operator.kind == "ident"
+            and operator.value.upper() in ("S", "R", "REF")
+            and self.peek(1).kind == "op"
+            and self.peek(1).value == "="
+        ):
+            self.advance()
+            self.advance()
+            value = self.expression()
+            self.end_statement()
+            return Assign(token.offset, target, value, op=operator.value.upper() + "=")
+        if isinstance(target, Call):
+            self.end_statement()
+            return CallStatement(token.offset, target)
+        if isinstance(target, Deref) and isinstance(target.target, Name):
+            # SUPER^; calls the body of the base function block
+            if target.target.name.upper() == "SUPER":
+                self.end_statement()
+                return CallStatement(token.offset, Call(token.offset, target, []))
+        found = self.peek()
+        raise StSyntaxError(
+            f"expected := or a call, found {found.value or 'end of text'}", found.offset
+        )
+
+    def statement_if(self) -> If:
+        start = self.advance()
+        branches = []
+        condition = self.expression()
+        self.expect("keyword", "THEN")
+        branches.append((condition, self.statements(_BLOCK_ENDS["IF"])))
+        orelse: List[Node] = []
+        while True:
+            if self.accept("keyword", "ELSIF"):
+                condition = self.expression()
+                self.expect("keyword", "THEN")
+                branches.append((condition, self.statements(_BLOCK_ENDS["IF"])))
+            elif self.accept("keyword", "ELSE"):
+                orelse = self.statements(("END_IF",))
+            else:
+                break
+        self.expect("keyword", "END_IF")
+        self.end_statement()
+        return If(start.offset, branches, orelse)
+
+    def at_case_label(self) -> bool:
+        """Check if a case label ("1, 2..5, E_State.Idle :") starts here."""
+        depth = 0
+        ahead = 0
+        while True:
+            token = self.peek(ahead)
+            if token.kind == "eof":
+                return False
+            if token.kind == "op":
+                if token.value in ("(", "["):
+                    depth += 1
+                elif token.value in (")", "]"):
+                    depth -= 1
+                elif depth == 0 and token.value == ":":
+                    return ahead > 0
+                elif token.value in (";", ":=", "=>"):
+                    return False
+            elif token.kind == "keyword" and token.value not in (
+                "NOT",
+                "MOD",
+                "TRUE",
+                "FALSE",
+            ):
+                return False
+            ahead += 1
+
+    def statement_case(self) -> Case:
+        start = self.advance()
+        selector = self.expression()
+        self.expect("keyword", "OF")
+        branches: List[CaseBranch] = []
+        orelse: List[Node] = []
+        while True:
+            if self.accept("keyword", "ELSE"):
+                orelse = self.statements(("END_CASE",))
+                continue
+            if self.at("keyword", "END_CASE") or self.at("eof"):
+                break
+            label_start = self.peek()
+            labels = [self.case_label()]
+            while self.accept("op", ","):
+                labels.append(self.case_label())
+            self.expect("op", ":")
+            body = self.statements(_BLOCK_ENDS["CASE"], case=True)
+            branches.append(CaseBranch(label_start.offset, labels, body))
+        self.expect("keyword", "END_CASE")
+        self.end_statement()
+        return Case(start.offset, selector, branches, orelse)
+
+    def case_label(self) -> Node:
+        low = self.expression()
+        if self.accept("op", ".."):
+            return Range(low.offset, low, self.expression())
+        return low
+
+    def statement_for(self) -> For:
+        start = self.advance()
+        variable = self.expression()
+        self.expect("op", ":=")
+        first = self.expression()
+        self.expect("keyword", "TO")
+        last = self.expression()
+        step = self.expression() if self.accept("keyword", "BY") else None
+        self.expect("keyword", "DO")
+        body = self.statements(_BLOCK_ENDS["FOR"])
+        self.expect("keyword", "END_FOR")
+        self.end_statement()
+        return For(start.offset, variable, first, last, step, body)
+
+    def statement_while(self) -> While:
+        start = self.advance()
+        condition = self.expression()
+        self.expect("keyword", "DO")
+        body = self.statements(_BLOCK_ENDS["WHILE"])
+        self.expect("keyword", "END_WHILE")
+        self.end_statement()
+        return While(start.offset, condition, body)
+
+    def statement_repeat(self) -> Repeat:
+        start = self.advance()
+        body = self.statements(_BLOCK_ENDS["REPEAT"])
+        self.expect("keyword", "UNTIL")
+        condition = self.expression()
+        self.expect("keyword", "END_REPEAT")
+        self.end_statement()
+        return Repeat(start.offset, body, condition)
+
+    def statement_exit(self) -> Exit:
+        start = self.advance()
+        self.end_statement()
+        return Exit(start.offset)
+
+    def statement_continue(self) -> Continue:
+        start = self.advance()
+        self.end_statement()
+        return Continue(start.offset)
+
+    def statement_return(self) -> Return:
+        start = self.advance()
+        self.end_statement()
+        return Return(start.offset)
+
+    def statement_jmp(self) -> Jump:
+        start = self.advance()
+        label = self.peek()
+        if label.kind != "ident":
+            raise StSyntaxError("expected a label", label.offset)
+        self.advance()
+        self.end_statement()
+        return Jump(start.offset, label.value)
+
+    # -- expressions --------------------------------------------------------
+
+    def expression(self, power: int = 0) -> Node:
+        left = self.prefix()
+        while True:
+            token = self.peek()
+            if token.kind not in ("op", "keyword"):
+                return left
+            binding = _BINARY.get(token.value)
+            if binding is None or binding <= power:
+                return left
+            self.advance()
+            right = self.expression(binding)
+            left = Binary(left.offset, token.value, left, right)
+
+    def prefix(self) -> Node:
+        token = self.peek()
+        if token.kind == "keyword" and token.value == "NOT":
+            self.advance()
+            return Unary(token.offset, "NOT", self.expression(_UNARY))
+        if token.kind == "op" and token.value in ("-", "+"):
+            self.advance()
+            return Unary(token.offset, token.value, self.expression(_UNARY))
+        return self.postfix(self.primary())
+
+    def primary(self) -> Node:
+        token = self.peek()
+        if not (
+            token.kind in ("ident", "number", "typed", "string")
+            or (token.kind == "keyword" and token.value in ("TRUE", "FALSE"))
+            or (token.kind == "op" and token.value in ("(", "["))
+        ):
+            # leave the token, it may end the statement the error is recovered at
+            raise StSyntaxError(
+                f"unexpected {token.value or 'end of text'}", token.offset
+            )
+        self.advance()
+        if token.kind == "ident":
+            return Name(token.offset, token.value)
+        if token.kind in ("number", "typed", "string"):
+            return Literal(token.offset, token.kind, token.value)
+        if token.kind == "keyword" and token.value in ("TRUE", "FALSE"):
+            return Literal(token.offset, "bool", token.value)
+        if token.kind == "op" and token.value == "(":
+            if (
+                self.at("ident")
+                and self.peek(1).kind == "op"
+                and self.peek(1).value == ":="
+            ):
+                elements = self.arguments(")")
+                return Aggregate(token.offset, elements)
+            inner = self.expression()
+            self.expect("op", ")")
+            return inner
+        # array aggregate [1, 2, 3]
+        elements = [self.expression()]
+        while self.accept("op", ","):
+            elements.append(self.expression())
+        self.expect("op", "]")
+        return Aggregate(token.offset, elements)
+
+    def postfix(self, node: Node) -> Node:
+        while True:
+            if self.accept("op", "."):
+                name = self.advance()
+                if name.kind not in ("ident", "keyword", "number"):
+                    raise StSyntaxError("expected a member name", name.offset)
+                # bit access (nWord.3) and members named like keywords
+                node = Member(node.offset, node, name.value)
+            elif self.accept("op", "^"):
+                node = Deref(node.offset, node)
+            elif self.accept("op", "["):
+                indices = [self.expression()]
+                while self.accept("op", ","):
+                    indices.append(self.expression())
+                self.expect("op", "]")
+                node = Index(node.offset, node, indices)
+            elif self.accept("op", "("):
+                node = Call(node.offset, node, self.arguments(")"))
+            else:
+                return node
+
+    def arguments(self, close: str) -> List[Argument]:
+        arguments: List[Argument] = []
+        if self.accept("op", close):
+            return arguments
+        while True:
+            token = self.peek()
+            following = self.peek(1)
+            if (
+                token.kind == "ident"
+                and following.kind == "op"
+                and following.value in (":=", "=>")
+            ):
+                self.advance()
+                self.advance()
+                value = self.expression()
+                arguments.append(
+                    Argument(token.offset, token.value, value, following.value == "=>")
+                )
+            else:
+                value = self.expression()
+                arguments.append(Argument(value.offset, None, value))
+            if self.accept("op", close):
+                return arguments
+            self.expect("op", ",")
+
+
+def parse_implementation(text: str) -> Implementation:
+    """
+    Parse a Structured Text body.
+
+    Syntax errors do not raise: the broken statement is skipped up to the
+    next ";" or block keyword and the error is recorded in the result.
+
+    Args:
+        text: The implementation of a pou, method or property accessor.
+
+    Returns:
+        The statements of the body and the syntax errors found.
+    """
+    return _Parser(tokenize(text)).parse_body()
+
+
+# ---------------------------------------------------------------------------
+# cache
+# ---------------------------------------------------------------------------
+
+_CACHE_SIZE = 4096
+_cache: "OrderedDict[bytes, Implementation]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def implementation_ast(text: str) -> Implementation:
+    """
+    Return the syntax tree of a body, cached by the hash of the text.
+
+    Equal bodies (copies of a pou in two loaded versions, the same file loaded
+    twice) share one tree, so it must not be changed by the caller.
+    """
+    key = blake2b((text or "").encode("utf-8"), digest_size=16).digest()
+    with _cache_lock:
+        tree = _cache.get(key)
+        if tree is not None:
+            _cache.move_to_end(key)
+            return tree
+    tree = parse_implementation(text)
+    with _cache_lock:
+        _cache[key] = tree
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return tree
+
+
+def clear_cache() -> None:
+    """Drop all cached syntax trees."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,118 @@
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import pytest
+
+from pytwincatparser import Loader, get_default_strategy
+from pytwincatparser import TwincatDataclasses as tcd
+
+# (name, declaration, implementation) of a method
+MethodSource = Tuple[str, str, str]
+
+_OBJECT = """<?xml version="1.0" encoding="utf-8"?>
+<TcPlcObject Version="1.1.0.1" ProductVersion="3.1.4024.12">
+{body}
+</TcPlcObject>
+"""
+
+
+def _cdata(text: str) -> str:
+    return "<![CDATA[" + text + "]]>"
+
+
+def _methods(methods: Iterable[MethodSource], with_body: bool) -> str:
+    parts = []
+    for name, declaration, implementation in methods:
+        body = (
+            f"      <Implementation>\n        <ST>{_cdata(implementation)}</ST>\n"
+            "      </Implementation>\n"
+            if with_body
+            else ""
+        )
+        parts.append(
+            f'    <Method Name="{name}">\n'
+            f"      <Declaration>{_cdata(declaration)}</Declaration>\n"
+            f"{body}"
+            "    </Method>\n"
+        )
+    return "".join(parts)
+
+
+class PlcFiles:
+    """
+    Writes TwinCAT object files into a folder and loads them like a project.
+
+    Tests describe pous, duts, gvls and interfaces by their declaration and
+    implementation, the objects come from the handlers of the loader with
+    variables, methods, parents and the namespace set like in a project.
+    """
+
+    def __init__(self, root: Path, name_space: str = "Lib"):
+        self.root = root
+        self.name_space = name_space
+        root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, name: str) -> Path:
+        """The path the objects of a file get, e.g. for remove_paths."""
+        return (self.root / name).resolve()
+
+    def _write(self, name: str, body: str) -> Path:
+        path = self.root / name
+        path.write_text(_OBJECT.format(body=body), "utf-8")
+        return self.path(name)
+
+    def pou(
+        self,
+        name: str,
+        declaration: str,
+        implementation: str = "",
+        methods: Iterable[MethodSource] = (),
+    ) -> Path:
+        return self._write(
+            f"{name}.TcPOU",
+            f'  <POU Name="{name}" SpecialFunc="None">\n'
+            f"    <Declaration>{_cdata(declaration)}</Declaration>\n"
+            f"    <Implementation>\n      <ST>{_cdata(implementation)}</ST>\n"
+            "    </Implementation>\n"
+            f"{_methods(methods, with_body=True)}"
+            "  </POU>",
+        )
+
+    def itf(
+        self, name: str, declaration: str = "", methods: Iterable[MethodSource] = ()
+    ) -> Path:
+        return self._write(
+            f"{name}.TcIO",
+            f'  <Itf Name="{name}">\n'
+            f"    <Declaration>{_cdata(declaration or f'INTERFACE {name}')}"
+            "</Declaration>\n"
+            f"{_methods(methods, with_body=False)}"
+            "  </Itf>",
+        )
+
+    def dut(self, name: str, declaration: str) -> Path:
+        return self._write(
+            f"{name}.TcDUT",
+            f'  <DUT Name="{name}">\n'
+            f"    <Declaration>{_cdata(declaration)}</Declaration>\n"
+            "  </DUT>",
+        )
+
+    def gvl(self, name: str, declaration: str) -> Path:
+        return self._write(
+            f"{name}.TcGVL",
+            f'  <GVL Name="{name}">\n'
+            f"    <Declaration>{_cdata(declaration)}</Declaration>\n"
+            "  </GVL>",
+        )
+
+    def load(self) -> List[tcd.Objects]:
+        """The objects of all files, followed by the PlcProject of the folder."""
+        loader = Loader(loader_strategy=get_default_strategy()())
+        return loader.load_tree(self.root, name_space=self.name_space, max_workers=1)
+
+
+@pytest.fixture
+def plc_files(tmp_path: Path) -> PlcFiles:
+    """Small TwinCAT object files in the namespace "Lib", loaded by the Loader."""
+    return PlcFiles(tmp_path / "Lib")
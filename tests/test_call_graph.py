@@ -0,0 +1,190 @@
+from pathlib import Path
+
+import pytest
+
+from pytwincatparser import CallGraph, Loader, get_default_strategy
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def _objects(plc_files):
+    plc_files.itf("I_Axis", methods=[("MoveAbs", "METHOD MoveAbs : BOOL", "")])
+    plc_files.pou(
+        "FB_AxisBase",
+        "FUNCTION_BLOCK FB_AxisBase IMPLEMENTS I_Axis",
+        methods=[
+            ("MoveAbs", "METHOD MoveAbs : BOOL", "_Start();"),
+            ("_Start", "METHOD _Start", ""),
+        ],
+    )
+    plc_files.pou(
+        "FB_Axis",
+        "FUNCTION_BLOCK FB_Axis EXTENDS FB_AxisBase",
+        methods=[("MoveAbs", "METHOD MoveAbs : BOOL", "SUPER^.MoveAbs();")],
+    )
+    plc_files.pou(
+        "F_Calc", "FUNCTION F_Calc : INT\nVAR_INPUT\n    nValue : INT;\nEND_VAR"
+    )
+    plc_files.pou(
+        "PRG_Main",
+        "PROGRAM PRG_Main\nVAR\n"
+        "    iAxis : I_Axis;\n"
+        "    fbAxis : FB_Axis;\n"
+        "    aAxes : ARRAY [1..2] OF FB_Axis;\n"
+        "    tTimer : TON;\n"
+        "    x : INT;\n"
+        "    y : INT;\n"
+        "END_VAR",
+        "iAxis.MoveAbs();\n"
+        "fbAxis();\n"
+        "aAxes[1].MoveAbs();\n"
+        "tTimer(IN := TRUE);\n"
+        "x := F_Calc(1);\n"
+        "y := Lib.F_Calc(2);\n",
+    )
+    return plc_files.load()
+
+
+def _object(objects, identifier):
+    [obj] = [obj for obj in objects if obj.get_identifier() == identifier]
+    return obj
+
+
+def test_call_graph_resolves_calls(plc_files):
+    graph = CallGraph()
+    graph.update(_objects(plc_files))
+
+    assert sorted(graph.callees("Lib.PRG_Main")) == [
+        "Lib.FB_Axis",
+        "Lib.FB_Axis.MoveAbs",
+        "Lib.F_Calc",
+        "Lib.I_Axis.MoveAbs",
+        "TON",
+    ]
+    assert graph.is_external("TON")
+    assert graph.callees("Lib.FB_Axis.MoveAbs") == ["Lib.FB_AxisBase.MoveAbs"]
+    # interface and base class methods dispatch to implementations and overrides
+    assert sorted(graph.callees("Lib.I_Axis.MoveAbs")) == [
+        "Lib.FB_Axis.MoveAbs",
+        "Lib.FB_AxisBase.MoveAbs",
+    ]
+    assert graph.callees("Lib.I_Axis.MoveAbs", dispatch=False) == []
+
+
+def test_call_graph_reachability_and_reload(plc_files):
+    graph = CallGraph()
+    graph.update(_objects(plc_files))
+
+    assert graph.reaching("lib.fb_axisbase._start") == {
+        "Lib.FB_AxisBase.MoveAbs",
+        "Lib.FB_Axis.MoveAbs",
+        "Lib.I_Axis.MoveAbs",
+        "Lib.PRG_Main",
+    }
+    assert "Lib.FB_AxisBase._Start" in graph.reachable("Lib.PRG_Main")
+
+    graph.remove_paths([plc_files.path("PRG_Main.TcPOU")])
+    assert "Lib.PRG_Main" not in graph.reaching("Lib.FB_AxisBase._Start")
+    assert graph.callers("Lib.FB_Axis") == []
+
+
+def test_qualified_calls(plc_files):
+    graph = CallGraph()
+    graph.update(_objects(plc_files))
+    assert graph.callers("Lib.F_Calc") == ["Lib.PRG_Main"]
+    assert not graph.is_external("Lib.F_Calc")
+
+
+def test_call_graph_resolves_changed_files_only(plc_files, monkeypatch):
+    objects = _objects(plc_files)
+    graph = CallGraph()
+    graph.update(objects)
+    assert len(graph) > 0
+
+    resolved = []
+    resolve = CallGraph._resolve
+
+    def counting(self, site, table):
+        resolved.append(site.caller)
+        return resolve(self, site, table)
+
+    monkeypatch.setattr(CallGraph, "_resolve", counting)
+    graph.update([_object(objects, "Lib.F_Calc")])
+    assert graph.callers("Lib.F_Calc") == ["Lib.PRG_Main"]
+    # the two calls of F_Calc, not the calls of the axis blocks
+    assert resolved == ["Lib.PRG_Main", "Lib.PRG_Main"]
+
+    resolved.clear()
+    graph.remove_paths([plc_files.path("F_Calc.TcPOU")])
+    assert graph.is_external("F_Calc")
+    assert resolved == ["Lib.PRG_Main", "Lib.PRG_Main"]
+
+    resolved.clear()
+    graph.update([_object(objects, "Lib.FB_Axis")])
+    assert graph.callees("Lib.FB_Axis.MoveAbs") == ["Lib.FB_AxisBase.MoveAbs"]
+    assert "Lib.FB_Axis.MoveAbs" in graph.callees("Lib.PRG_Main")
+    assert sorted(set(resolved)) == ["Lib.FB_Axis.MoveAbs", "Lib.PRG_Main"]
+
+
+def _edges(graph):
+    return {
+        (node, tuple(sorted(graph.callees(node))), graph.is_external(node))
+        for node in graph.nodes
+    }
+
+
+@pytest.mark.parametrize(
+    "order",
+    [
+        ["PRG_Main", "FB_Timer", "FB_Drive", "FB_Motion", "FB_Axis"],
+        ["FB_Axis", "FB_Motion", "FB_Drive", "FB_Timer", "PRG_Main"],
+    ],
+)
+def test_incremental_graph_equals_fresh_graph(plc_files, order):
+    plc_files.pou(
+        "PRG_Main",
+        "PROGRAM PRG_Main\nVAR\n"
+        "    fbTimer : FB_Timer;\n"
+        "    fbDrive : FB_Drive;\n"
+        "    fbAxis : FB_Axis;\n"
+        "END_VAR",
+        "fbTimer(bIn := TRUE);\nfbDrive.Start();\nfbAxis.Move();\n",
+    )
+    plc_files.pou(
+        "FB_Timer", "FUNCTION_BLOCK FB_Timer\nVAR_INPUT\n    bIn : BOOL;\nEND_VAR"
+    )
+    # has no Start method, the call is not resolvable once it is loaded
+    plc_files.pou("FB_Drive", "FUNCTION_BLOCK FB_Drive")
+    plc_files.pou(
+        "FB_Motion",
+        "FUNCTION_BLOCK FB_Motion",
+        methods=[("Move", "METHOD Move", "")],
+    )
+    plc_files.pou("FB_Axis", "FUNCTION_BLOCK FB_Axis EXTENDS FB_Motion")
+    objects = plc_files.load()
+    fresh = CallGraph()
+    fresh.update(objects)
+
+    graph = CallGraph()
+    for name in order:
+        graph.update([_object(objects, f"Lib.{name}")])
+        # resolve after every file, like an index kept up to date while loading
+        len(graph)
+    assert _edges(graph) == _edges(fresh)
+    assert sorted(graph.callees("Lib.PRG_Main")) == [
+        "Lib.FB_Motion.Move",
+        "Lib.FB_Timer",
+    ]
+
+
+def test_call_graph_of_project():
+    loader = Loader(loader_strategy=get_default_strategy()())
+    graph = CallGraph()
+    graph.update(loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj"))
+
+    callees = graph.callees("LCA_NGP_Core.FB_Base.CyclicGeneral")
+    assert "LCA_NGP_Core.FB_Base._Enabling" in callees
+    assert "FB_LogVar.OnChange" in callees
+    assert "LCA_NGP_Core.FB_Base.CyclicGeneral" in graph.reaching(
+        "LCA_NGP_Core.FB_Base._UpdateAlarm"
+    )
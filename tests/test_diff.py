@@ -0,0 +1,57 @@
+import re
+import shutil
+from pathlib import Path
+
+from pytwincatparser import Loader, diff_objects, get_default_strategy
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def _load(path: Path):
+    loader = Loader(loader_strategy=get_default_strategy()())
+    return loader.load_objects(path / "TwincatPlcProject.plcproj")
+
+
+def _edit(path: Path, pattern: str, replacement: str):
+    text = path.read_text("utf-8")
+    path.write_text(re.sub(pattern, replacement, text, count=1), "utf-8")
+
+
+def test_diff_objects(tmp_path: Path):
+    shutil.copytree(TWINCAT_FILES, tmp_path / "new")
+    pou = tmp_path / "new" / "Base" / "FB_Base.TcPOU"
+    dut = tmp_path / "new" / "Commands" / "ST_PmlCommand.TcDUT"
+    _edit(pou, r", I_TestInterface", "")
+    _edit(pou, r"(_nParentNumber\s*:) INT;", r"\1 DINT;")
+    _edit(pou, r"(_bEnableAlarm\s*: BOOL :=) TRUE;", r"\1 FALSE;")
+    _edit(pou, r"_ConfigureHmi := TRUE;", "_ConfigureHmi := FALSE;")
+    _edit(dut, r"bFollow(\s*): BOOL;", r"bReady\1: BOOL;")
+
+    old = _load(TWINCAT_FILES)
+    assert not diff_objects(old, _load(TWINCAT_FILES))
+
+    diff = diff_objects(old, _load(tmp_path / "new"))
+    assert [entry.identifier for entry in diff.removed] == [
+        "LCA_NGP_Core.ST_PmlCommand.bFollow"
+    ]
+    assert [entry.identifier for entry in diff.added] == [
+        "LCA_NGP_Core.ST_PmlCommand.bReady"
+    ]
+    assert {(entry.kind, entry.identifier) for entry in diff.changed} == {
+        ("pou", "LCA_NGP_Core.FB_Base"),
+        ("method", "LCA_NGP_Core.FB_Base._ConfigureHmi"),
+        ("variable", "LCA_NGP_Core.FB_Base._nParentNumber"),
+        ("variable", "LCA_NGP_Core.FB_Base._bEnableAlarm"),
+    }
+
+    implements = diff.get("LCA_NGP_Core.FB_Base", "pou").change("implements")
+    assert implements.old == ["I_Elementinformation", "I_TestInterface"]
+    assert implements.new == ["I_Elementinformation"]
+    variable_type = diff.get("LCA_NGP_Core.FB_Base._nParentNumber").change("type")
+    assert (variable_type.old, variable_type.new) == ("INT", "DINT")
+    initial_value = diff.get("LCA_NGP_Core.FB_Base._bEnableAlarm").change(
+        "initial_value"
+    )
+    assert (initial_value.old, initial_value.new) == ("TRUE", "FALSE")
+    method = diff.get("LCA_NGP_Core.FB_Base._ConfigureHmi")
+    assert [change.field for change in method.changes] == ["implementation"]
@@ -0,0 +1,55 @@
+import shutil
+from pathlib import Path
+
+from pytwincatparser import (
+    FingerprintIndex,
+    Loader,
+    PlcProject,
+    compare_trees,
+    get_default_strategy,
+    merkle_tree,
+)
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def _load(path: Path):
+    loader = Loader(loader_strategy=get_default_strategy()())
+    index = loader.add_index(FingerprintIndex())
+    objects = loader.load_objects(path / "TwincatPlcProject.plcproj")
+    project = next(obj for obj in objects if isinstance(obj, PlcProject))
+    return index, project
+
+
+def test_merkle_tree(tmp_path: Path):
+    release = tmp_path / "release"
+    current = tmp_path / "current"
+    shutil.copytree(TWINCAT_FILES, release)
+    shutil.copytree(TWINCAT_FILES, current)
+    pou = current / "Base" / "FB_Base.TcPOU"
+    text = pou.read_text("utf-8")
+    pou.write_text(
+        text.replace("_ConfigureHmi := TRUE;", "_ConfigureHmi := FALSE;"), "utf-8"
+    )
+
+    old_index, old_project = _load(release)
+    new_index, new_project = _load(current)
+    old_tree = old_index.tree(old_project)
+    new_tree = new_index.tree(new_project)
+
+    # the hashes taken while loading give the same tree as hashing from scratch
+    assert old_tree.digest == merkle_tree(old_project).digest
+    assert old_index.fingerprint("pou", "LCA_NGP_Core.FB_Base") is not None
+    assert compare_trees(old_tree, old_index.tree(old_project)) == []
+
+    assert old_tree.digest != new_tree.digest
+    dut = "dut:LCA_NGP_Core.ST_PmlCommand"
+    assert old_tree.children[dut].digest == new_tree.children[dut].digest
+    changes = compare_trees(old_tree, new_tree)
+    assert [(c.status, c.identifier, c.kind) for c in changes] == [
+        ("changed", "LCA_NGP_Core.FB_Base._ConfigureHmi", "method")
+    ]
+
+    del new_project.pous[0].methods[0]
+    changes = compare_trees(old_tree, merkle_tree(new_project))
+    assert ("removed", "method") in {(c.status, c.kind) for c in changes}
@@ -280,4 +280,12 @@ def test_get_var_blocks():
 	    _bLicenseOk 							: BOOL := TRUE; // static class variable, access to all fb
     """}]
     result17 = get_var_blocks(test_str17)
-    assert result17 == expected17, f"Test case 17 failed. Expected: {expected17}, Got: {result17}"
\ No newline at end of file
+    assert result17 == expected17, f"Test case 17 failed. Expected: {expected17}, Got: {result17}"
+
+def test_get_var_blocks_spans():
+    decl = "FUNCTION_BLOCK FB_Test\nVAR_INPUT\n\tbStart : BOOL;\nEND_VAR\nVAR\n\tnCount : INT;\nEND_VAR"
+    blocks = get_var_blocks(decl, spans=True)
+    assert [block["name"] for block in blocks] == ["VAR_INPUT", "VAR"]
+    for block in blocks:
+        assert decl[block["start"] : block["end"]] == block["content"]
+    assert "start" not in get_var_blocks(decl)[0]
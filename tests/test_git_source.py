@@ -0,0 +1,81 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from pytwincatparser import (
+    GitRepository,
+    Loader,
+    PlcProject,
+    diff_objects,
+    get_default_strategy,
+    source_line,
+)
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+def _git(repo: Path, *args: str):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_load_revisions(tmp_path: Path):
+    repo = tmp_path / "repo"
+    shutil.copytree(TWINCAT_FILES, repo / "Lib")
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "release")
+    _git(repo, "tag", "v1")
+    pou = repo / "Lib" / "Base" / "FB_Base.TcPOU"
+    pou.write_text(
+        pou.read_text("utf-8").replace("_ConfigureHmi := TRUE;", "_ConfigureHmi := 1;"),
+        "utf-8",
+    )
+    _git(repo, "commit", "-q", "-am", "change")
+    # the working tree is not read
+    shutil.rmtree(repo / "Lib" / "Commands")
+
+    loader = Loader(loader_strategy=get_default_strategy()())
+    on_disk = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+    with GitRepository(repo) as repository:
+        release = loader.load_source(
+            repository.source("v1"), "lib/twincatplcproject.plcproj"
+        )
+        assert len(repository.cache) == 2
+        head_source = repository.source("HEAD")
+        head = loader.load_source(head_source, "Lib/TwincatPlcProject.plcproj")
+        # the unchanged dut comes from the cache, FB_Base is parsed again
+        assert len(repository.cache) == 3
+
+        # lines are read from the revision, not from the working tree
+        pou = head[-1].pous[0]
+        text = head_source.read("Lib/Base/FB_Base.TcPOU").decode("utf-8")
+        line = source_line(pou, "declaration", source=head_source)
+        assert "FUNCTION_BLOCK FB_Base" in text.splitlines()[line - 1]
+        assert source_line(pou) is None
+
+    assert not diff_objects(on_disk, release)
+    diff = diff_objects(release, head)
+    assert [entry.identifier for entry in diff.changed] == [
+        "LCA_NGP_Core.FB_Base._ConfigureHmi"
+    ]
+
+    project = head[-1]
+    assert isinstance(project, PlcProject)
+    head_root = Path(f"{repository.rev_parse('HEAD')}:")
+    assert project.path == head_root / "Lib" / "TwincatPlcProject.plcproj"
+    dut = project.duts[0]
+    assert dut.parent is project
+    assert dut.variables[0].parent is dut
+    assert dut is not release[-1].duts[0]
+    # the cached dut of v1 gets the path of its own revision
+    assert dut.path == head_root / "Lib" / "Commands" / "ST_PmlCommand.TcDUT"
+    assert release[-1].duts[0].path.parts[0] == f"{repository.rev_parse('v1')}:"
@@ -0,0 +1,267 @@
+import pickle
+
+import pytest
+
+from pytwincatparser import IoIndex, Loader, get_default_strategy
+from pytwincatparser import TwincatDataclasses as tcd
+from pytwincatparser.Snapshot import dumps_snapshot, loads_snapshot
+
+TSPROJ = """<?xml version="1.0"?>
+<TcSmProject TcSmVersion="1.0" TcVersion="3.1.4024.12">
+  <Project ProjectGUID="{00000000-0000-0000-0000-000000000000}" ShowHideConfigurations="#x6">
+    <System>
+      <Tasks>
+        <Task Id="2" Priority="20" CycleTime="100000" AmsPort="350">
+          <Name>PlcTask</Name>
+        </Task>
+      </Tasks>
+    </System>
+    <Plc>
+      <Project Name="Machine" PrjFilePath="Machine/Machine.plcproj" TmcFilePath="Machine/Machine.tmc" AmsPort="851"/>
+    </Plc>
+    <Io>
+      <Device Id="1" DevType="111" RemoteName="Device 1 (EtherCAT)">
+        <Name>Device 1 (EtherCAT)</Name>
+        <Vars VarGrpType="1">
+          <Name>Inputs</Name>
+          <Var>
+            <Name>DevState</Name>
+            <Type>UINT</Type>
+          </Var>
+        </Vars>
+        <Box Id="1" BoxType="9099">
+          <Name>Term 1 (EK1100)</Name>
+          <Box Id="2" BoxType="9099">
+            <Name>Term 2 (EL1008)</Name>
+            <EtherCAT VendorId="#x00000002" ProductCode="#x03f03052">
+              <Pdo Name="Channel 1" Index="#x1a00" Flags="#x0011" SyncMan="0">
+                <Entry Name="Input" Index="#x6000" Sub="#x01">
+                  <Type>BIT</Type>
+                </Entry>
+              </Pdo>
+            </EtherCAT>
+          </Box>
+          <Box Id="3" BoxType="9099">
+            <Name>Term 3 (EL2008)</Name>
+            <EtherCAT VendorId="#x00000002" ProductCode="#x07d83052">
+              <Pdo Name="Channel 1" Index="#x1600" Flags="#x0011" SyncMan="0">
+                <Entry Name="Output" Index="#x7000" Sub="#x01">
+                  <Type>BIT</Type>
+                </Entry>
+              </Pdo>
+            </EtherCAT>
+          </Box>
+        </Box>
+      </Device>
+      <Device File="Device 2 (EtherCAT).xti" Id="2"/>
+    </Io>
+  </Project>
+  <Mappings>
+    <OwnerA Name="TIPC^Machine^Machine Instance">
+      <OwnerB Name="TIID^Device 1 (EtherCAT)^Term 1 (EK1100)^Term 2 (EL1008)">
+        <Link VarA="PlcTask Inputs^GVL_IO.bDoorClosed" VarB="Channel 1^Input"/>
+      </OwnerB>
+    </OwnerA>
+  </Mappings>
+</TcSmProject>
+"""
+
+
+def _load(tmp_path, text=TSPROJ):
+    path = tmp_path / "Machine.tsproj"
+    path.write_text(text)
+    loader = Loader(loader_strategy=get_default_strategy()())
+    project = loader.load_objects(path)[-1]
+    assert isinstance(project, tcd.TwincatProject)
+    return project
+
+
+def test_io_is_read_on_first_access(tmp_path):
+    project = _load(tmp_path)
+    assert [task.name for task in project.tasks] == ["PlcTask"]
+    assert [instance.name for instance in project.plc_instances] == ["Machine"]
+    assert not project._sections.loaded
+
+    devices = project.io
+    assert project._sections.loaded
+    assert project.io is devices
+    assert [device.name for device in devices] == [
+        "Device 1 (EtherCAT)",
+        "Device 2 (EtherCAT)",
+    ]
+    device = devices[0]
+    assert device.parent is project
+    assert device.expanded
+    assert [variable.get_identifier() for variable in device.variables] == [
+        "Device 1 (EtherCAT)^Inputs^DevState"
+    ]
+    coupler = device.boxes[0]
+    assert [box.name for box in coupler.boxes] == ["Term 2 (EL1008)", "Term 3 (EL2008)"]
+    assert [box.id for box in coupler.boxes] == [2, 3]
+    inputs, outputs = (box.variables[0] for box in coupler.boxes)
+    assert inputs.get_identifier() == (
+        "Device 1 (EtherCAT)^Term 1 (EK1100)^Term 2 (EL1008)^Channel 1^Input"
+    )
+    assert (inputs.data_type, inputs.direction) == ("BIT", "input")
+    assert outputs.direction == "output"
+    # the .xti of the device does not exist
+    assert devices[1].file == "Device 2 (EtherCAT).xti"
+    assert devices[1].expand().boxes == []
+
+
+def test_mappings(tmp_path):
+    project = _load(tmp_path)
+    [link] = project.mappings
+    assert link.owner_a == "TIPC^Machine^Machine Instance"
+    assert link.var_a == "PlcTask Inputs^GVL_IO.bDoorClosed"
+    assert link.owner_b == "TIID^Device 1 (EtherCAT)^Term 1 (EK1100)^Term 2 (EL1008)"
+    assert link.var_b == "Channel 1^Input"
+
+
+def test_tasks_are_read_without_the_io_section(tmp_path):
+    # reading stops at <Io>, what follows is never parsed
+    broken = TSPROJ[: TSPROJ.index("<Io>") + len("<Io>")] + "<Device><<broken"
+    project = _load(tmp_path, broken)
+    assert [task.name for task in project.tasks] == ["PlcTask"]
+    assert [instance.ams_port for instance in project.plc_instances] == [851]
+
+
+def test_sections_survive_pickle(tmp_path):
+    project = _load(tmp_path)
+    copy = pickle.loads(pickle.dumps(project))
+    assert not copy._sections.loaded
+    assert [device.name for device in copy.io][0] == "Device 1 (EtherCAT)"
+
+
+def test_sections_are_read_again_after_a_snapshot(tmp_path):
+    project = _load(tmp_path)
+    [copy] = loads_snapshot(dumps_snapshot([project]))
+    assert copy._sections is None
+    assert [link.var_b for link in copy.mappings] == ["Channel 1^Input"]
+    assert copy.io[0].variables[0].name == "DevState"
+
+    (tmp_path / "Machine.tsproj").unlink()
+    [copy] = loads_snapshot(dumps_snapshot([project]))
+    with pytest.raises(FileNotFoundError):
+        copy.io
+
+
+def test_unexpanded_devices_survive_a_snapshot(tmp_path):
+    loader = Loader(loader_strategy=get_default_strategy()())
+    xti = _write_xti(tmp_path)
+    [device] = loader.load_objects(xti)
+    [copy] = loads_snapshot(dumps_snapshot([device]))
+    assert not copy.expanded
+    assert len(copy.expand().boxes[0].boxes[0].variables) == 2
+    assert copy.expanded
+    # expanded, the boxes are part of the snapshot
+    [again] = loads_snapshot(dumps_snapshot([copy]))
+    assert again.expanded
+    assert [box.name for box in again.boxes] == ["Term 1 (EK1100)"]
+
+    # a device of the project reads its own .xti again
+    [_, stub] = _load(tmp_path).io
+    [copy] = loads_snapshot(dumps_snapshot([stub]))
+    assert not copy.expanded
+    assert copy.expand().boxes[0].boxes[0].name == "Term 4 (EL3102)"
+
+    # a device of data can not be read again, it is written expanded
+    [device] = loader.load_bytes(xti.read_bytes(), "Device 2 (EtherCAT).xti")
+    [copy] = loads_snapshot(dumps_snapshot([device]))
+    assert copy.expanded
+    assert copy.boxes[0].name == "Term 1 (EK1100)"
+
+    [copy] = loads_snapshot(dumps_snapshot(loader.load_objects(xti)))
+    xti.unlink()
+    with pytest.raises(FileNotFoundError):
+        copy.expand()
+
+
+DEVICE_XTI = """<?xml version="1.0"?>
+<TcSmItem TcSmVersion="1.0" TcVersion="3.1.4024.12" ClassName="CDevEtherCATDef">
+  <Device Id="2" DevType="111" DevFlags="#x0003">
+    <Name>__FILENAME__</Name>
+    <Image Id="1" AddrType="9" ImageType="1">
+      <Name>Image</Name>
+    </Image>
+    <Box File="Term 1 (EK1100).xti" Id="1"/>
+  </Device>
+</TcSmItem>
+"""
+
+BOX_XTI = """<?xml version="1.0"?>
+<TcSmItem TcSmVersion="1.0" TcVersion="3.1.4024.12" ClassName="CDevEtherCATDef">
+  <Box Id="1" BoxType="9099">
+    <Name>__FILENAME__</Name>
+    <Box Id="4" BoxType="9099">
+      <Name>Term 4 (EL3102)</Name>
+      <EtherCAT VendorId="#x00000002">
+        <Pdo Name="AI Standard Channel 1" Index="#x1a00" SyncMan="3">
+          <Entry Name="Status" Index="#x6000" Sub="#x01">
+            <Type>WORD</Type>
+          </Entry>
+          <Entry Name="Value" Index="#x6000" Sub="#x11">
+            <Type>INT</Type>
+          </Entry>
+        </Pdo>
+      </EtherCAT>
+    </Box>
+  </Box>
+</TcSmItem>
+"""
+
+
+def _write_xti(tmp_path):
+    folder = tmp_path / "_Config" / "IO"
+    (folder / "Device 2 (EtherCAT)").mkdir(parents=True)
+    (folder / "Device 2 (EtherCAT).xti").write_text(DEVICE_XTI)
+    (folder / "Device 2 (EtherCAT)" / "Term 1 (EK1100).xti").write_text(BOX_XTI)
+    return folder / "Device 2 (EtherCAT).xti"
+
+
+def test_xti_index(tmp_path):
+    index = IoIndex.read(_write_xti(tmp_path))
+    assert index.devices == ["Device 2 (EtherCAT)"]
+    assert len(index) == 2
+    assert list(index.variables()) == [
+        (
+            "Device 2 (EtherCAT)^Term 1 (EK1100)^Term 4 (EL3102)"
+            "^AI Standard Channel 1^Status",
+            "WORD",
+            "input",
+        ),
+        (
+            "Device 2 (EtherCAT)^Term 1 (EK1100)^Term 4 (EL3102)"
+            "^AI Standard Channel 1^Value",
+            "INT",
+            "input",
+        ),
+    ]
+    device = index.device("Device 2 (EtherCAT)")
+    [coupler] = device.boxes
+    assert (coupler.name, coupler.file, coupler.box_type) == (
+        "Term 1 (EK1100)",
+        "Term 1 (EK1100).xti",
+        "9099",
+    )
+    assert [box.name for box in coupler.boxes] == ["Term 4 (EL3102)"]
+
+
+def test_load_xti(tmp_path):
+    loader = Loader(loader_strategy=get_default_strategy()())
+    [device] = loader.load_objects(_write_xti(tmp_path))
+    assert isinstance(device, tcd.IoDevice)
+    assert device.name == "Device 2 (EtherCAT)"
+    assert not device.expanded
+    assert len(device.expand().boxes[0].boxes[0].variables) == 2
+
+
+def test_project_expands_device_from_its_xti(tmp_path):
+    _write_xti(tmp_path)
+    device = _load(tmp_path).io[1]
+    assert not device.expanded
+    [variable, _] = device.expand().boxes[0].boxes[0].variables
+    assert variable.get_identifier() == (
+        "Device 2 (EtherCAT)^Term 1 (EK1100)^Term 4 (EL3102)"
+        "^AI Standard Channel 1^Status"
+    )
@@ -0,0 +1,111 @@
+import pytest
+
+from pytwincatparser import IoMapping, Loader, get_default_strategy
+from pytwincatparser.Twincat4024Strategy import parse_variables
+
+TSPROJ = """<?xml version="1.0"?>
+<TcSmProject TcSmVersion="1.0" TcVersion="3.1.4024.12">
+  <Project ProjectGUID="{00000000-0000-0000-0000-000000000000}">
+    <System>
+      <Tasks>
+        <Task Id="2" Priority="20" CycleTime="100000" AmsPort="350">
+          <Name>PlcTask</Name>
+        </Task>
+      </Tasks>
+    </System>
+    <Plc>
+      <Project Name="Machine" PrjFilePath="Machine/Machine.plcproj" AmsPort="851"/>
+    </Plc>
+  </Project>
+  <Mappings>
+    <OwnerA Name="TIPC^Machine^Machine Instance">
+      <OwnerB Name="TIID^Device 1 (EtherCAT)^Term 1 (EK1100)^Term 2 (EL1008)">
+        <Link VarA="PlcTask Inputs^GVL_IO.bDoorClosed" VarB="Channel 1^Input"/>
+        <Link VarA="PlcTask Inputs^MAIN.fbDoor.bSensor" VarB="Channel 2^Input"/>
+      </OwnerB>
+    </OwnerA>
+    <OwnerA Name="TIID^Device 1 (EtherCAT)^Term 1 (EK1100)^Term 3 (EL2008)">
+      <OwnerB Name="TIPC^Machine^Machine Instance">
+        <Link VarA="Channel 1^Output" VarB="PlcTask Outputs^GVL_IO.bLamp"/>
+        <Link VarA="Channel 2^Output" VarB="PlcTask Outputs^GVL_IO.bLamp"/>
+      </OwnerB>
+    </OwnerA>
+    <OwnerA Name="TIID^Device 1 (EtherCAT)">
+      <OwnerB Name="TIID^Device 2 (EtherCAT)">
+        <Link VarA="Inputs^DevState" VarB="Outputs^DevCtrl"/>
+      </OwnerB>
+    </OwnerA>
+  </Mappings>
+</TcSmProject>
+"""
+
+EL1008 = "Device 1 (EtherCAT)^Term 1 (EK1100)^Term 2 (EL1008)"
+EL2008 = "Device 1 (EtherCAT)^Term 1 (EK1100)^Term 3 (EL2008)"
+
+
+def _objects(tmp_path, plc_files):
+    path = tmp_path / "Machine.tsproj"
+    path.write_text(TSPROJ)
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_objects(path)
+
+    plc_files.gvl(
+        "GVL_IO",
+        "VAR_GLOBAL\n"
+        "    bDoorClosed AT %I* : BOOL;\n"
+        "    bLamp AT %Q* : BOOL;\n"
+        "    bSpare AT %I* : BOOL;\n"
+        "    nFixed AT %IW10 : INT;\n"
+        "END_VAR",
+    )
+    plc_files.pou(
+        "FB_Door",
+        "FUNCTION_BLOCK FB_Door\nVAR_INPUT\n    bSensor AT %I* : BOOL;\nEND_VAR",
+    )
+    return objects + plc_files.load()
+
+
+def test_located_variables_are_parsed():
+    [variable] = parse_variables("VAR_GLOBAL\n    bDoor AT %IX1.0 : BOOL;\nEND_VAR")
+    assert (variable.name, variable.address, variable.type) == (
+        "bDoor",
+        "%IX1.0",
+        "BOOL",
+    )
+
+
+def test_both_directions(tmp_path, plc_files):
+    mapping = IoMapping(_objects(tmp_path, plc_files))
+    assert len(mapping) == 4
+    assert mapping.channels("gvl_io.bdoorclosed") == [f"{EL1008}^Channel 1^Input"]
+    assert mapping.variables(f"{EL1008}^Channel 1^Input") == ["GVL_IO.bDoorClosed"]
+    assert mapping.channels("MAIN.fbDoor.bSensor") == [f"{EL1008}^Channel 2^Input"]
+    # one output drives two channels
+    assert mapping.channels("GVL_IO.bLamp") == [
+        f"{EL2008}^Channel 1^Output",
+        f"{EL2008}^Channel 2^Output",
+    ]
+    assert mapping.project("GVL_IO.bLamp") == "Machine"
+    assert mapping.channels("GVL_IO.bSpare") == []
+    assert mapping.variables("Device 2 (EtherCAT)^Outputs^DevCtrl") == []
+
+
+def test_addresses(tmp_path, plc_files):
+    mapping = IoMapping(_objects(tmp_path, plc_files))
+    assert mapping.address("GVL_IO.bDoorClosed") == "%I*"
+    assert mapping.address("GVL_IO.nFixed") == "%IW10"
+    assert mapping.address("FB_Door.bSensor") == "%I*"
+    assert mapping.unlinked() == ["GVL_IO.bSpare"]
+
+
+def test_save_and_load(tmp_path, plc_files):
+    mapping = IoMapping(_objects(tmp_path, plc_files))
+    mapping.save(tmp_path / "mapping.bin")
+    loaded = IoMapping.load(tmp_path / "mapping.bin")
+    assert len(loaded) == 4
+    assert loaded.variables(f"{EL2008}^Channel 2^Output") == ["GVL_IO.bLamp"]
+    assert loaded.unlinked() == ["GVL_IO.bSpare"]
+
+    (tmp_path / "other.bin").write_bytes(b"\x00")
+    with pytest.raises(ValueError):
+        IoMapping.load(tmp_path / "other.bin")
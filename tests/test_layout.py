@@ -0,0 +1,142 @@
+import pytest
+
+from pytwincatparser import Layout
+
+
+@pytest.fixture
+def layout(plc_files):
+    plc_files.gvl(
+        "GVL",
+        "{attribute 'qualified_only'}\n"
+        "VAR_GLOBAL CONSTANT\n"
+        "    cLen : INT := 10;\n"
+        "    cMax : INT := cLen * 2;\n"
+        "    cLoop : INT := cLoop + 1;\n"
+        "END_VAR",
+    )
+    plc_files.dut(
+        "ST_A",
+        "TYPE ST_A :\nSTRUCT\n    bOn : BOOL;\n    nCount : DINT;\n"
+        "    nMode : INT;\nEND_STRUCT\nEND_TYPE",
+    )
+    plc_files.dut(
+        "ST_Packed",
+        "{attribute 'pack_mode' := '1'}\nTYPE ST_Packed :\nSTRUCT\n"
+        "    bOn : BOOL;\n    nCount : DINT;\n    nMode : INT;\n"
+        "END_STRUCT\nEND_TYPE",
+    )
+    plc_files.dut(
+        "ST_Text",
+        "TYPE ST_Text :\n// a comment before STRUCT\nSTRUCT\n"
+        "    sName : STRING(GVL.cLen);\n"
+        "    aValues : ARRAY[0..GVL.cMax - 1] OF LREAL;\n"
+        "    aGrid : ARRAY[1..2, 0..2] OF ST_A;\n"
+        "END_STRUCT\nEND_TYPE",
+    )
+    plc_files.dut(
+        "ST_Bits",
+        "TYPE ST_Bits :\nSTRUCT\n    b0 : BIT;\n    b1 : BIT;\n    nByte : BYTE;\n"
+        "END_STRUCT\nEND_TYPE",
+    )
+    plc_files.dut(
+        "E_Mode", "TYPE E_Mode :\n(\n    Idle := 0,\n    Run\n) UDINT;\nEND_TYPE"
+    )
+    plc_files.dut(
+        "U_Value",
+        "TYPE U_Value :\nUNION\n    nValue : DINT;\n    aBytes : ARRAY[0..5] OF BYTE;\n"
+        "END_UNION\nEND_TYPE",
+    )
+    plc_files.dut(
+        "ST_Extended",
+        "TYPE ST_Extended EXTENDS ST_A :\nSTRUCT\n    eMode : E_Mode;\n"
+        "END_STRUCT\nEND_TYPE",
+    )
+    plc_files.dut(
+        "ST_Loop1",
+        "TYPE ST_Loop1 :\nSTRUCT\n    a : ST_Loop2;\nEND_STRUCT\nEND_TYPE",
+    )
+    plc_files.dut(
+        "ST_Loop2",
+        "TYPE ST_Loop2 :\nSTRUCT\n    b : ST_Loop1;\nEND_STRUCT\nEND_TYPE",
+    )
+    plc_files.dut(
+        "ST_Broken",
+        "TYPE ST_Broken :\nSTRUCT\n    a : ARRAY[0..GVL.cLoop] OF INT;\n"
+        "END_STRUCT\nEND_TYPE",
+    )
+    plc_files.pou(
+        "FB_Axis",
+        "FUNCTION_BLOCK FB_Axis\nVAR_INPUT\n    nTarget : INT;\nEND_VAR\n"
+        "VAR_OUTPUT\n    bDone : BOOL;\nEND_VAR\n"
+        "VAR_IN_OUT\n    stData : ST_A;\nEND_VAR\n"
+        "VAR\n    fPosition : LREAL;\nEND_VAR\n"
+        "VAR_TEMP\n    nTemp : INT;\nEND_VAR\n"
+        "VAR CONSTANT\n    cSteps : INT := 4;\nEND_VAR",
+        methods=[("Move", "METHOD Move\nVAR_INST\n    nCalls : UDINT;\nEND_VAR", "")],
+    )
+    return Layout(plc_files.load())
+
+
+def test_struct_alignment(layout):
+    st_a = layout.of("ST_A")
+    assert [(member.name, member.offset) for member in st_a.members] == [
+        ("bOn", 0),
+        ("nCount", 4),
+        ("nMode", 8),
+    ]
+    assert (st_a.size, st_a.alignment) == (12, 4)
+    assert layout.of("ST_A") is st_a
+    assert layout.sizeof("ST_Packed") == 7
+    assert [member.offset for member in layout.of("ST_Packed").members] == [0, 1, 5]
+
+
+def test_strings_arrays_and_constants(layout):
+    assert layout.constant("GVL.cMax - 1") == 19
+    assert layout.sizeof("STRING") == 81
+    assert layout.sizeof("WSTRING(10)") == 22
+    text = layout.of("ST_Text")
+    assert [(member.name, member.offset, member.size) for member in text.members] == [
+        ("sName", 0, 11),
+        ("aValues", 16, 160),
+        ("aGrid", 176, 72),
+    ]
+    assert text.size == 248
+
+
+def test_bits_enums_unions_and_extends(layout):
+    bits = layout.of("ST_Bits")
+    assert [(member.offset, member.bit) for member in bits.members] == [
+        (0, 0),
+        (0, 1),
+        (1, None),
+    ]
+    assert layout.sizeof("E_Mode") == 4
+    assert (layout.sizeof("U_Value"), layout.of("U_Value").alignment) == (8, 4)
+    extended = layout.of("ST_Extended")
+    assert [(member.name, member.offset) for member in extended.members][-1] == (
+        "eMode",
+        12,
+    )
+    assert extended.size == 16
+
+
+def test_function_block_instance(layout):
+    fb = layout.of("FB_Axis")
+    assert [(member.name, member.offset) for member in fb.members] == [
+        ("__VFTABLE", 0),
+        ("nTarget", 8),
+        ("bDone", 10),
+        ("stData", 16),
+        ("fPosition", 24),
+        ("nCalls", 32),
+    ]
+    assert fb.size == 40
+
+
+def test_cycles_have_no_layout(layout):
+    assert layout.of("ST_Loop1") is None
+    assert layout.of("ST_Broken") is None
+    assert layout.sizeof("ST_Unknown") is None
+    layouts = layout.layouts()
+    assert layouts["Lib.ST_Loop2"] is None
+    assert layouts["Lib.FB_Axis"].size == 40
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+
+from pytwincatparser import LineIndex, Loader, get_default_strategy, source_line
+from pytwincatparser import TwincatDataclasses as tcd
+from pytwincatparser.Twincat4024Strategy import parse_variables
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def test_line_index():
+    lines = LineIndex("a\nbc\n\nd")
+    assert len(lines) == 4
+    assert lines.position(0) == (1, 1)
+    assert lines.position(3) == (2, 2)
+    assert lines.position(5) == (3, 1)
+    assert lines.position(6) == (4, 1)
+    for offset in range(7):
+        assert lines.offset(*lines.position(offset)) == offset
+    with pytest.raises(IndexError):
+        lines.offset(5)
+
+
+def test_variable_spans():
+    declaration = (
+        "FUNCTION_BLOCK FB_Test\n"
+        "VAR\n"
+        "\t// nCount : the counter\n"
+        "\tnCount : INT := 1; (* bFlag; *)\n"
+        "\ta, b : BOOL;\n"
+        "END_VAR"
+    )
+    variables = parse_variables(declaration)
+    spans = {
+        variable.name: declaration[variable.span[0] : variable.span[1]]
+        for variable in variables
+    }
+    assert spans == {
+        "nCount": "nCount : INT := 1;",
+        "a": "a, b : BOOL;",
+        "b": "b : BOOL;",
+    }
+    lines = LineIndex(declaration)
+    assert lines.position(variables[0].span[0]) == (4, 2)
+
+    # names in initial values and array bounds of earlier declarations
+    declaration = (
+        "VAR\n"
+        "\tstPos : ST_Pos := (x := 1, y := 2);\n"
+        "\tx : INT;\n"
+        "\ty : INT;\n"
+        "\taGrid : ARRAY[0..N, 0..M] OF INT;\n"
+        "\tN, M : INT;\n"
+        "END_VAR"
+    )
+    spans = {
+        variable.name: declaration[variable.span[0] : variable.span[1]]
+        for variable in parse_variables(declaration)
+    }
+    assert spans == {
+        "stPos": "stPos : ST_Pos := (x := 1, y := 2);",
+        "aGrid": "aGrid : ARRAY[0..N, 0..M] OF INT;",
+        "x": "x : INT;",
+        "y": "y : INT;",
+        "N": "N, M : INT;",
+        "M": "M : INT;",
+    }
+
+
+def test_source_line():
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+    pou = next(obj for obj in tcd.iter_objects(objects) if isinstance(obj, tcd.Pou))
+    text = (TWINCAT_FILES / "Base" / "FB_Base.TcPOU").read_text("utf-8-sig")
+    file_lines = text.splitlines()
+
+    assert "FUNCTION_BLOCK FB_Base" in file_lines[source_line(pou) - 1]
+    variable = pou.variables[0]
+    assert variable.name in file_lines[source_line(variable) - 1]
+
+    method = next(method for method in pou.methods if method.name == "CyclicGeneral")
+    line = method.implementation.splitlines()[1]
+    assert file_lines[source_line(method, "implementation", 2) - 1] == line
+
+    prop = next(prop for prop in pou.properties if prop.name == "DesignationName")
+    assert (
+        "THIS^._sDesignationName"
+        in (file_lines[source_line(prop, "implementation", accessor="get") - 1])
+    )
+    assert source_line(tcd.Pou(name="FB_Memory")) is None
@@ -0,0 +1,103 @@
+import io
+import shutil
+from pathlib import Path
+
+from pytwincatparser import (
+    Dut,
+    Loader,
+    PathIndex,
+    PlcProject,
+    TwincatProject,
+    diff_objects,
+    get_default_strategy,
+)
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def test_load_bytes():
+    loader = Loader(loader_strategy=get_default_strategy()())
+    dut_path = TWINCAT_FILES / "Commands" / "ST_PmlCommand.TcDUT"
+    data = dut_path.read_bytes()
+    on_disk = loader.load_objects(dut_path)
+
+    for buffer in (data, bytearray(data), memoryview(data)):
+        objects = loader.load_bytes(buffer, "archive/Commands/ST_PmlCommand.TcDUT")
+        assert isinstance(objects[0], Dut)
+        # the virtual path is kept as it is, nothing is resolved on disk
+        assert objects[0].path == Path("archive/Commands/ST_PmlCommand.TcDUT")
+        assert [variable.name for variable in objects[0].variables] == [
+            "eMode",
+            "eState",
+            "bFollow",
+        ]
+        assert not diff_objects(on_disk, objects)
+
+    objects = loader.load_stream(io.BytesIO(data), "ST_PmlCommand.TcDUT")
+    assert not diff_objects(on_disk, objects)
+    with open(dut_path, "rb") as stream:
+        assert not diff_objects(on_disk, loader.load_stream(stream, dut_path))
+
+
+def test_load_project_bytes():
+    loader = Loader(loader_strategy=get_default_strategy()())
+    project_path = TWINCAT_FILES / "TwincatPlcProject.plcproj"
+    data = project_path.read_bytes()
+
+    objects = loader.load_bytes(data, "nowhere/TwincatPlcProject.plcproj")
+    assert len(objects) == 1
+    assert isinstance(objects[0], PlcProject)
+    assert objects[0].name_space == "LCA_NGP_Core"
+
+    # with the folder of the real location the objects of the project are found
+    objects = loader.load_bytes(data, project_path, root=TWINCAT_FILES)
+    assert not diff_objects(loader.load_objects(project_path), objects)
+
+
+def test_project_bytes_do_not_walk_the_disk(monkeypatch):
+    def walk(root):
+        raise AssertionError(f"walked {root}")
+
+    monkeypatch.setattr(PathIndex, "from_directory", walk)
+    loader = Loader(loader_strategy=get_default_strategy()())
+    data = (TWINCAT_FILES / "TwincatPlcProject.plcproj").read_bytes()
+    [project] = loader.load_bytes(data, "TwincatPlcProject.plcproj")
+    assert project.sub_paths
+    assert all(not path.is_absolute() for path in project.sub_paths)
+
+
+TSPROJ = """<?xml version="1.0"?>
+<TcSmProject TcSmVersion="1.0" TcVersion="3.1.4024.12">
+  <Project ProjectGUID="{00000000-0000-0000-0000-000000000000}">
+    <Plc>
+      <Project Name="Machine" PrjFilePath="Machine\\TwincatPlcProject.plcproj"/>
+    </Plc>
+  </Project>
+</TcSmProject>
+"""
+
+
+def test_project_bytes_read_nothing_from_the_working_directory(tmp_path, monkeypatch):
+    shutil.copytree(TWINCAT_FILES, tmp_path / "Machine")
+    (tmp_path / "Machine.tsproj").write_text(TSPROJ, "utf-8")
+    monkeypatch.chdir(tmp_path)
+    loader = Loader(loader_strategy=get_default_strategy()())
+
+    data = (tmp_path / "Machine" / "TwincatPlcProject.plcproj").read_bytes()
+    [project] = loader.load_bytes(data, "Machine/TwincatPlcProject.plcproj")
+    assert project.pous == [] and project.duts == []
+    assert project.sub_paths[0] == Path("Machine/Base/FB_Base.TcPOU")
+
+    data = TSPROJ.encode()
+    [tsproj] = loader.load_bytes(data, "Machine.tsproj")
+    assert tsproj.sub_paths == []
+    assert tsproj.plc_instances[0].project_path == Path(
+        "Machine/TwincatPlcProject.plcproj"
+    )
+
+    objects = loader.load_bytes(data, "Machine.tsproj", root=tmp_path)
+    assert isinstance(objects[-1], TwincatProject)
+    assert objects[-1].sub_paths == [
+        tmp_path.resolve() / "Machine" / "TwincatPlcProject.plcproj"
+    ]
+    assert [pou.name for pou in objects[-2].pous] == ["FB_Base"]
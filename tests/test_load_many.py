@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from pytwincatparser import Loader, get_default_strategy
+from pytwincatparser import TwincatDataclasses as tcd
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def test_load_many_dedupes_inputs():
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_many(
+        [
+            TWINCAT_FILES / "Base" / "FB_Base.TcPOU",
+            TWINCAT_FILES / "TwincatPlcProject.plcproj",
+            TWINCAT_FILES / "Base" / ".." / "Base" / "FB_Base.TcPOU",
+        ],
+        max_workers=2,
+    )
+
+    identifiers = [obj.get_identifier() for obj in objects]
+    assert len(identifiers) == len(set(identifiers))
+
+    pous = [obj for obj in objects if isinstance(obj, tcd.Pou)]
+    assert len(pous) == 1
+    # the file is part of the project, so it is loaded with the project namespace
+    assert pous[0].get_identifier() == "LCA_NGP_Core.FB_Base"
+    assert isinstance(pous[0].parent, tcd.PlcProject)
+    assert objects[-1] is pous[0].parent
@@ -0,0 +1,36 @@
+import shutil
+from pathlib import Path
+
+from pytwincatparser import Loader, get_default_strategy
+from pytwincatparser import TwincatDataclasses as tcd
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def test_load_tree(tmp_path: Path):
+    shutil.copytree(TWINCAT_FILES / "Base", tmp_path / "Base")
+    shutil.copytree(TWINCAT_FILES / "Commands", tmp_path / "Commands")
+
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_tree(tmp_path, name_space="Lib", max_workers=2)
+
+    plcproj = objects[-1]
+    assert isinstance(plcproj, tcd.PlcProject)
+    assert [pou.name for pou in plcproj.pous] == ["FB_Base"]
+    assert [dut.name for dut in plcproj.duts] == ["ST_PmlCommand"]
+    assert plcproj.pous[0].get_identifier() == "Lib.FB_Base"
+    assert plcproj.pous[0].parent is plcproj
+    assert {var.name_space for var in plcproj.duts[0].variables} == {"Lib"}
+
+
+def test_load_tree_include_exclude(tmp_path: Path):
+    shutil.copytree(TWINCAT_FILES / "Base", tmp_path / "Base")
+    shutil.copytree(TWINCAT_FILES / "Commands", tmp_path / "Commands")
+
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_tree(tmp_path, exclude=["base/*"])
+    assert [obj.name for obj in objects] == ["ST_PmlCommand", tmp_path.name]
+
+    objects = loader.load_tree(tmp_path, include=["*.tcpou"], max_workers=1)
+    assert objects[-1].duts == []
+    assert [pou.name for pou in objects[-1].pous] == ["FB_Base"]
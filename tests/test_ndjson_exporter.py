@@ -0,0 +1,31 @@
+import io
+import json
+from pathlib import Path
+
+from pytwincatparser import Loader, export_ndjson, get_default_strategy
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def test_export_ndjson(tmp_path: Path):
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+
+    target = tmp_path / "model.ndjson"
+    count = export_ndjson(objects, target)
+    records = [json.loads(line) for line in target.read_text("utf-8").splitlines()]
+    assert len(records) == count
+
+    by_id = {record["id"]: record for record in records}
+    assert len(by_id) == count
+    pou = by_id["LCA_NGP_Core.FB_Base"]
+    assert pou["kind"] == "pou"
+    assert pou["parent"] == "LCA_NGP_Core"
+    assert "methods" not in pou and "variables" not in pou
+    assert by_id["LCA_NGP_Core.FB_Base._bLicenseOk"]["parent"] == "LCA_NGP_Core.FB_Base"
+    assert by_id["LCA_NGP_Core.FB_Base.Error"]["get"]["kind"] == "get"
+    assert by_id["LCA_NGP_Core"]["dependencies"][0]["name"] == "LCA_NGP_Core_legacy"
+
+    # text files work as well, a generator is consumed lazily
+    buffer = io.StringIO()
+    assert export_ndjson((obj for obj in objects), buffer) == count
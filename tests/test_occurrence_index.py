@@ -0,0 +1,162 @@
+from pathlib import Path
+
+import pytest
+
+from pytwincatparser import Loader, OccurrenceIndex, get_default_strategy
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def _objects(plc_files):
+    plc_files.pou(
+        "FB_Axis",
+        "FUNCTION_BLOCK FB_Axis\nVAR\n\tbBusy : BOOL;\nEND_VAR",
+        methods=[
+            (
+                "MoveAbs",
+                "METHOD MoveAbs\nVAR_INPUT\n\tPosition : LREAL;\nEND_VAR",
+                "bBusy := Position > 0;",
+            )
+        ],
+    )
+    plc_files.pou(
+        "PRG_Main",
+        "PROGRAM PRG_Main\nVAR\n\taAxes : ARRAY [1..2] OF FB_Axis;\nEND_VAR",
+        "aAxes[1].MoveAbs(Position := 5);\n"
+        "IF aAxes[2].bBusy THEN\n"
+        "\taAxes[2].MoveAbs(Position := 0);\n"
+        "END_IF",
+    )
+    return plc_files.load()
+
+
+def _object(objects, identifier):
+    [obj] = [obj for obj in objects if obj.get_identifier() == identifier]
+    return obj
+
+
+def _positions(index, identifier):
+    return [
+        (occurrence.identifier, occurrence.part, occurrence.line, occurrence.column)
+        for occurrence in index.references(identifier)
+    ]
+
+
+def test_occurrences_resolve_members_and_arguments(plc_files):
+    index = OccurrenceIndex()
+    index.update(_objects(plc_files))
+
+    assert _positions(index, "lib.fb_axis.bbusy") == [
+        ("Lib.FB_Axis", "declaration", 3, 2),
+        ("Lib.FB_Axis.MoveAbs", "implementation", 1, 1),
+        ("Lib.PRG_Main", "implementation", 2, 13),
+    ]
+    assert _positions(index, "Lib.FB_Axis.MoveAbs.Position") == [
+        ("Lib.FB_Axis.MoveAbs", "declaration", 3, 2),
+        ("Lib.FB_Axis.MoveAbs", "implementation", 1, 10),
+        ("Lib.PRG_Main", "implementation", 1, 18),
+        ("Lib.PRG_Main", "implementation", 3, 19),
+    ]
+    assert index.count("Lib.FB_Axis") == 2
+    assert index.references("Lib.Unknown") == []
+
+
+def test_occurrences_reload(plc_files):
+    objects = _objects(plc_files)
+    index = OccurrenceIndex()
+    index.update(objects)
+    assert index.count("Lib.FB_Axis.MoveAbs") == 3
+
+    index.remove_paths([plc_files.path("PRG_Main.TcPOU")])
+    assert index.count("Lib.FB_Axis.MoveAbs") == 1
+
+    index.update([_object(objects, "Lib.PRG_Main")])
+    assert index.count("Lib.FB_Axis.MoveAbs") == 3
+
+
+def test_occurrences_resolve_changed_texts_only(plc_files, monkeypatch):
+    plc_files.pou("F_Calc", "FUNCTION F_Calc : INT")
+    objects = _objects(plc_files)
+    index = OccurrenceIndex()
+    index.update(objects)
+    assert len(index) > 0
+
+    resolved = []
+    resolve = OccurrenceIndex._resolve_text
+
+    def counting(self, text, table):
+        resolved.append(text.identifier)
+        return resolve(self, text, table)
+
+    monkeypatch.setattr(OccurrenceIndex, "_resolve_text", counting)
+    index.update([_object(objects, "Lib.F_Calc")])
+    assert index.count("Lib.FB_Axis.MoveAbs") == 3
+    # nothing names F_Calc, only its own texts are resolved again
+    assert resolved == ["Lib.F_Calc"]
+
+    resolved.clear()
+    index.update([_object(objects, "Lib.FB_Axis")])
+    assert index.count("Lib.FB_Axis.MoveAbs") == 3
+    assert "Lib.PRG_Main" in resolved
+    assert "Lib.F_Calc" not in resolved
+
+
+def _rows(index):
+    return {
+        # occurrences are ordered by the load order of their files
+        (symbol, tuple(sorted(_positions(index, symbol))))
+        for symbol in index.symbols
+    }
+
+
+@pytest.mark.parametrize(
+    "order",
+    [
+        ["PRG_Main", "GVL_Main", "FB_Motion", "FB_Axis"],
+        ["FB_Axis", "FB_Motion", "GVL_Main", "PRG_Main"],
+    ],
+)
+def test_incremental_index_equals_fresh_index(plc_files, order):
+    plc_files.pou(
+        "PRG_Main",
+        "PROGRAM PRG_Main\nVAR\n\tfbAxis : FB_Axis;\nEND_VAR",
+        "fbAxis.Move(nSpeed := GVL_Main.nSpeed);\nfbAxis.bBusy := nLimit > 0;",
+    )
+    plc_files.gvl("GVL_Main", "VAR_GLOBAL\n\tnSpeed : INT;\n\tnLimit : INT;\nEND_VAR")
+    plc_files.pou(
+        "FB_Motion",
+        "FUNCTION_BLOCK FB_Motion\nVAR\n\tbBusy : BOOL;\nEND_VAR",
+        methods=[("Move", "METHOD Move\nVAR_INPUT\n\tnSpeed : INT;\nEND_VAR", "")],
+    )
+    plc_files.pou("FB_Axis", "FUNCTION_BLOCK FB_Axis EXTENDS FB_Motion")
+    objects = plc_files.load()
+    fresh = OccurrenceIndex()
+    fresh.update(objects)
+
+    index = OccurrenceIndex()
+    for name in order:
+        index.update([_object(objects, f"Lib.{name}")])
+        # resolve after every file, like an index kept up to date while loading
+        len(index)
+    assert _rows(index) == _rows(fresh)
+    assert sorted(
+        occurrence.identifier
+        for occurrence in index.references("Lib.FB_Motion.Move.nSpeed")
+    ) == ["Lib.FB_Motion.Move", "Lib.PRG_Main"]
+    assert index.count("Lib.GVL_Main.nLimit") == 2
+
+
+def test_occurrences_of_project():
+    loader = Loader(loader_strategy=get_default_strategy()())
+    index = OccurrenceIndex()
+    index.update(loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj"))
+
+    occurrences = index.references("LCA_NGP_Core.FB_Base._Enabling")
+    assert [occurrence.identifier for occurrence in occurrences] == [
+        "LCA_NGP_Core.FB_Base._Enabling",
+        "LCA_NGP_Core.FB_Base._Enabling",
+        "LCA_NGP_Core.FB_Base.CyclicGeneral",
+    ]
+    assert occurrences[0].path.name == "FB_Base.TcPOU"
+    # locals of methods are named below the method
+    assert index.count("LCA_NGP_Core.FB_Base.CyclicGeneral._EnableCodeLogger") == 2
@@ -0,0 +1,155 @@
+from pathlib import Path
+
+from pytwincatparser import Loader, get_default_strategy
+from pytwincatparser import TwincatDataclasses as tcd
+from pytwincatparser.parse_implementation import (
+    Assign,
+    Binary,
+    Call,
+    CallStatement,
+    Case,
+    Deref,
+    For,
+    If,
+    Literal,
+    Member,
+    Name,
+    Range,
+    Repeat,
+    Unary,
+    While,
+    clear_cache,
+    implementation_ast,
+    parse_implementation,
+    tokenize,
+    walk,
+)
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+BODY = """
+(* block comment with IF inside *)
+{attribute 'no'}
+nCount := nCount + 1 * 2; // line comment
+IF bStart AND NOT bBusy THEN
+    fbAxis.MoveAbsolute(Position := 10.5, Velocity := T#1S, Done => bDone);
+ELSIF a <> b THEN
+    SUPER^();
+ELSE
+    THIS^.Reset();
+END_IF
+CASE eState OF
+    E_State.Idle, E_State.Init:
+        eState := E_State.Run;
+    1..5:
+        pData^.nValue := 16#FF;
+ELSE
+    eState := E_State.Idle;
+END_CASE
+FOR i := 0 TO 10 BY 2 DO
+    aValues[i] := -aValues[i] ** 2;
+END_FOR
+WHILE bRun DO EXIT; END_WHILE
+REPEAT i := i + 1; UNTIL i > 3 END_REPEAT
+sText := 'it$'s';
+"""
+
+
+def test_tokenize():
+    tokens = tokenize("IF x>=1 THEN s:='a' ; END_if // c", comments=True)
+    assert [(t.kind, t.value) for t in tokens] == [
+        ("keyword", "IF"),
+        ("ident", "x"),
+        ("op", ">="),
+        ("number", "1"),
+        ("keyword", "THEN"),
+        ("ident", "s"),
+        ("op", ":="),
+        ("string", "'a'"),
+        ("op", ";"),
+        ("keyword", "END_IF"),
+        ("comment", "// c"),
+        ("eof", ""),
+    ]
+
+
+def test_parse_implementation():
+    tree = parse_implementation(BODY)
+    assert tree.errors == []
+    kinds = [type(statement) for statement in tree.body]
+    assert kinds == [Assign, If, Case, For, While, Repeat, Assign]
+
+    assign = tree.body[0]
+    # precedence: nCount + (1 * 2)
+    assert isinstance(assign.value, Binary) and assign.value.op == "+"
+    assert assign.value.right.op == "*"
+
+    branch_if = tree.body[1]
+    condition, body = branch_if.branches[0]
+    assert condition.op == "AND" and isinstance(condition.right, Unary)
+    call = body[0].call
+    assert isinstance(call.target, Member) and call.target.name == "MoveAbsolute"
+    assert [(a.name, a.output) for a in call.arguments] == [
+        ("Position", False),
+        ("Velocity", False),
+        ("Done", True),
+    ]
+    assert call.arguments[1].value == Literal(
+        call.arguments[1].value.offset, "typed", "T#1S"
+    )
+    super_call = branch_if.branches[1][1][0]
+    assert isinstance(super_call, CallStatement)
+    assert super_call.call.target == Deref(
+        super_call.call.target.offset, Name(super_call.call.target.offset, "SUPER")
+    )
+    this_call = branch_if.orelse[0].call
+    assert isinstance(this_call.target.target, Deref)
+
+    case = tree.body[2]
+    assert len(case.branches) == 2 and len(case.orelse) == 1
+    assert [label.name for label in case.branches[0].labels] == ["Idle", "Init"]
+    assert isinstance(case.branches[1].labels[0], Range)
+
+    calls = [node for node in walk(tree) if isinstance(node, Call)]
+    assert len(calls) == 3
+
+
+def test_negation_binds_below_power():
+    [statement] = parse_implementation("x := -a ** 2 * b;").body
+    product = statement.value
+    assert product.op == "*" and isinstance(product.left, Unary)
+    assert product.left.operand.op == "**"
+    [statement] = parse_implementation("x := a ** -b;").body
+    assert statement.value.op == "**" and isinstance(statement.value.right, Unary)
+    [statement] = parse_implementation("x := NOT a AND b;").body
+    assert statement.value.op == "AND" and isinstance(statement.value.left, Unary)
+
+
+def test_parse_errors_recover():
+    tree = parse_implementation("a := ;\nb := 1;\nIF x THEN c := 2; END_IF")
+    assert len(tree.errors) == 1
+    assert [type(statement) for statement in tree.body] == [Assign, If]
+
+
+def test_ast_is_lazy_and_cached():
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+    bodies = [
+        obj
+        for obj in tcd.iter_objects(objects)
+        if isinstance(obj, (tcd.Pou, tcd.Method, tcd.Get, tcd.Set))
+    ]
+    assert all(obj.ast.errors == [] for obj in bodies)
+
+    method = next(obj for obj in bodies if obj.name == "CyclicGeneral")
+    assert method.ast is method.ast
+    assert implementation_ast(str(method.implementation)) is method.ast
+    assert any(isinstance(statement, Case) for statement in method.ast.body)
+
+    # the tree is kept on the object until the implementation is replaced
+    tree = method.ast
+    clear_cache()
+    assert method.ast is tree
+    method.implementation = "nCount := nCount + 1;"
+    assert method.ast is not tree
+    assert isinstance(method.ast.body[0], Assign)
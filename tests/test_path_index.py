@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from pytwincatparser.PathIndex import PathIndex, normalize_include
+
+
+def test_normalize_include():
+    assert normalize_include(r"POUs\FB_Main.TcPOU") == "POUs/FB_Main.TcPOU"
+    assert normalize_include(r"POUs\..\DUTs\ST_Data.TcDUT") == "DUTs/ST_Data.TcDUT"
+    assert normalize_include("") == ""
+
+
+def test_path_index_resolve(tmp_path: Path):
+    (tmp_path / "POUs").mkdir()
+    (tmp_path / "POUs" / "FB_X.TcPOU").write_text("")
+    (tmp_path / "GVL.TcGVL").write_text("")
+
+    index = PathIndex.from_directory(tmp_path)
+    assert len(index) == 2
+    assert index.resolve(r"POUs\fb_x.TcPOU") == tmp_path / "POUs" / "FB_X.TcPOU"
+    assert index.resolve(r"pous\FB_X.TCPOU") == tmp_path / "POUs" / "FB_X.TcPOU"
+    assert index.resolve("gvl.tcgvl") == tmp_path / "GVL.TcGVL"
+    assert index.lookup(r"POUs\Missing.TcPOU") is None
+    assert index.resolve(r"POUs\Missing.TcPOU") == tmp_path / "POUs" / "Missing.TcPOU"
+
+
+def test_path_index_prefers_exact_match():
+    index = PathIndex(root=Path("/prj"), names=["a/FB_X.TcPOU", "a/fb_x.TcPOU"])
+    assert index.lookup("a/fb_x.TcPOU") == "a/fb_x.TcPOU"
+    assert index.lookup("a/FB_X.TcPOU") == "a/FB_X.TcPOU"
+    assert index.lookup("A/Fb_X.tcpou") == "a/FB_X.TcPOU"
+
+
+def test_includes_outside_the_root_are_resolved(tmp_path: Path, monkeypatch):
+    (tmp_path / "Shared").mkdir()
+    (tmp_path / "Shared" / "F_Calc.TcPOU").write_text("")
+    (tmp_path / "Shared" / "f_other.tcpou").write_text("")
+    (tmp_path / "Prj").mkdir()
+    index = PathIndex.from_directory(tmp_path / "Prj")
+    shared = tmp_path / "Shared" / "F_Calc.TcPOU"
+    assert index.resolve(r"..\Shared\F_Calc.TcPOU") == shared
+    assert index.resolve(r"POUs\..\..\Shared\F_Calc.TcPOU") == shared
+    assert index.resolve(str(tmp_path / "Prj" / ".." / "Shared" / "F_Calc.TcPOU")) == (
+        shared
+    )
+    # matched case-insensitive like the files below the root
+    assert index.resolve(r"..\SHARED\F_Other.TcPOU") == (
+        tmp_path / "Shared" / "f_other.tcpou"
+    )
+    assert index.resolve(r"..\Shared\Missing.TcPOU") == (
+        tmp_path / "Shared" / "Missing.TcPOU"
+    )
+
+    # every folder is listed once, not every include
+    def scandir(directory):
+        raise AssertionError(f"listed {directory} again")
+
+    monkeypatch.setattr("os.scandir", scandir)
+    assert index.resolve(r"..\shared\f_calc.tcpou") == shared
+
+    assert normalize_include(r"C:\Lib\..\F.TcPOU") == "C:/F.TcPOU"
+    assert normalize_include("/lib/../F.TcPOU") == "/F.TcPOU"
+
+
+def test_outside_paths_keep_symlinks(tmp_path: Path):
+    (tmp_path / "Real").mkdir()
+    (tmp_path / "Real" / "F_Calc.TcPOU").write_text("")
+    (tmp_path / "Link").symlink_to(tmp_path / "Real")
+    (tmp_path / "Prj").mkdir()
+    index = PathIndex.from_directory(tmp_path / "Prj")
+    # normalized like the root with abspath, not resolved through the link
+    assert index.resolve(r"..\Link\F_Calc.TcPOU") == (
+        tmp_path / "Link" / "F_Calc.TcPOU"
+    )
@@ -0,0 +1,154 @@
+import shutil
+from pathlib import Path
+
+from pytwincatparser import Loader, Reachability, get_default_strategy
+from pytwincatparser import TwincatDataclasses as tcd
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def _objects(plc_files):
+    plc_files.gvl("GVL", "VAR_GLOBAL\n    nUsed : INT;\n    nDead : INT;\nEND_VAR")
+    plc_files.pou(
+        "FB_Axis",
+        "FUNCTION_BLOCK FB_Axis",
+        methods=[
+            ("Move", "METHOD Move", "GVL.nUsed := 1;"),
+            ("Stop", "METHOD Stop", ""),
+            ("FB_init", "METHOD FB_init : BOOL", ""),
+        ],
+    )
+    plc_files.pou(
+        "PRG_Main",
+        "// entry\nPROGRAM PRG_Main\nVAR\n    fbAxis : FB_Axis;\nEND_VAR",
+        "fbAxis.Move();",
+    )
+    plc_files.pou("PRG_Test", "PROGRAM PRG_Test", "F_Unused();")
+    plc_files.pou("F_Unused", "FUNCTION F_Unused : BOOL")
+    return plc_files.load()
+
+
+def _dead(reachability, roots=None):
+    return sorted(obj.get_identifier() for obj in reachability.unreachable(roots))
+
+
+def test_reachability_from_programs(plc_files):
+    reachability = Reachability(_objects(plc_files))
+
+    # without tasks every PROGRAM is an entry point
+    assert reachability.entry_points() == ["Lib.PRG_Main", "Lib.PRG_Test"]
+    assert _dead(reachability) == ["Lib.FB_Axis.Stop", "Lib.GVL.nDead"]
+
+    reached = reachability.reachable(["Lib.PRG_Main"])
+    assert "Lib.FB_Axis.Move" in reached
+    assert "Lib.GVL.nUsed" in reached
+    # called by the runtime when the instance is created
+    assert "Lib.FB_Axis.FB_init" in reached
+    assert _dead(reachability, ["Lib.PRG_Main"]) == [
+        "Lib.FB_Axis.Stop",
+        "Lib.F_Unused",
+        "Lib.GVL.nDead",
+        "Lib.PRG_Test",
+    ]
+
+
+def test_reachability_from_tasks(plc_files):
+    task = tcd.Task(name="PlcTask", programs=["PRG_Test"])
+    reachability = Reachability(_objects(plc_files) + [task])
+
+    assert reachability.entry_points() == ["Lib.PRG_Test"]
+    assert "Lib.PRG_Main" in _dead(reachability)
+    assert "Lib.F_Unused" not in _dead(reachability)
+
+
+def test_load_tsproj():
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatProject.tsproj")
+
+    project = objects[-1]
+    assert isinstance(project, tcd.TwincatProject)
+    assert [task.name for task in project.tasks] == [
+        "TestTask",
+        "Slow",
+        "Fast",
+        "PlcTask",
+        "PlcTask1",
+    ]
+    task = project.tasks[0]
+    assert (task.priority, task.cycle_time, task.ams_port) == (4, 50000, 350)
+    assert task.parent is project
+
+    instances = {instance.name: instance for instance in project.plc_instances}
+    assert instances["Spielwiese"].ams_port == 852
+    assert instances["Spielwiese"].tasks == ["PlcTask"]
+    assert instances["Spielwiese"].project_path.name == "Spielwiese.plcproj"
+    assert instances["LCA_NGP_Core"].project_path.name == "LCA_NGP_Core.xti"
+
+
+TCTTO = """<?xml version="1.0" encoding="utf-8"?>
+<TcPlcObject Version="1.1.0.1" ProductVersion="3.1.4024.12">
+  <Task Name="PlcTask" Id="{4d1a2a2b-0000-0000-0000-000000000000}">
+    <!--CycleTime in micro seconds.-->
+    <CycleTime>10000</CycleTime>
+    <Priority>20</Priority>
+    <PouCall>
+      <Name>MAIN</Name>
+    </PouCall>
+    <TaskPouOid>{00000000-0000-0000-0000-000000000000}</TaskPouOid>
+  </Task>
+</TcPlcObject>
+"""
+
+MAIN = """<?xml version="1.0" encoding="utf-8"?>
+<TcPlcObject Version="1.1.0.1" ProductVersion="3.1.4024.12">
+  <POU Name="MAIN" Id="{00000000-0000-0000-0000-000000000001}" SpecialFunc="None">
+    <Declaration><![CDATA[PROGRAM MAIN
+VAR
+    fbBase : FB_Base;
+END_VAR
+]]></Declaration>
+    <Implementation>
+      <ST><![CDATA[fbBase();]]></ST>
+    </Implementation>
+  </POU>
+</TcPlcObject>
+"""
+
+
+def test_tasks_of_the_plc_project(tmp_path):
+    shutil.copytree(TWINCAT_FILES, tmp_path, dirs_exist_ok=True)
+    (tmp_path / "PlcTask.TcTTO").write_text(TCTTO, "utf-8")
+    (tmp_path / "MAIN.TcPOU").write_text(MAIN, "utf-8")
+    project = tmp_path / "TwincatPlcProject.plcproj"
+    project.write_text(
+        project.read_text("utf-8").replace(
+            '<Compile Include="Base\\FB_Base.TcPOU">',
+            '<Compile Include="PlcTask.TcTTO" />\n'
+            '    <Compile Include="MAIN.TcPOU" />\n'
+            '    <Compile Include="Base\\FB_Base.TcPOU">',
+        ),
+        "utf-8",
+    )
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_objects(project)
+
+    plcproj = objects[-1]
+    [task] = plcproj.tasks
+    assert task.parent is plcproj
+    assert (task.name, task.priority, task.cycle_time, task.programs) == (
+        "PlcTask",
+        20,
+        100000,
+        ["MAIN"],
+    )
+    assert task.get_identifier() == "LCA_NGP_Core.PlcTask"
+    # the task of the .tsproj has the same name and another identifier
+    system_task = tcd.Task(name="PlcTask", programs=["PRG_Other"])
+    assert system_task.get_identifier() != task.get_identifier()
+
+    reachability = Reachability(objects + [system_task])
+    assert reachability.entry_points(["LCA_NGP_Core.PlcTask"]) == ["LCA_NGP_Core.MAIN"]
+    assert reachability.entry_points(["PlcTask"]) == ["PRG_Other"]
+    reachability = Reachability(objects)
+    assert reachability.entry_points() == ["LCA_NGP_Core.MAIN"]
+    assert "LCA_NGP_Core.FB_Base" in reachability.reachable()
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from pytwincatparser import Loader, SearchIndex, get_default_strategy
+from pytwincatparser.SearchIndex import split_identifier, tokenize
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def test_split_identifier():
+    assert split_identifier("_bDoorClosed") == ["door", "closed"]
+    assert split_identifier("FB_AxisMove") == ["fb", "axis", "move"]
+    assert split_identifier("nParentNumber") == ["parent", "number"]
+    assert split_identifier("stPmlCommand") == ["pml", "command"]
+    assert split_identifier("fb_Axis") == ["fb", "axis"]
+    assert split_identifier("state") == ["state"]
+    assert split_identifier("E_PmlMode") == ["e", "pml", "mode"]
+    assert split_identifier("HTTPServer2") == ["http", "server", "2"]
+
+
+def test_tokenize():
+    assert tokenize("The safety door of FB_AxisMove") == [
+        "the", "safety", "door", "of", "fb", "axis", "move", "fb_axismove"
+    ]
+
+
+def test_search_index():
+    loader = Loader(loader_strategy=get_default_strategy()())
+    index = loader.add_index(SearchIndex())
+    loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+    assert len(index) > 0
+
+    hits = index.search("pml command", kinds=["pou", "dut"])
+    assert [hit.identifier for hit in hits] == ["LCA_NGP_Core.ST_PmlCommand"]
+    hits = index.search("static class variable", kinds=["variable"])
+    assert hits[0].identifier == "LCA_NGP_Core.FB_Base._bLicenseOk"
+    assert hits[0].obj.name == "_bLicenseOk"
+    assert index.search("no such words anywhere") == []
+
+
+def test_search_index_reload_and_persist(tmp_path: Path):
+    loader = Loader(loader_strategy=get_default_strategy()())
+    index = loader.add_index(SearchIndex())
+    loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+    count = len(index)
+    # loading the same files again replaces their documents
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+    assert len(index) == count
+
+    index.save(tmp_path / "search.idx")
+    restored = SearchIndex.load(tmp_path / "search.idx")
+    assert len(restored) == count
+    expected = [(hit.identifier, hit.score) for hit in index.search("parent name")]
+    assert [(hit.identifier, hit.score) for hit in restored.search("parent name")] == (
+        expected
+    )
+    assert restored.search("parent name")[0].obj is None
+    restored.bind(objects)
+    assert restored.search("parent name")[0].obj is not None
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from pytwincatparser import Loader, get_default_strategy, load_snapshot, save_snapshot
+from pytwincatparser import SnapshotError
+from pytwincatparser import TwincatDataclasses as tcd
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def test_snapshot_roundtrip(tmp_path: Path):
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+
+    snapshot = tmp_path / "model.snap"
+    save_snapshot(objects, snapshot)
+    restored = load_snapshot(snapshot)
+
+    assert [obj.get_identifier() for obj in restored] == [
+        obj.get_identifier() for obj in objects
+    ]
+    pou = restored[0]
+    assert isinstance(pou, tcd.Pou)
+    assert pou.path == objects[0].path
+    assert pou.declaration == objects[0].declaration
+    assert pou.documentation.details == objects[0].documentation.details
+    assert [var.name for var in pou.variables] == [
+        var.name for var in objects[0].variables
+    ]
+    # parents are shared objects again, not copies
+    plcproj = restored[-1]
+    assert pou.parent is plcproj
+    assert plcproj.pous[0] is pou
+    assert pou.methods[0] is restored[1]
+    assert restored[1].parent is pou
+    assert pou.variables[0].parent is pou
+
+
+def test_snapshot_rejects_other_files(tmp_path: Path):
+    snapshot = tmp_path / "model.snap"
+    snapshot.write_bytes(b"no snapshot at all")
+    with pytest.raises(SnapshotError):
+        load_snapshot(snapshot)
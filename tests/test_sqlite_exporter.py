@@ -0,0 +1,69 @@
+import sqlite3
+from pathlib import Path
+
+from pytwincatparser import Loader, export_sqlite, get_default_strategy
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def test_export_sqlite(tmp_path: Path):
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+    database = tmp_path / "model.db"
+    export_sqlite(objects, database)
+
+    connection = sqlite3.connect(database)
+    try:
+        rows = connection.execute(
+            "SELECT p.identifier FROM objects p JOIN objects o ON o.parent_id = p.id "
+            "WHERE o.kind = 'pou'"
+        ).fetchall()
+        assert rows == [("LCA_NGP_Core",)]
+
+        rows = connection.execute(
+            "SELECT v.name FROM variables v JOIN objects o ON v.owner_id = o.id "
+            "WHERE o.name = 'ST_PmlCommand' ORDER BY v.id"
+        ).fetchall()
+        assert rows == [("eMode",), ("eState",), ("bFollow",)]
+
+        rows = connection.execute(
+            "SELECT relation, target FROM inheritance ORDER BY relation, target"
+        ).fetchall()
+        assert rows == [
+            ("extends", "FB_BasePart"),
+            ("implements", "I_Elementinformation"),
+            ("implements", "I_TestInterface"),
+        ]
+
+        (count,) = connection.execute(
+            "SELECT count(*) FROM objects WHERE kind IN ('get', 'set')"
+        ).fetchone()
+        assert count > 0
+        (count,) = connection.execute("SELECT count(*) FROM dependencies").fetchone()
+        assert count == 9
+    finally:
+        connection.close()
+
+    # exporting again replaces the database
+    export_sqlite(objects, database, fts=False)
+
+
+def test_attribute_values(tmp_path: Path, plc_files):
+    plc_files.pou(
+        "FB_Data",
+        "FUNCTION_BLOCK FB_Data\n"
+        "VAR\n    {attribute 'pack_mode' := '1'}\n    stData : ST_Data;\n"
+        "    {attribute 'hide'}\n    nHidden : INT;\nEND_VAR",
+    )
+    database = tmp_path / "model.db"
+    export_sqlite(plc_files.load(), database, fts=False)
+
+    connection = sqlite3.connect(database)
+    try:
+        rows = connection.execute(
+            "SELECT v.name, a.attribute, a.value FROM variable_attributes a "
+            "JOIN variables v ON a.variable_id = v.id ORDER BY v.id"
+        ).fetchall()
+        assert rows == [("stData", "pack_mode", "1"), ("nHidden", "hide", None)]
+    finally:
+        connection.close()
@@ -0,0 +1,69 @@
+from pytwincatparser import SymbolIndex
+from pytwincatparser import TwincatDataclasses as tcd
+from pytwincatparser.SymbolIndex import fuzzy_score
+
+
+def _index():
+    index = SymbolIndex()
+    index.add_symbol("Lib.FB_AxisMove", "FB_AxisMove", "pou", path="a.TcPOU")
+    index.add_symbol("Lib.FB_AxisMove.MoveAbs", "MoveAbs", "method", path="a.TcPOU")
+    index.add_symbol("Lib.FB_Axis", "FB_Axis", "pou", path="b.TcPOU")
+    index.add_symbol("Lib.FB_Base", "FB_Base", "pou", path="c.TcPOU")
+    index.add_symbol("Lib.FB_Base.bFlexMove", "bFlexMove", "variable", path="c.TcPOU")
+    return index
+
+
+def test_fuzzy_score():
+    assert fuzzy_score("fbaxmov", "FB_AxisMove") is not None
+    assert fuzzy_score("fbaxmov", "FB_Base") is None
+    assert fuzzy_score("am", "FB_AxisMove") > fuzzy_score("am", "FB_Example")
+
+
+def test_symbol_search():
+    index = _index()
+    assert index.search("fbaxmov")[0].identifier == "Lib.FB_AxisMove"
+    assert index.search("FB_Axis")[0].identifier == "Lib.FB_Axis"
+    assert [match.identifier for match in index.search("move", kinds=["method"])] == [
+        "Lib.FB_AxisMove.MoveAbs"
+    ]
+    assert index.search("zzz") == []
+
+
+def test_symbol_complete_and_reload():
+    index = _index()
+    assert [match.identifier for match in index.complete("fb_ax")] == [
+        "Lib.FB_Axis",
+        "Lib.FB_AxisMove",
+    ]
+    index.remove_paths(["b.TcPOU"])
+    assert [match.identifier for match in index.complete("fb_ax")] == [
+        "Lib.FB_AxisMove"
+    ]
+    index.add_symbol("Lib.FB_Axis2", "FB_Axis2", "pou", path="b.TcPOU")
+    assert [match.identifier for match in index.complete("fb_ax")] == [
+        "Lib.FB_Axis2",
+        "Lib.FB_AxisMove",
+    ]
+    assert len(index) == 5
+
+
+def test_complete_is_shortest_first_for_common_prefixes():
+    index = SymbolIndex()
+    for number in range(3000):
+        index.add_symbol(f"Lib.FB_A{number:05}", f"FB_A{number:05}", "pou")
+    index.add_symbol("Lib.FB_Z", "FB_Z", "pou")
+    index.add_symbol("Lib.FB_A", "FB_A", "pou")
+    assert [match.identifier for match in index.complete("fb", limit=2)] == [
+        "Lib.FB_A",
+        "Lib.FB_Z",
+    ]
+    assert index.complete("fb_a0299", limit=3)[0].identifier == "Lib.FB_A02990"
+
+
+def test_objects_without_identifier_are_skipped():
+    pou = tcd.Pou(name="FB_Axis", name_space="Lib")
+    orphan = tcd.Variable(name="bLost", type="BOOL")
+    index = SymbolIndex()
+    index.add_objects([pou, orphan])
+    assert [match.identifier for match in index.search("bLost")] == []
+    assert index.complete("fb_axis")[0].identifier == "Lib.FB_Axis"
@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+
+from pytwincatparser import Loader, VariableTable, get_default_strategy
+from pytwincatparser import TwincatDataclasses as tcd
+from pytwincatparser.VariableTable import np
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+MODES = [False] + ([True] if np is not None else [])
+
+
+@pytest.mark.parametrize("use_numpy", MODES)
+def test_variable_table(use_numpy: bool):
+    loader = Loader(loader_strategy=get_default_strategy()())
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+
+    table = VariableTable.from_objects(objects, use_numpy=use_numpy)
+    assert len(table) == 30
+
+    counts = table.count_by("owner", type="bool")
+    assert counts["LCA_NGP_Core.FB_Base"] == 12
+    assert counts["LCA_NGP_Core.ST_PmlCommand"] == 1
+
+    selected = table.select(section_type="var_stat", type="BOOL")
+    assert [variable.name for variable in selected] == ["_bLicenseOk"]
+    assert table.select(section_type="var_input", type="LREAL") == []
+    assert table.count_by("section_type") == {
+        "var_inst": 7,
+        "var": 19,
+        "var_stat": 1,
+        "struct": 3,
+    }
+
+
+@pytest.mark.parametrize("use_numpy", MODES)
+def test_variable_table_modifiers(use_numpy: bool):
+    fb = tcd.Pou(name="FB_Axis", name_space="Lib")
+    variables = [
+        tcd.Variable(
+            name="nCount",
+            type="DINT",
+            section_type="var",
+            section_modifier=["PERSISTENT"],
+            parent=fb,
+        ),
+        tcd.Variable(
+            name="nTotal",
+            type="UDINT",
+            section_type="var",
+            section_modifier=["RETAIN", "PERSISTENT"],
+            parent=fb,
+        ),
+        tcd.Variable(name="fPos", type="LREAL", section_type="var_input", parent=fb),
+        tcd.Variable(name="fVel", type="LREAL", section_type="var_input", parent=fb),
+        tcd.Variable(name="bDone", type="BOOL", section_type="var_output", parent=fb),
+    ]
+
+    table = VariableTable(variables, use_numpy=use_numpy)
+    assert table.count_by("owner", section_modifier="persistent") == {"Lib.FB_Axis": 2}
+    assert [variable.name for variable in table.select(section_modifier="RETAIN")] == [
+        "nTotal"
+    ]
+    assert table.count_by("section_modifier", section_modifier="persistent") == {
+        "PERSISTENT": 1,
+        "RETAIN PERSISTENT": 1,
+    }
+    assert table.count_by("type", section_type=["var_input", "var_output"]) == {
+        "LREAL": 2,
+        "BOOL": 1,
+    }
+    assert list(table.indices(type="LREAL", name="fVel")) == [3]
+    with pytest.raises(KeyError):
+        table.mask(comment="x")
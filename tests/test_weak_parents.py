@@ -0,0 +1,48 @@
+import gc
+import weakref
+from pathlib import Path
+
+from pytwincatparser import Loader, get_default_strategy, load_snapshot, save_snapshot
+from pytwincatparser import TwincatDataclasses as tcd
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+def test_weak_parents():
+    loader = Loader(loader_strategy=get_default_strategy()(), weak_parents=True)
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+
+    pou = objects[0]
+    assert tcd.is_weak(pou.parent)
+    assert tcd.unwrap(pou.parent) is objects[-1]
+    assert tcd.is_weak(pou.variables[0].parent)
+    assert pou.variables[0].get_identifier() == "LCA_NGP_Core.FB_Base._bCodeActive"
+    assert pou.methods[0].get_identifier() == "LCA_NGP_Core.FB_Base._ConfigureAlarm"
+
+    tcd.strengthen_parents(objects)
+    assert pou.parent is objects[-1]
+
+
+def test_weak_parents_are_freed_without_gc():
+    loader = Loader(loader_strategy=get_default_strategy()(), weak_parents=True)
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+    pou = weakref.ref(objects[0])
+
+    gc.disable()
+    try:
+        del objects
+        assert pou() is None
+    finally:
+        gc.enable()
+
+
+def test_snapshot_with_weak_parents(tmp_path: Path):
+    loader = Loader(loader_strategy=get_default_strategy()(), weak_parents=True)
+    objects = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+
+    save_snapshot(objects, tmp_path / "model.snap")
+    restored = load_snapshot(tmp_path / "model.snap")
+    assert restored[0].parent is restored[-1]
+
+    restored = load_snapshot(tmp_path / "model.snap", weak_parents=True)
+    assert tcd.unwrap(restored[0].parent) is restored[-1]
@@ -0,0 +1,66 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from pytwincatparser import (
+    Loader,
+    PlcProject,
+    ZipSource,
+    diff_objects,
+    get_default_strategy,
+)
+
+TWINCAT_FILES = Path(__file__).parent.parent / "TwincatFiles"
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_zip_source(tmp_path: Path, max_workers: int):
+    bundle = tmp_path / "Bundle.zip"
+    with zipfile.ZipFile(bundle, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in TWINCAT_FILES.rglob("*"):
+            if path.is_file():
+                name = path.relative_to(TWINCAT_FILES).as_posix()
+                # includes are resolved case-insensitive
+                name = name.replace("Commands/", "COMMANDS/")
+                archive.write(path, "Lib/" + name)
+
+    loader = Loader(loader_strategy=get_default_strategy()())
+    on_disk = loader.load_objects(TWINCAT_FILES / "TwincatPlcProject.plcproj")
+    with ZipSource(bundle) as source:
+        assert source.projects() == ["Lib/TwincatPlcProject.plcproj"]
+        objects = loader.load_source(
+            source, "lib/twincatplcproject.plcproj", max_workers=max_workers
+        )
+
+    assert not diff_objects(on_disk, objects)
+    project = objects[-1]
+    assert isinstance(project, PlcProject)
+    assert project.duts[0].path == bundle / "Lib" / "COMMANDS" / "ST_PmlCommand.TcDUT"
+
+
+def test_zip_source_tsproj(tmp_path: Path, monkeypatch):
+    bundle = tmp_path / "Bundle.zip"
+    with zipfile.ZipFile(bundle, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in TWINCAT_FILES.rglob("*"):
+            if path.is_file():
+                archive.write(path, "Lib/" + path.relative_to(TWINCAT_FILES).as_posix())
+        archive.writestr(
+            "Machine.tsproj",
+            '<?xml version="1.0"?>\n<TcSmProject><Project><Plc>'
+            '<Project Name="Lib" PrjFilePath="Lib\\TwincatPlcProject.plcproj"/>'
+            "</Plc></Project></TcSmProject>",
+        )
+    # nothing of the project is on disk next to the working directory
+    monkeypatch.chdir(tmp_path)
+
+    loader = Loader(loader_strategy=get_default_strategy()())
+    with ZipSource(bundle) as source:
+        objects = loader.load_source(source, "Machine.tsproj")
+
+    tsproj = objects[-1]
+    assert tsproj.sub_paths == [bundle / "Lib" / "TwincatPlcProject.plcproj"]
+    project = objects[-2]
+    assert isinstance(project, PlcProject)
+    assert [pou.name for pou in project.pous] == ["FB_Base"]
+    assert project.pous[0].path == bundle / "Lib" / "Base" / "FB_Base.TcPOU"